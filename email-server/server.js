@@ -102,6 +102,130 @@ app.use(cors({
 }));
 app.use(express.json({ limit: '25mb' }));
 
+// ========================================
+// METRICS (Prometheus text format)
+// ========================================
+
+// Minimal counter/histogram registry — exposed at GET /metrics
+const METRICS_MAX_SERIES = 1000; // per family — guards against label explosions
+
+const metrics = (() => {
+  const families = new Map();
+
+  const labelKey = (labels) => Object.keys(labels).sort().map(k => `${k}=${labels[k]}`).join(',');
+  const escapeLabel = (v) => String(v).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+  const formatLabels = (labels) => {
+    const keys = Object.keys(labels);
+    return keys.length ? `{${keys.map(k => `${k}="${escapeLabel(labels[k])}"`).join(',')}}` : '';
+  };
+
+  function seriesFor(fam, labels) {
+    let key = labelKey(labels);
+    if (!fam.series.has(key) && fam.series.size >= METRICS_MAX_SERIES) {
+      labels = Object.fromEntries(Object.keys(labels).map(k => [k, '__other__']));
+      key = labelKey(labels);
+    }
+    if (!fam.series.has(key)) {
+      fam.series.set(key, fam.type === 'histogram'
+        ? { labels, buckets: new Array(fam.buckets.length).fill(0), sum: 0, count: 0 }
+        : { labels, value: 0 });
+    }
+    return fam.series.get(key);
+  }
+
+  function counter(name, help) {
+    const fam = { name, help, type: 'counter', series: new Map() };
+    families.set(name, fam);
+    return { inc: (labels = {}, value = 1) => { seriesFor(fam, labels).value += value; } };
+  }
+
+  function histogram(name, help, buckets) {
+    const fam = { name, help, type: 'histogram', buckets, series: new Map() };
+    families.set(name, fam);
+    return {
+      observe(labels, value) {
+        const s = seriesFor(fam, labels);
+        buckets.forEach((le, i) => { if (value <= le) s.buckets[i]++; });
+        s.sum += value;
+        s.count++;
+      },
+    };
+  }
+
+  function render() {
+    const out = [];
+    for (const fam of families.values()) {
+      out.push(`# HELP ${fam.name} ${fam.help}`, `# TYPE ${fam.name} ${fam.type}`);
+      for (const s of fam.series.values()) {
+        if (fam.type === 'counter') {
+          out.push(`${fam.name}${formatLabels(s.labels)} ${s.value}`);
+          continue;
+        }
+        fam.buckets.forEach((le, i) => out.push(`${fam.name}_bucket${formatLabels({ ...s.labels, le })} ${s.buckets[i]}`));
+        out.push(`${fam.name}_bucket${formatLabels({ ...s.labels, le: '+Inf' })} ${s.count}`);
+        out.push(`${fam.name}_sum${formatLabels(s.labels)} ${s.sum}`);
+        out.push(`${fam.name}_count${formatLabels(s.labels)} ${s.count}`);
+      }
+    }
+    return out.join('\n') + '\n';
+  }
+
+  return { counter, histogram, render };
+})();
+
+const LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30];
+const httpDuration = metrics.histogram('hyvemail_http_request_duration_seconds', 'HTTP request latency by route', LATENCY_BUCKETS);
+const imapDuration = metrics.histogram('hyvemail_imap_operation_duration_seconds', 'IMAP operation latency by operation', LATENCY_BUCKETS);
+const imapErrors = metrics.counter('hyvemail_imap_operation_errors_total', 'IMAP operations that failed, by operation');
+
+// Per-route latency (route pattern, not raw URL, to keep label cardinality bounded)
+app.use((req, res, next) => {
+  if (req.path === '/metrics') return next();
+  const start = process.hrtime.bigint();
+  res.on('finish', () => {
+    const route = req.route ? `${req.method} ${req.baseUrl || ''}${req.route.path}` : `${req.method} unmatched`;
+    httpDuration.observe({ route, status: String(res.statusCode) }, Number(process.hrtime.bigint() - start) / 1e9);
+  });
+  next();
+});
+
+async function timeImap(op, fn) {
+  const start = process.hrtime.bigint();
+  try {
+    return await fn();
+  } catch (err) {
+    imapErrors.inc({ op });
+    throw err;
+  } finally {
+    imapDuration.observe({ op }, Number(process.hrtime.bigint() - start) / 1e9);
+  }
+}
+
+// Wrap the ImapFlow calls the routes use so each one is timed
+const TIMED_IMAP_METHODS = ['getMailboxLock', 'fetchOne', 'search', 'status', 'messageFlagsAdd',
+  'messageFlagsRemove', 'messageMove', 'messageDelete', 'append', 'logout'];
+
+function instrumentImapClient(client) {
+  for (const method of TIMED_IMAP_METHODS) {
+    const original = client[method].bind(client);
+    client[method] = (...args) => timeImap(method, () => original(...args));
+  }
+  // fetch() is an async iterator — time the whole iteration
+  const originalFetch = client.fetch.bind(client);
+  client.fetch = async function* (...args) {
+    const start = process.hrtime.bigint();
+    try {
+      yield* originalFetch(...args);
+    } catch (err) {
+      imapErrors.inc({ op: 'fetch' });
+      throw err;
+    } finally {
+      imapDuration.observe({ op: 'fetch' }, Number(process.hrtime.bigint() - start) / 1e9);
+    }
+  };
+  return client;
+}
+
 // Rate limiting
 const authLimiter = rateLimit({
   windowMs: 15 * 60 * 1000, // 15 minutes
@@ -150,8 +274,8 @@ async function getImapClient(email, password) {
     auth: { user: email, pass: password },
     logger: false,
   });
-  await client.connect();
-  return client;
+  await timeImap('connect', () => client.connect());
+  return instrumentImapClient(client);
 }
 
 function getSmtpTransport(email, password) {
@@ -1315,6 +1439,20 @@ app.get('/api/email/health', (req, res) => {
   });
 });
 
+// Prometheus scrape endpoint
+// Protected: requires the admin key. A localhost source is not enough, since
+// behind the reverse proxy every request arrives from 127.0.0.1.
+app.get('/metrics', (req, res) => {
+  const adminKey = process.env.ADMIN_KEY || '';
+
+  if (!adminKey || req.headers['x-admin-key'] !== adminKey) {
+    return res.status(403).send('Forbidden');
+  }
+
+  res.set('Content-Type', 'text/plain; version=0.0.4; charset=utf-8');
+  res.send(metrics.render());
+});
+
 // Diagnostic endpoint — checks SMTP, DNS, DKIM, SPF
 // Protected: only accessible with admin token or from localhost
 app.get('/api/email/diagnostics', async (req, res) => {
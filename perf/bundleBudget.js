@@ -0,0 +1,103 @@
+// perf/bundleBudget.js — Vite plugin: per-route JavaScript budgets, checked on every build
+//
+// For each entry in perf/bundle-budgets.json the plugin finds the chunk Rollup emitted for
+// that module (every lazy() route and lazily loaded feature is its own dynamic entry) and
+// measures what visiting it costs: the chunk plus every chunk it statically imports, minus
+// what the startup bundle already loaded. Sizes are gzip bytes of the minified output, which
+// is what a phone actually downloads and parses.
+//
+// The table is printed after the build and written to dist/bundle-report.json. An overrun
+// fails the build; "enforce": false in bundle-budgets.json turns overruns into warnings, and
+// BUNDLE_BUDGET=warn or =error overrides the file for a single build.
+
+import { readFileSync } from 'node:fs';
+import { gzipSync } from 'node:zlib';
+
+const KB = 1024;
+
+function formatKb(bytes) {
+  return `${(bytes / KB).toFixed(1)} kB`;
+}
+
+export default function bundleBudget({ budgetsFile, reportFile = 'bundle-report.json' }) {
+  return {
+    name: 'hyve-bundle-budget',
+    apply: 'build',
+
+    generateBundle(_options, bundle) {
+      const budgets = JSON.parse(readFileSync(budgetsFile, 'utf8'));
+      const chunks = Object.values(bundle).filter((item) => item.type === 'chunk');
+      const byFile = new Map(chunks.map((chunk) => [chunk.fileName, chunk]));
+      const gzipped = new Map();
+
+      const sizeOf = (fileName) => {
+        if (!gzipped.has(fileName)) gzipped.set(fileName, gzipSync(byFile.get(fileName).code).length);
+        return gzipped.get(fileName);
+      };
+
+      // The chunk and everything it pulls in synchronously (dynamic imports are their own budgets)
+      const closure = (fileName, into = new Set()) => {
+        if (into.has(fileName) || !byFile.has(fileName)) return into;
+        into.add(fileName);
+        byFile.get(fileName).imports.forEach((dep) => closure(dep, into));
+        return into;
+      };
+
+      const initial = new Set();
+      chunks.filter((chunk) => chunk.isEntry).forEach((chunk) => closure(chunk.fileName, initial));
+      const sum = (files) => [...files].reduce((total, file) => total + sizeOf(file), 0);
+
+      const findChunk = (module) => chunks.find((chunk) =>
+        chunk.isDynamicEntry && chunk.facadeModuleId && chunk.facadeModuleId.replace(/\\/g, '/').includes(`/${module}`));
+
+      const rows = [{
+        name: 'initial',
+        module: 'index.html',
+        bytes: sum(initial),
+        budget: budgets.initial * KB,
+        chunks: [...initial]
+      }];
+
+      for (const [group, entries] of [['route', budgets.routes || {}], ['feature', budgets.features || {}]]) {
+        for (const [name, { module, maxKb }] of Object.entries(entries)) {
+          const chunk = findChunk(module);
+          if (!chunk) {
+            // Not (or no longer) lazily loaded anywhere, so it has no cost of its own to measure
+            rows.push({ name, group, module, bytes: null, budget: maxKb * KB, chunks: [] });
+            continue;
+          }
+          const files = [...closure(chunk.fileName)].filter((file) => !initial.has(file));
+          rows.push({ name, group, module, bytes: sum(files), budget: maxKb * KB, chunks: files });
+        }
+      }
+
+      const over = rows.filter((row) => row.bytes !== null && row.bytes > row.budget);
+      const width = Math.max(...rows.map((row) => row.name.length));
+      console.log('\nJavaScript per route (gzip, excluding the startup bundle):');
+      for (const row of rows) {
+        const size = row.bytes === null ? 'not split' : formatKb(row.bytes);
+        const flag = row.bytes !== null && row.bytes > row.budget ? '  OVER BUDGET' : '';
+        console.log(`  ${row.name.padEnd(width)}  ${size.padStart(10)} / ${formatKb(row.budget).padStart(9)}${flag}`);
+      }
+
+      this.emitFile({
+        type: 'asset',
+        fileName: reportFile,
+        source: JSON.stringify({
+          generatedAt: new Date().toISOString(),
+          entries: rows.map(({ budget, ...row }) => ({ ...row, budgetBytes: budget })),
+          chunks: Object.fromEntries([...byFile.keys()].map((file) => [file, sizeOf(file)]))
+        }, null, 2)
+      });
+
+      if (over.length > 0) {
+        const message = `Bundle budget exceeded: ${over
+          .map((row) => `${row.name} ${formatKb(row.bytes)} > ${formatKb(row.budget)}`)
+          .join(', ')} (see ${budgetsFile})`;
+        const mode = process.env.BUNDLE_BUDGET || (budgets.enforce === false ? 'warn' : 'error');
+        if (mode === 'error') this.error(message);
+        else this.warn(message);
+      }
+    }
+  };
+}
@@ -0,0 +1,873 @@
+"""Synthetic datasets at production scale (and beyond) plus COPY-based snapshots.
+
+generate  Builds a deterministic, heavy-tailed social graph and streams it into
+          Postgres through parallel binary COPY, one worker process and one
+          connection per shard. It covers users, follows, posts with JSONB
+          metadata, post reactions, groups with members, categories and
+          channels, channel messages (with replies), channel reactions and read
+          state. A few users and channels carry most of the traffic, the same
+          way they do in production, so hot-row and skew problems show up.
+dump      Copies tables of the perf database into a snapshot directory, in
+          parallel, all from one exported MVCC snapshot. Large tables are split
+          by id range.
+restore   Loads a snapshot into a database with a compatible schema: the same
+          column types, and any extra target columns nullable or defaulted.
+          Sequences are reset afterwards.
+
+As for seed.py, the API server must have been started once against the
+database and tmp_create_tables*.js run. The generator fills the tables in the
+shape those scripts and the server create them. Tables they don't define
+(follows, reactions) are looked up in information_schema from the usual
+candidates. Only local databases are accepted unless --allow-remote is given.
+
+Usage:
+    python perf/datagen.py generate --scale 10 --jobs 8
+    python perf/datagen.py generate --profile prod-ratios.json --scale 10 --truncate
+    python perf/datagen.py dump perf/snapshots/10x --jobs 8
+    python perf/datagen.py restore perf/snapshots/10x --jobs 8
+"""
+
+import argparse
+import asyncio
+import bisect
+import gzip
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+
+import asyncpg
+
+from common import DATABASE_URL, SEED_MANIFEST, load_json, perf_address, save_json
+
+WORDS = ('hyve chain wallet invoice launch meeting roadmap staking bridge governance '
+         'validator release airdrop design review weekly update community grant node '
+         'market token swap liquidity proposal vote mainnet testnet gas block reward').split()
+HASHTAGS = ['hyve', 'web3', 'defi', 'nft', 'staking', 'governance', 'airdrop', 'dev', 'gm', 'build']
+DOMAINS = ['github.com', 'medium.com', 'youtube.com', 'x.com', 'hyvechain.com', 'mirror.xyz']
+CLIENTS, CLIENT_WEIGHTS = ('web', 'ios', 'android', 'desktop'), (50, 25, 20, 5)
+LANGS, LANG_WEIGHTS = ('en', 'es', 'pt', 'tr', 'de', 'ja'), (70, 8, 7, 6, 5, 4)
+REACTION_TYPES, REACTION_WEIGHTS = (0, 1, 2, 3, 4, 5), (55, 20, 10, 7, 5, 3)
+EMOJI, EMOJI_WEIGHTS = ('👍', '❤️', '😂', '🔥', '🎉', '👀', '🚀', '😮'), (30, 20, 15, 10, 8, 7, 6, 4)
+CATEGORY_NAMES = ['Text Channels', 'Community', 'Projects']
+
+# Scale 1 is a small production-like server. --scale multiplies the entity counts (SCALED);
+# the per-entity means stay put so 10x means 10x the users with the same behaviour each.
+# A --profile JSON overrides any key, e.g. ratios measured on production.
+PROFILE = {
+    'users': 5000,
+    'groups': 100,
+    'follows_per_user': 40,
+    'posts_per_user': 8,
+    'reactions_per_post': 5,
+    'members_per_group': 120,
+    'channels_per_group': [3, 12],
+    'messages_per_channel': 400,
+    'channel_reaction_ratio': 0.15,  # share of channel messages that get any reaction
+    'read_state_ratio': 0.35,        # share of member x channel pairs with a read marker
+    'days': 180,
+}
+SCALED = ('users', 'groups')
+
+LOCAL_HOSTS = {'localhost', '127.0.0.1', '::1', 'postgres', 'db'}
+SNAPSHOT_CHUNK_ROWS = 500_000
+
+# Logical table -> where it lives and what the generator fills. 'fields' maps each generated
+# value to candidate column names (empty = same name); fields without a matching column are
+# dropped unless listed in 'required'. Stages load in foreign-key order.
+TABLES = {
+    'users': {
+        'names': ['users'], 'stage': 1, 'split': 'users', 'required': ['wallet_address'],
+        'fields': {'wallet_address': [], 'username': [], 'display_name': [], 'bio': [], 'created_at': []},
+    },
+    'follows': {
+        'names': ['follows', 'user_follows', 'followers'], 'stage': 2, 'split': 'users', 'optional': True,
+        'required': ['follower_address', 'followed_address'],
+        'fields': {'follower_address': [],
+                   'followed_address': ['following_address', 'followed_address', 'followee_address'],
+                   'created_at': []},
+    },
+    'posts': {
+        'names': ['posts'], 'stage': 2, 'split': 'posts', 'required': ['id', 'author_address', 'content'],
+        'fields': {'id': [], 'author_address': [], 'content': [], 'image_url': [], 'privacy': [],
+                   'moderation_status': [], 'metadata': [], 'is_public': [], 'created_at': []},
+    },
+    'groups': {
+        'names': ['groups'], 'stage': 2, 'split': 'groups', 'required': ['id', 'name', 'owner_address'],
+        'fields': {'id': [], 'name': [], 'description': [], 'owner_address': [], 'privacy': [], 'created_at': []},
+    },
+    'reactions': {
+        'names': ['reactions'], 'stage': 3, 'split': 'posts', 'optional': True,
+        'required': ['post_id', 'user_address', 'reaction_type'],
+        'fields': {'post_id': [], 'user_address': ['user_address', 'wallet_address'],
+                   'reaction_type': ['reaction_type', 'type'], 'created_at': []},
+    },
+    'group_members': {
+        'names': ['group_members'], 'stage': 3, 'split': 'groups', 'required': ['group_id', 'member_address'],
+        'fields': {'group_id': [], 'member_address': ['member_address', 'user_address'], 'role': [],
+                   'joined_at': ['joined_at', 'created_at']},
+    },
+    'channel_categories': {
+        'names': ['channel_categories'], 'stage': 3, 'split': 'groups', 'optional': True,
+        'required': ['id', 'group_id'],
+        'fields': {'id': [], 'group_id': [], 'name': [], 'position': []},
+    },
+    'channels': {
+        'names': ['channels'], 'stage': 4, 'split': 'groups', 'required': ['id', 'group_id', 'name'],
+        'fields': {'id': [], 'group_id': [], 'category_id': [], 'name': [], 'type': [], 'position': [],
+                   'is_default': [], 'created_at': []},
+    },
+    'channel_messages': {
+        'names': ['channel_messages'], 'stage': 5, 'split': 'channels',
+        'required': ['id', 'channel_id', 'user_address', 'content'],
+        'fields': {'id': [], 'channel_id': [], 'user_address': [], 'content': [], 'image_url': [],
+                   'reply_to': [], 'edited_at': [], 'created_at': []},
+    },
+    'channel_reactions': {
+        'names': ['channel_reactions'], 'stage': 6, 'split': 'channels', 'optional': True,
+        'required': ['message_id', 'user_address', 'emoji'],
+        'fields': {'message_id': [], 'channel_id': [], 'user_address': [], 'emoji': [], 'created_at': []},
+    },
+    'channel_read_state': {
+        'names': ['channel_read_state'], 'stage': 6, 'split': 'channels', 'optional': True,
+        'required': ['channel_id', 'user_address'],
+        'fields': {'channel_id': [], 'user_address': [], 'last_read_message_id': [], 'last_read_at': []},
+    },
+}
+ID_TABLES = ('posts', 'groups', 'channel_categories', 'channels', 'channel_messages')
+
+
+# ── Helpers ──────────────────────────────────────────────────
+
+def ensure_local(dsn, allow_remote):
+    host = urlparse(dsn).hostname or 'localhost'
+    if host not in LOCAL_HOSTS and not allow_remote:
+        sys.exit(f'Refusing to use database host {host!r}: this tool is for local perf databases. '
+                 'Pass --allow-remote for a disposable staging box (never production).')
+
+
+def sentence(rng, n=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(max(1, n))).capitalize() + '.'
+
+
+def heavy_tail(rng, mean, cap, alpha=1.6):
+    """Pareto-distributed count with roughly the given mean: most get a few, a handful get thousands."""
+    return min(cap, int(mean * (alpha - 1) / alpha * rng.paretovariate(alpha)))
+
+
+def prefix(counts, start=0):
+    return list(itertools.accumulate(counts, initial=start))[:-1]
+
+
+def split_range(n, parts):
+    bounds = [n * k // parts for k in range(parts + 1)]
+    return [(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if hi > lo]
+
+
+def split_weighted(weights, parts):
+    """Contiguous index ranges with about the same total weight each."""
+    target = max(1, sum(weights) / parts)
+    ranges, lo, acc = [], 0, 0
+    for i, weight in enumerate(weights):
+        acc += weight
+        if acc >= target and i + 1 < len(weights):
+            ranges.append((lo, i + 1))
+            lo, acc = i + 1, 0
+    if lo < len(weights):
+        ranges.append((lo, len(weights)))
+    return ranges
+
+
+def converter(data_type):
+    """Coerce generated values to what asyncpg's binary COPY expects for the actual column type."""
+    if data_type in ('integer', 'bigint', 'smallint'):
+        return lambda v: None if v is None else int(v)
+    if data_type in ('text', 'character varying', 'character'):
+        return lambda v: None if v is None else str(v)
+    if data_type == 'boolean':
+        return lambda v: None if v is None else bool(v)
+    if data_type in ('json', 'jsonb'):
+        return lambda v: v if v is None or isinstance(v, str) else json.dumps(v)
+    if data_type == 'timestamp with time zone':
+        return lambda v: v if v is None or v.tzinfo else v.replace(tzinfo=timezone.utc)
+    if data_type == 'timestamp without time zone':
+        return lambda v: v if v is None or not v.tzinfo else v.astimezone(timezone.utc).replace(tzinfo=None)
+    return lambda v: v
+
+
+async def fetch_catalog(conn):
+    """table -> [column info] for every base table in public, in column order."""
+    rows = await conn.fetch(
+        "SELECT c.table_name, c.column_name, c.data_type, c.udt_name, c.is_nullable, c.column_default, "
+        "       c.is_identity, c.is_generated "
+        "FROM information_schema.columns c "
+        "JOIN information_schema.tables t ON t.table_schema = c.table_schema AND t.table_name = c.table_name "
+        "WHERE c.table_schema = 'public' AND t.table_type = 'BASE TABLE' "
+        "ORDER BY c.table_name, c.ordinal_position")
+    catalog = defaultdict(list)
+    for row in rows:
+        catalog[row['table_name']].append(dict(row))
+    return catalog
+
+
+def needs_value(col):
+    return (col['is_nullable'] == 'NO' and col['column_default'] is None
+            and col['is_identity'] == 'NO' and col['is_generated'] == 'NEVER')
+
+
+class Zipf:
+    """Draws indexes in [0, n) with P(rank k) ~ 1/(k+1)^s; ranks are scattered over the range."""
+
+    def __init__(self, n, s, seed):
+        self.cum = list(itertools.accumulate(1.0 / (k + 1) ** s for k in range(n)))
+        self.order = list(range(n))
+        random.Random(seed).shuffle(self.order)
+
+    def draw(self, rng):
+        return self.order[bisect.bisect_right(self.cum, rng.random() * self.cum[-1])]
+
+
+class World:
+    """Everything a shard needs to regenerate its slice of the dataset from the plan alone."""
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.users = plan['users']
+        self.now = datetime.fromtimestamp(plan['now'], timezone.utc).replace(tzinfo=None)
+        self.window = timedelta(days=plan['days'])
+        self.popularity = Zipf(self.users, 1.05, f"{plan['seed']}:popularity")
+        self.group_first_channel = prefix(plan['channel_counts'])
+        self.group_first_category = prefix(plan['category_counts'], plan['category_start'])
+        self.channel_group = [g for g, n in enumerate(plan['channel_counts']) for _ in range(n)]
+        self.channel_first_message = prefix(plan['message_counts'], plan['message_start'])
+        self._members = {}
+
+    def rng(self, *parts):
+        return random.Random(':'.join(str(p) for p in (self.plan['seed'],) + parts))
+
+    def address(self, i):
+        return perf_address(self.plan['user_start'] + i)
+
+    def at(self, frac):
+        return self.now - self.window * (1 - frac)
+
+    def post_at(self, i):
+        return self.at((i + 0.5) / self.plan['posts'])
+
+    def channel_opened(self, c):
+        return self.rng('channel', c).random() * 0.6
+
+    def pick_user(self, rng, seen):
+        # Half by popularity, half uniform: skewed, but always terminates for up to users/3 picks
+        while True:
+            i = self.popularity.draw(rng) if rng.random() < 0.5 else rng.randrange(self.users)
+            if i not in seen:
+                seen.add(i)
+                return i
+
+    def members(self, g):
+        """User indexes in group g; the first is the owner and earlier members are the chattier ones."""
+        if g not in self._members:
+            rng = self.rng('members', g)
+            k = min(self.plan['member_counts'][g], self.users)
+            if k * 3 > self.users:
+                picks = rng.sample(range(self.users), k)
+            else:
+                seen = set()
+                picks = [self.pick_user(rng, seen) for _ in range(k)]
+            self._members[g] = picks
+        return self._members[g]
+
+
+_world = None
+
+
+def world_for(plan):
+    global _world
+    if _world is None or _world.plan['run_id'] != plan['run_id']:
+        _world = World(plan)
+    return _world
+
+
+# ── Generators: (world, lo, hi) -> dict rows ─────────────────
+
+def gen_users(w, lo, hi):
+    rng = w.rng('users', lo)
+    for i in range(lo, hi):
+        n = w.plan['user_start'] + i
+        yield {
+            'wallet_address': w.address(i),
+            'username': f'perfuser{n}',
+            'display_name': f'{rng.choice(WORDS).capitalize()} {n}',
+            'bio': sentence(rng, rng.randint(3, 16)) if rng.random() < 0.6 else '',
+            'created_at': w.at(rng.random() * 0.3),
+        }
+
+
+def gen_follows(w, lo, hi):
+    rng = w.rng('follows', lo)
+    cap = max(1, w.users // 3)
+    for i in range(lo, hi):
+        me, seen = w.address(i), {i}
+        for _ in range(min(heavy_tail(rng, w.plan['follows_per_user'], cap), w.users - 1)):
+            yield {'follower_address': me, 'followed_address': w.address(w.pick_user(rng, seen)),
+                   'created_at': w.at(0.3 + rng.random() * 0.7)}
+
+
+def gen_posts(w, lo, hi):
+    rng = w.rng('posts', lo)
+    for i in range(lo, hi):
+        post_id = w.plan['post_start'] + i
+        tags = rng.sample(HASHTAGS, min(len(HASHTAGS), int(rng.paretovariate(2.0)) - 1))
+        content = sentence(rng, heavy_tail(rng, 24, 250) + 3) + ''.join(f' #{tag}' for tag in tags)
+        has_image = rng.random() < 0.2
+        metadata = {
+            'client': rng.choices(CLIENTS, CLIENT_WEIGHTS)[0],
+            'lang': rng.choices(LANGS, LANG_WEIGHTS)[0],
+            'hashtags': tags,
+        }
+        if rng.random() < 0.1:
+            metadata['mentions'] = [w.address(w.popularity.draw(rng)) for _ in range(rng.randint(1, 3))]
+        if has_image:
+            metadata['media'] = {'type': 'image', 'width': rng.choice((720, 1080, 1440)),
+                                 'height': rng.choice((720, 1080, 1350, 1920))}
+        elif rng.random() < 0.15:
+            domain = rng.choice(DOMAINS)
+            metadata['link'] = {'url': f'https://{domain}/{rng.choice(WORDS)}/{post_id}',
+                                'domain': domain, 'title': sentence(rng, 6)}
+        yield {
+            'id': post_id,
+            'author_address': w.address(w.popularity.draw(rng)),
+            'content': content,
+            'image_url': f'/uploads/perf/{post_id}.jpg' if has_image else '',
+            'privacy': 0,
+            'moderation_status': 'pending' if rng.random() < 0.02 else 'approved',
+            'metadata': metadata,
+            'is_public': rng.random() < 0.7,
+            'created_at': w.post_at(i),
+        }
+
+
+def gen_reactions(w, lo, hi):
+    rng = w.rng('reactions', lo)
+    cap = max(1, min(w.users // 3, 5000))
+    for i in range(lo, hi):
+        post_id, posted, seen = w.plan['post_start'] + i, w.post_at(i), set()
+        for _ in range(heavy_tail(rng, w.plan['reactions_per_post'], cap)):
+            yield {'post_id': post_id, 'user_address': w.address(w.pick_user(rng, seen)),
+                   'reaction_type': rng.choices(REACTION_TYPES, REACTION_WEIGHTS)[0],
+                   'created_at': min(w.now, posted + timedelta(minutes=5 * rng.paretovariate(1.2)))}
+
+
+def gen_groups(w, lo, hi):
+    rng = w.rng('groups', lo)
+    for g in range(lo, hi):
+        yield {
+            'id': w.plan['group_start'] + g,
+            'name': f'{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {g}',
+            'description': sentence(rng, rng.randint(4, 20)),
+            'owner_address': w.address(w.members(g)[0]),
+            'privacy': 'public' if rng.random() < 0.8 else 'private',
+            'created_at': w.at(rng.random() * 0.4),
+        }
+
+
+def gen_group_members(w, lo, hi):
+    rng = w.rng('group_members', lo)
+    for g in range(lo, hi):
+        for k, member in enumerate(w.members(g)):
+            role = 'owner' if k == 0 else 'admin' if k < 3 else 'member'
+            yield {'group_id': w.plan['group_start'] + g, 'member_address': w.address(member), 'role': role,
+                   'joined_at': w.at(0.4 + rng.random() * 0.6)}
+
+
+def gen_channel_categories(w, lo, hi):
+    for g in range(lo, hi):
+        for k in range(w.plan['category_counts'][g]):
+            yield {'id': w.group_first_category[g] + k, 'group_id': w.plan['group_start'] + g,
+                   'name': CATEGORY_NAMES[k % len(CATEGORY_NAMES)], 'position': k}
+
+
+def gen_channels(w, lo, hi):
+    rng = w.rng('channels', lo)
+    for g in range(lo, hi):
+        categories = w.plan['category_counts'][g] if w.plan['has_categories'] else 0
+        for k in range(w.plan['channel_counts'][g]):
+            c = w.group_first_channel[g] + k
+            yield {
+                'id': w.plan['channel_start'] + c,
+                'group_id': w.plan['group_start'] + g,
+                'category_id': w.group_first_category[g] + k % categories if categories else None,
+                'name': 'general' if k == 0 else f'{rng.choice(WORDS)}-{k}',
+                'type': 'text',
+                'position': k,
+                'is_default': k == 0,
+                'created_at': w.at(w.channel_opened(c)),
+            }
+
+
+def gen_channel_messages(w, lo, hi):
+    rng = w.rng('channel_messages', lo)
+    for c in range(lo, hi):
+        n = w.plan['message_counts'][c]
+        members, first, opened = w.members(w.channel_group[c]), w.channel_first_message[c], w.channel_opened(c)
+        for j in range(n):
+            message_id = first + j
+            sent = w.at(opened + (1 - opened) * (j + rng.random()) / n)
+            reply = j > 0 and rng.random() < 0.08
+            yield {
+                'id': message_id,
+                'channel_id': w.plan['channel_start'] + c,
+                'user_address': w.address(members[int(len(members) * rng.random() ** 3)]),
+                'content': sentence(rng, heavy_tail(rng, 10, 200) + 1),
+                'image_url': f'/uploads/perf/c{message_id}.jpg' if rng.random() < 0.03 else None,
+                'reply_to': message_id - 1 - int(rng.random() ** 2 * min(j, 50)) if reply else None,
+                'edited_at': sent + timedelta(minutes=30 * rng.random()) if rng.random() < 0.02 else None,
+                'created_at': sent,
+            }
+
+
+def gen_channel_reactions(w, lo, hi):
+    rng = w.rng('channel_reactions', lo)
+    ratio = w.plan['channel_reaction_ratio']
+    for c in range(lo, hi):
+        n = w.plan['message_counts'][c]
+        members, first, opened = w.members(w.channel_group[c]), w.channel_first_message[c], w.channel_opened(c)
+        for j in range(n):
+            if rng.random() >= ratio:
+                continue
+            sent = w.at(opened + (1 - opened) * (j + 0.5) / n)
+            for emoji in set(rng.choices(EMOJI, EMOJI_WEIGHTS, k=rng.randint(1, 3))):
+                reactors = {int(len(members) * rng.random() ** 2) for _ in range(1 + heavy_tail(rng, 1.5, 200))}
+                for k in reactors:
+                    yield {'message_id': first + j, 'channel_id': w.plan['channel_start'] + c,
+                           'user_address': w.address(members[k]), 'emoji': emoji,
+                           'created_at': min(w.now, sent + timedelta(minutes=10 * rng.paretovariate(1.2)))}
+
+
+def gen_channel_read_state(w, lo, hi):
+    rng = w.rng('channel_read_state', lo)
+    ratio = w.plan['read_state_ratio']
+    for c in range(lo, hi):
+        n = w.plan['message_counts'][c]
+        first, opened = w.channel_first_message[c], w.channel_opened(c)
+        for member in w.members(w.channel_group[c]):
+            if rng.random() >= ratio:
+                continue
+            # Most readers are caught up; the rest lag behind by a heavy-tailed number of messages
+            lag = min(n - 1, int(rng.paretovariate(1.1)) - 1) if n else 0
+            yield {'channel_id': w.plan['channel_start'] + c, 'user_address': w.address(member),
+                   'last_read_message_id': first + n - 1 - lag if n else 0,
+                   'last_read_at': w.at(opened + (1 - opened) * (n - lag) / n) if n else w.at(opened)}
+
+
+GENERATORS = {name: globals()[f'gen_{name}'] for name in TABLES}
+
+
+# ── generate ─────────────────────────────────────────────────
+
+def resolve(name, spec, catalog):
+    table = next((t for t in spec['names'] if t in catalog), None)
+    if table is None:
+        if spec.get('optional'):
+            print(f'  {name}: no table among {spec["names"]} — skipped')
+            return None
+        sys.exit(f'Missing table {name}: start the API server once against this database and run '
+                 'tmp_create_tables*.js (see perf/README.md)')
+    columns = {col['column_name']: col for col in catalog[table]}
+    fields, names = [], []
+    for field, candidates in spec['fields'].items():
+        column = next((c for c in candidates or [field] if c in columns), None)
+        if column:
+            fields.append(field)
+            names.append(column)
+        elif field in spec.get('required', ()):
+            sys.exit(f'{table}: no column for {field} (tried {candidates or [field]})')
+    uncovered = [c for c, col in columns.items() if needs_value(col) and c not in names]
+    if uncovered:
+        sys.exit(f'{table}: NOT NULL columns without a default that the generator does not fill: {uncovered}')
+    return {'table': table, 'fields': fields, 'columns': names,
+            'types': [columns[c]['data_type'] for c in names]}
+
+
+def build_plan(args, profile, starts, has_categories):
+    rng = random.Random(f'{args.seed}:plan')
+    users, groups = profile['users'], profile['groups']
+    lo, hi = profile['channels_per_group']
+    channel_counts = [rng.randint(lo, hi) for _ in range(groups)]
+    mean_messages = profile['messages_per_channel']
+    return {
+        'run_id': f'{args.seed}:{time.time()}',
+        'seed': args.seed,
+        'now': time.time(),
+        'days': profile['days'],
+        'users': users,
+        'posts': users * profile['posts_per_user'],
+        'groups': groups,
+        'follows_per_user': profile['follows_per_user'],
+        'reactions_per_post': profile['reactions_per_post'],
+        'channel_reaction_ratio': profile['channel_reaction_ratio'],
+        'read_state_ratio': profile['read_state_ratio'],
+        'member_counts': [max(2, heavy_tail(rng, profile['members_per_group'], users)) for _ in range(groups)],
+        'category_counts': [rng.randint(1, len(CATEGORY_NAMES)) for _ in range(groups)],
+        'channel_counts': channel_counts,
+        'message_counts': [heavy_tail(rng, mean_messages, mean_messages * 200) for _ in range(sum(channel_counts))],
+        'has_categories': has_categories,
+        **starts,
+    }
+
+
+def shards(split, plan, jobs):
+    if split == 'users':
+        return split_range(plan['users'], jobs * 2)
+    if split == 'posts':
+        return split_range(plan['posts'], jobs * 2)
+    if split == 'groups':
+        return split_range(plan['groups'], jobs)
+    return split_weighted(plan['message_counts'], jobs * 2)
+
+
+def copy_shard(task):
+    """Worker process: generate one shard and stream it over its own connection."""
+    return asyncio.run(_copy_shard(*task))
+
+
+async def _copy_shard(dsn, name, target, plan, shard):
+    world = world_for(plan)
+    converters = [converter(t) for t in target['types']]
+    count = 0
+
+    def records():
+        nonlocal count
+        for row in GENERATORS[name](world, *shard):
+            count += 1
+            yield tuple(conv(row.get(field)) for field, conv in zip(target['fields'], converters))
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.copy_records_to_table(target['table'], records=records(), columns=target['columns'])
+    finally:
+        await conn.close()
+    return name, count
+
+
+async def prepare(args, profile):
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        catalog = await fetch_catalog(conn)
+        targets = {}
+        for name, spec in TABLES.items():
+            target = resolve(name, spec, catalog)
+            if target:
+                targets[name] = target
+        if args.truncate:
+            tables = ', '.join(t['table'] for t in targets.values())
+            await conn.execute(f'TRUNCATE {tables} RESTART IDENTITY CASCADE')
+            print(f'Truncated {tables}')
+
+        # Explicit ids after whatever is there, so children can reference parents without round trips
+        starts = {'user_start': await conn.fetchval('SELECT COUNT(*) FROM users')}
+        for name, key in [('posts', 'post_start'), ('groups', 'group_start'), ('channel_categories', 'category_start'),
+                          ('channels', 'channel_start'), ('channel_messages', 'message_start')]:
+            table = targets[name]['table'] if name in targets else None
+            starts[key] = await conn.fetchval(f'SELECT COALESCE(MAX(id), 0) + 1 FROM {table}') if table else 1
+        return targets, build_plan(args, profile, starts, 'channel_categories' in targets)
+    finally:
+        await conn.close()
+
+
+async def finish(args, targets):
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        for name in ID_TABLES:
+            if name in targets:
+                table = targets[name]['table']
+                await conn.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))")
+        for target in targets.values():
+            await conn.execute(f"ANALYZE {target['table']}")
+    finally:
+        await conn.close()
+
+
+def write_seed_manifest(plan, targets):
+    """Point loadtest.py at the busiest generated channel and its members."""
+    world = world_for(plan)
+    busiest = max(range(len(plan['message_counts'])), key=plan['message_counts'].__getitem__)
+    group = world.channel_group[busiest]
+    manifest = load_json(SEED_MANIFEST, {})
+    manifest.update({
+        'addresses': [world.address(i) for i in world.members(group)[:500]],
+        'group_id': plan['group_start'] + group,
+        'channel_id': plan['channel_start'] + busiest,
+    })
+    save_json(SEED_MANIFEST, manifest)
+
+
+def generate(args):
+    ensure_local(args.dsn, args.allow_remote)
+    profile = dict(PROFILE)
+    if args.profile:
+        profile.update(load_json(args.profile, {}))
+    for key in SCALED:
+        profile[key] = max(1, int(profile[key] * args.scale))
+
+    targets, plan = asyncio.run(prepare(args, profile))
+    print(f"Generating scale {args.scale}: {plan['users']} users, {plan['posts']} posts, {plan['groups']} groups, "
+          f"{len(plan['message_counts'])} channels, {sum(plan['message_counts'])} channel messages "
+          f'({args.jobs} COPY streams)')
+
+    totals, started = defaultdict(int), time.monotonic()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for stage in sorted({spec['stage'] for spec in TABLES.values()}):
+            names = [name for name, spec in TABLES.items() if spec['stage'] == stage and name in targets]
+            tasks = [(args.dsn, name, targets[name], plan, shard)
+                     for name in names for shard in shards(TABLES[name]['split'], plan, args.jobs)]
+            stage_started = time.monotonic()
+            for name, count in pool.map(copy_shard, tasks):
+                totals[name] += count
+            elapsed = time.monotonic() - stage_started
+            rows = sum(totals[name] for name in names)
+            print(f"  stage {stage}: {', '.join(names)} — {rows} rows in {elapsed:.1f}s "
+                  f'({rows / max(elapsed, 1e-6):,.0f} rows/s)')
+
+    asyncio.run(finish(args, targets))
+    width = max(len(t['table']) for t in targets.values())
+    for name, target in targets.items():
+        print(f"  {target['table'].ljust(width)}  {totals[name]:>12,}")
+    print(f'Loaded {sum(totals.values()):,} rows in {time.monotonic() - started:.1f}s')
+    if not args.no_manifest:
+        write_seed_manifest(plan, targets)
+        print(f'Wrote {SEED_MANIFEST}')
+
+
+# ── dump / restore ───────────────────────────────────────────
+
+def copyable(columns):
+    return [col for col in columns if col['is_generated'] == 'NEVER']
+
+
+async def sequences_of(conn, table, columns):
+    out = {}
+    for col in columns:
+        seq = await conn.fetchval('SELECT pg_get_serial_sequence($1, $2)', table, col['column_name'])
+        if seq:
+            row = await conn.fetchrow(f'SELECT last_value, is_called FROM {seq}')
+            out[col['column_name']] = {'sequence': seq, 'last_value': row['last_value'], 'is_called': row['is_called']}
+    return out
+
+
+async def run_queue(workers, jobs, handle):
+    queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+
+    async def drain(conn):
+        while not queue.empty():
+            await handle(conn, queue.get_nowait())
+
+    await asyncio.gather(*(drain(conn) for conn in workers))
+
+
+async def dump(args):
+    ensure_local(args.dsn, args.allow_remote)
+    os.makedirs(args.directory, exist_ok=True)
+    conn = await asyncpg.connect(args.dsn)
+    workers = []
+    try:
+        catalog = await fetch_catalog(conn)
+        tables = args.tables or sorted(catalog)
+        unknown = [t for t in tables if t not in catalog]
+        if unknown:
+            sys.exit(f'Unknown tables: {unknown}')
+
+        # Every worker reads the same MVCC snapshot, like pg_dump -j
+        await conn.execute('BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY')
+        snapshot = await conn.fetchval('SELECT pg_export_snapshot()')
+        for _ in range(args.jobs):
+            worker = await asyncpg.connect(args.dsn)
+            workers.append(worker)
+            await worker.execute('BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY')
+            await worker.execute(f"SET TRANSACTION SNAPSHOT '{snapshot}'")
+
+        manifest = {'created_at': datetime.now(timezone.utc).isoformat(), 'source': urlparse(args.dsn).path.lstrip('/'),
+                    'server_version': await conn.fetchval('SHOW server_version'), 'tables': {}}
+        jobs = []
+        for table in tables:
+            columns = copyable(catalog[table])
+            names = [col['column_name'] for col in columns]
+            rows = await conn.fetchval(f'SELECT COUNT(*) FROM {table}')
+            entry = {
+                'columns': [{'name': col['column_name'], 'type': col['udt_name']} for col in columns],
+                'rows': rows,
+                'sequences': await sequences_of(conn, table, columns),
+                'files': [],
+            }
+            ranges = [None]
+            id_col = next((col for col in columns if col['column_name'] == 'id'), None)
+            if id_col and id_col['data_type'] in ('integer', 'bigint') and rows > SNAPSHOT_CHUNK_ROWS:
+                low, high = await conn.fetchrow(f'SELECT MIN(id), MAX(id) FROM {table}')
+                parts = -(-rows // SNAPSHOT_CHUNK_ROWS)
+                step = -(-(high - low + 1) // parts)
+                ranges = [(start, start + step) for start in range(low, high + 1, step)]
+            for k, bounds in enumerate(ranges):
+                file_name = f'{table}.{k}.copy.gz'
+                entry['files'].append(file_name)
+                jobs.append((table, names, bounds, os.path.join(args.directory, file_name)))
+            manifest['tables'][table] = entry
+
+        async def copy_out(worker, job):
+            table, names, bounds, path = job
+            columns_sql = ', '.join(f'"{name}"' for name in names)
+            with gzip.open(path, 'wb', compresslevel=1) as f:
+                if bounds:
+                    await worker.copy_from_query(f'SELECT {columns_sql} FROM {table} WHERE id >= $1 AND id < $2',
+                                                 *bounds, output=f, format='binary')
+                else:
+                    await worker.copy_from_table(table, columns=names, output=f, format='binary')
+
+        started = time.monotonic()
+        await run_queue(workers, jobs, copy_out)
+        save_json(os.path.join(args.directory, 'manifest.json'), manifest)
+        total = sum(entry['rows'] for entry in manifest['tables'].values())
+        print(f'Dumped {len(tables)} tables ({total:,} rows, {len(jobs)} files) to {args.directory} '
+              f'in {time.monotonic() - started:.1f}s')
+    finally:
+        for worker in workers:
+            await worker.close()
+        await conn.close()
+
+
+def compatibility_problems(manifest, catalog):
+    problems = []
+    for table, entry in manifest['tables'].items():
+        if table not in catalog:
+            problems.append(f'{table}: missing in target')
+            continue
+        target = {col['column_name']: col for col in catalog[table]}
+        for col in entry['columns']:
+            have = target.get(col['name'])
+            if have is None:
+                problems.append(f"{table}.{col['name']}: missing in target")
+            elif have['udt_name'] != col['type']:
+                problems.append(f"{table}.{col['name']}: {col['type']} in snapshot, {have['udt_name']} in target")
+        dumped = {col['name'] for col in entry['columns']}
+        for name, col in target.items():
+            if name not in dumped and needs_value(col):
+                problems.append(f'{table}.{name}: NOT NULL without default, not in snapshot')
+    return problems
+
+
+async def fk_stages(conn, tables):
+    """Tables grouped so every table loads after the tables it references."""
+    rows = await conn.fetch(
+        "SELECT c.conrelid::regclass::text AS child, c.confrelid::regclass::text AS parent "
+        "FROM pg_constraint c WHERE c.contype = 'f'")
+    parents = defaultdict(set)
+    for row in rows:
+        if row['child'] in tables and row['parent'] in tables and row['child'] != row['parent']:
+            parents[row['child']].add(row['parent'])
+    stages, loaded, pending = [], set(), set(tables)
+    while pending:
+        ready = {t for t in pending if parents[t] <= loaded} or pending  # a cycle loads in one go
+        stages.append(sorted(ready))
+        loaded |= ready
+        pending -= ready
+    return stages
+
+
+async def restore(args):
+    ensure_local(args.dsn, args.allow_remote)
+    manifest = load_json(os.path.join(args.directory, 'manifest.json'))
+    if manifest is None:
+        sys.exit(f'No manifest.json in {args.directory}')
+    conn = await asyncpg.connect(args.dsn)
+    workers = []
+    try:
+        problems = compatibility_problems(manifest, await fetch_catalog(conn))
+        if problems:
+            print('Snapshot is not compatible with the target schema:')
+            for problem in problems:
+                print(f'  {problem}')
+            sys.exit(1)
+
+        tables = sorted(manifest['tables'])
+        # Skipping FK triggers (superuser only) lets every file load at once; otherwise go in FK order
+        bypass_fks = True
+        for _ in range(args.jobs):
+            worker = await asyncpg.connect(args.dsn)
+            workers.append(worker)
+            try:
+                await worker.execute('SET session_replication_role = replica')
+            except asyncpg.InsufficientPrivilegeError:
+                bypass_fks = False
+        stages = [tables] if bypass_fks else await fk_stages(conn, tables)
+
+        await conn.execute(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE")
+
+        async def copy_in(worker, job):
+            table, path = job
+            names = [col['name'] for col in manifest['tables'][table]['columns']]
+            with gzip.open(path, 'rb') as f:
+                await worker.copy_to_table(table, source=f, columns=names, format='binary')
+
+        started = time.monotonic()
+        for stage in stages:
+            await run_queue(workers, [(table, os.path.join(args.directory, file_name))
+                                      for table in stage for file_name in manifest['tables'][table]['files']], copy_in)
+
+        for table in tables:
+            for column, seq in manifest['tables'][table]['sequences'].items():
+                await conn.execute(f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), $1, $2)",
+                                   seq['last_value'], seq['is_called'])
+            await conn.execute(f'ANALYZE {table}')
+
+        total = sum(entry['rows'] for entry in manifest['tables'].values())
+        print(f'Restored {len(tables)} tables ({total:,} rows) in {time.monotonic() - started:.1f}s'
+              + ('' if bypass_fks else f' ({len(stages)} FK-ordered stages)'))
+    finally:
+        for worker in workers:
+            await worker.close()
+        await conn.close()
+
+
+def main():
+    shared = argparse.ArgumentParser(add_help=False)
+    shared.add_argument('--dsn', default=DATABASE_URL, help='target database (default PERF_DATABASE_URL)')
+    shared.add_argument('--jobs', type=int, default=min(8, os.cpu_count() or 4), help='parallel COPY streams')
+    shared.add_argument('--allow-remote', action='store_true', help='allow a non-local database host')
+
+    parser = argparse.ArgumentParser(description='Synthetic perf datasets and COPY snapshots')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    gen = sub.add_parser('generate', parents=[shared], help='generate and load a synthetic dataset')
+    gen.add_argument('--scale', type=float, default=1.0, help='multiplier for users and groups')
+    gen.add_argument('--profile', help='JSON file overriding the default PROFILE keys')
+    gen.add_argument('--seed', type=int, default=1, help='same seed + --jobs reproduces the same data')
+    gen.add_argument('--truncate', action='store_true', help='empty the target tables first')
+    gen.add_argument('--no-manifest', action='store_true', help=f'do not update {os.path.basename(SEED_MANIFEST)}')
+
+    dmp = sub.add_parser('dump', parents=[shared], help='snapshot tables into a directory')
+    dmp.add_argument('directory')
+    dmp.add_argument('--tables', nargs='+', help='default: every table in public')
+
+    rst = sub.add_parser('restore', parents=[shared], help='load a snapshot directory (replaces the snapshot tables)')
+    rst.add_argument('directory')
+
+    args = parser.parse_args()
+    if args.command == 'generate':
+        generate(args)
+    elif args.command == 'dump':
+        asyncio.run(dump(args))
+    else:
+        asyncio.run(restore(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""asyncio load harness + regression gate for the social and HyveMail APIs.
+
+Each scenario replays what a real client does on a screen (same endpoints as
+src/services/api.js and src/services/emailApi.js), driven by N concurrent
+virtual users for a fixed duration. Every request is timed; the report shows
+per-request p50/p95/p99 and throughput.
+
+    python perf/loadtest.py run feed channel_chat --users 50 --duration 60
+    python perf/loadtest.py run all --save-baseline       # record perf/baselines.json
+    python perf/loadtest.py run all --compare             # exit 1 on regression
+
+Requires perf/seed.py to have been run against the same stack.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import defaultdict
+
+import aiohttp
+import socketio
+
+from common import (API_URL, BASELINES_FILE, EMAIL_API_URL, SEED_MANIFEST, email_token,
+                    load_json, percentile, save_json, social_token)
+
+
+class Recorder:
+    """Collects (name -> latencies ms) and error counts for one scenario run."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.started = time.monotonic()
+        self.finished = None
+
+    def record(self, name, ms, ok):
+        self.latencies[name].append(ms)
+        if not ok:
+            self.errors[name] += 1
+
+    def summary(self):
+        elapsed = (self.finished or time.monotonic()) - self.started
+        out = {}
+        for name, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            out[name] = {
+                'count': len(values),
+                'errors': self.errors[name],
+                'p50': round(percentile(values, 50), 2),
+                'p95': round(percentile(values, 95), 2),
+                'p99': round(percentile(values, 99), 2),
+                'rps': round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+            }
+        return out
+
+
+class VirtualUser:
+    def __init__(self, session, recorder, manifest, index):
+        self.session = session
+        self.recorder = recorder
+        self.manifest = manifest
+        self.rng = random.Random(index)
+        addresses = manifest['addresses']
+        self.address = addresses[index % len(addresses)]
+        self.token = social_token(self.address)
+        mail_users = manifest.get('mail_users') or ['perfuser0']
+        self.mail_user = mail_users[index % len(mail_users)]
+        self.mail_token = email_token(self.mail_user)
+        self.socket = None
+        self.pending_echo = {}  # nonce -> send time, resolved by the socket listener
+
+    async def request(self, name, method, url, token, **kwargs):
+        headers = {'Authorization': f'Bearer {token}'}
+        start = time.perf_counter()
+        ok = False
+        try:
+            async with self.session.request(method, url, headers=headers, **kwargs) as resp:
+                body = await resp.read()
+                ok = resp.status < 400
+                return resp.status, body
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None, b''
+        finally:
+            self.recorder.record(name, (time.perf_counter() - start) * 1000, ok)
+
+    def api(self, name, method, path, **kwargs):
+        return self.request(name, method, API_URL + path, self.token, **kwargs)
+
+    def mail(self, name, method, path, **kwargs):
+        return self.request(name, method, EMAIL_API_URL + path, self.mail_token, **kwargs)
+
+
+# ========================================
+# SCENARIOS
+# ========================================
+
+async def scenario_feed(vu):
+    """Feed.jsx on mount: friends, stories, first page of posts."""
+    await asyncio.gather(
+        vu.api('GET /api/friends', 'GET', '/api/friends'),
+        vu.api('GET /api/stories', 'GET', '/api/stories'),
+        vu.api('GET /api/posts', 'GET', '/api/posts?limit=50&offset=0'),
+    )
+
+
+async def scenario_public_feed(vu):
+    """PublicFeed.jsx: the anonymous landing page."""
+    await asyncio.gather(
+        vu.api('GET /api/posts/public', 'GET', '/api/posts/public?limit=50&offset=0'),
+        vu.api('GET /api/stories/public', 'GET', '/api/stories/public'),
+    )
+
+
+async def scenario_channel_chat(vu):
+    """ChannelChat.jsx: open channel, page back once, send a message, observe socket fan-out."""
+    channel_id = vu.manifest['channel_id']
+    await vu.api('GET /api/channels/:id/messages', 'GET', f'/api/channels/{channel_id}/messages?limit=50')
+    if vu.rng.random() < 0.3:
+        await vu.api('GET /api/channels/:id/messages?before', 'GET',
+                     f'/api/channels/{channel_id}/messages?limit=50&before={vu.rng.randint(100, 1000)}')
+
+    nonce = f'perf-{vu.rng.getrandbits(48):x}'
+    if vu.socket is not None:
+        vu.pending_echo[nonce] = time.perf_counter()
+    await vu.api('POST /api/channels/:id/messages', 'POST', f'/api/channels/{channel_id}/messages',
+                 json={'content': f'load test message {nonce}'})
+
+
+async def scenario_insights(vu):
+    """Server settings -> Insights tab."""
+    group_id = vu.manifest['group_id']
+    await vu.api('GET /api/groups/:id/insights', 'GET', f'/api/groups/{group_id}/insights')
+
+
+async def scenario_inbox(vu):
+    """Webmail.jsx on mount: inbox page + unread counts."""
+    await asyncio.gather(
+        vu.mail('GET /api/email/messages', 'GET', '/api/email/messages?folder=inbox&page=1&limit=50'),
+        vu.mail('GET /api/email/unread', 'GET', '/api/email/unread'),
+    )
+
+
+async def scenario_mail_search(vu):
+    terms = vu.manifest.get('search_terms') or ['invoice']
+    await vu.mail('GET /api/email/search', 'GET',
+                  f'/api/email/search?q={vu.rng.choice(terms)}&folder=INBOX')
+
+
+SCENARIOS = {
+    'feed': scenario_feed,
+    'public_feed': scenario_public_feed,
+    'channel_chat': scenario_channel_chat,
+    'insights': scenario_insights,
+    'inbox': scenario_inbox,
+    'mail_search': scenario_mail_search,
+}
+
+# Scenarios that keep a socket.io connection per virtual user
+SOCKET_SCENARIOS = {'channel_chat'}
+
+
+async def attach_socket(vu):
+    """Join the seeded channel and time POST -> channel_message delivery."""
+    sio = socketio.AsyncClient(reconnection=False)
+
+    @sio.on('channel_message')
+    async def on_message(message):
+        content = (message or {}).get('content') or ''
+        nonce = content.rsplit(' ', 1)[-1]
+        sent_at = vu.pending_echo.pop(nonce, None)
+        if sent_at is not None:
+            vu.recorder.record('socket channel_message delivery', (time.perf_counter() - sent_at) * 1000, True)
+
+    start = time.perf_counter()
+    try:
+        await sio.connect(API_URL, transports=['websocket'])
+    except socketio.exceptions.ConnectionError:
+        vu.recorder.record('socket connect', (time.perf_counter() - start) * 1000, False)
+        return None
+    vu.recorder.record('socket connect', (time.perf_counter() - start) * 1000, True)
+    await sio.emit('join', vu.address)
+    await sio.emit('join_channel', vu.manifest['channel_id'])
+    return sio
+
+
+async def run_vu(session, recorder, manifest, index, scenario, deadline, think_ms):
+    vu = VirtualUser(session, recorder, manifest, index)
+    sio = vu.socket = await attach_socket(vu) if scenario in SOCKET_SCENARIOS else None
+    try:
+        while time.monotonic() < deadline:
+            await SCENARIOS[scenario](vu)
+            if think_ms:
+                await asyncio.sleep(vu.rng.uniform(0.5, 1.5) * think_ms / 1000)
+    finally:
+        if sio is not None:
+            await asyncio.sleep(0.5)  # let in-flight echoes land
+            lost = len(vu.pending_echo)
+            if lost:
+                recorder.errors['socket channel_message delivery'] += lost
+            await sio.disconnect()
+
+
+async def run_scenario(scenario, manifest, users, duration, think_ms, ramp_s):
+    recorder = Recorder()
+    timeout = aiohttp.ClientTimeout(total=30)
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        deadline = time.monotonic() + duration
+        tasks = []
+        for i in range(users):
+            tasks.append(asyncio.create_task(
+                run_vu(session, recorder, manifest, i, scenario, deadline, think_ms)))
+            if ramp_s:
+                await asyncio.sleep(ramp_s / users)
+        await asyncio.gather(*tasks)
+    recorder.finished = time.monotonic()
+    return recorder.summary()
+
+
+# ========================================
+# REPORTING & BASELINES
+# ========================================
+
+def print_report(scenario, summary):
+    print(f'\n== {scenario} ==')
+    print(f"{'request':<44}{'count':>8}{'err':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'rps':>9}")
+    for name, s in summary.items():
+        print(f"{name:<44}{s['count']:>8}{s['errors']:>6}{s['p50']:>9.1f}{s['p95']:>9.1f}{s['p99']:>9.1f}{s['rps']:>9.1f}")
+
+
+def compare(results, baselines, latency_tolerance, throughput_tolerance):
+    """Return a list of human-readable regressions (empty when everything is within tolerance)."""
+    regressions = []
+    for scenario, summary in results.items():
+        for name, current in summary.items():
+            base = baselines.get(scenario, {}).get(name)
+            if not base:
+                continue
+            for pct in ('p95', 'p99'):
+                limit = base[pct] * (1 + latency_tolerance)
+                if current[pct] > limit:
+                    regressions.append(f'{scenario} / {name}: {pct} {current[pct]:.1f}ms > {limit:.1f}ms '
+                                       f'(baseline {base[pct]:.1f}ms)')
+            floor = base['rps'] * (1 - throughput_tolerance)
+            if current['rps'] < floor:
+                regressions.append(f"{scenario} / {name}: throughput {current['rps']:.1f}/s < {floor:.1f}/s "
+                                   f"(baseline {base['rps']:.1f}/s)")
+            base_error_rate = base['errors'] / max(1, base['count'])
+            error_rate = current['errors'] / max(1, current['count'])
+            if error_rate > base_error_rate + 0.01:
+                regressions.append(f'{scenario} / {name}: error rate {error_rate:.1%} '
+                                   f'(baseline {base_error_rate:.1%})')
+    return regressions
+
+
+def cmd_run(args):
+    manifest = load_json(SEED_MANIFEST)
+    if not manifest:
+        sys.exit(f'No seed manifest at {SEED_MANIFEST} — run perf/seed.py first')
+
+    names = list(SCENARIOS) if 'all' in args.scenarios else args.scenarios
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        sys.exit(f"Unknown scenario(s): {', '.join(unknown)}. Choose from: {', '.join(SCENARIOS)}")
+
+    results = {}
+    for name in names:
+        summary = asyncio.run(run_scenario(name, manifest, args.users, args.duration, args.think_ms, args.ramp))
+        results[name] = summary
+        print_report(name, summary)
+
+    if args.output:
+        save_json(args.output, results)
+
+    if args.save_baseline:
+        baselines = load_json(BASELINES_FILE, {})
+        baselines.update(results)
+        save_json(BASELINES_FILE, baselines)
+        print(f'\nSaved baseline for {", ".join(names)} to {BASELINES_FILE}')
+
+    if args.compare:
+        baselines = load_json(BASELINES_FILE, {})
+        missing = [n for n in names if n not in baselines]
+        if missing:
+            print(f"\nNo baseline yet for: {', '.join(missing)} (skipped)")
+        regressions = compare(results, baselines, args.latency_tolerance, args.throughput_tolerance)
+        if regressions:
+            print('\nREGRESSIONS:')
+            for r in regressions:
+                print('  - ' + r)
+            sys.exit(1)
+        print('\nNo regressions against baseline.')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hyve load test / regression benchmark')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='run one or more scenarios')
+    run.add_argument('scenarios', nargs='+', help=f"scenario names or 'all' ({', '.join(SCENARIOS)})")
+    run.add_argument('--users', type=int, default=20, help='concurrent virtual users')
+    run.add_argument('--duration', type=float, default=30, help='seconds per scenario')
+    run.add_argument('--think-ms', type=float, default=250, help='mean pause between iterations per user')
+    run.add_argument('--ramp', type=float, default=2, help='seconds to ramp up all users')
+    run.add_argument('--output', help='write raw results JSON here')
+    run.add_argument('--save-baseline', action='store_true', help='store results as the new baseline')
+    run.add_argument('--compare', action='store_true', help='fail (exit 1) on regression against the baseline')
+    run.add_argument('--latency-tolerance', type=float, default=0.20, help='allowed p95/p99 growth (0.20 = +20%%)')
+    run.add_argument('--throughput-tolerance', type=float, default=0.15, help='allowed throughput drop')
+    run.set_defaults(func=cmd_run)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Seed a local perf stack with the data the load-test scenarios read.
+
+Postgres: users, a busy group with one text channel and message history, feed
+posts and stories. The API server must have been started once against the perf
+database first so its own schema/migrations exist (tmp_create_tables*.js cover
+the channel tables).
+
+Mail: delivers messages over SMTP to the IMAP/SMTP stand-in (GreenMail in
+perf/docker-compose.yml) so inbox listing and search have real mailboxes.
+
+Writes perf/.seed.json, which loadtest.py reads to find ids and accounts.
+
+Usage:
+    python perf/seed.py --users 200 --messages 2000 --posts 500 --mails 60
+"""
+
+import argparse
+import asyncio
+import random
+import smtplib
+from email.message import EmailMessage
+
+import asyncpg
+
+from common import (DATABASE_URL, MAIL_DOMAIN, SEED_MANIFEST, SMTP_HOST, SMTP_PORT,
+                    perf_address, save_json)
+
+WORDS = ('hyve chain wallet invoice launch meeting roadmap staking bridge governance '
+         'validator release airdrop design review weekly update community grant').split()
+SEARCH_TERMS = ['invoice', 'roadmap', 'validator', 'grant']
+
+
+def sentence(rng, n=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(n)).capitalize() + '.'
+
+
+async def seed_postgres(args, rng):
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        addresses = [perf_address(i) for i in range(args.users)]
+        await conn.executemany(
+            'INSERT INTO users (wallet_address, username, created_at) VALUES ($1, $2, NOW()) '
+            'ON CONFLICT DO NOTHING',
+            [(a, f'perfuser{i}') for i, a in enumerate(addresses)],
+        )
+
+        owner = addresses[0]
+        group_id = await conn.fetchval(
+            "INSERT INTO groups (name, description, owner_address, privacy) "
+            "VALUES ('Perf Server', 'Seeded by perf/seed.py', $1, 'public') RETURNING id",
+            owner,
+        )
+        await conn.executemany(
+            'INSERT INTO group_members (group_id, member_address, role) VALUES ($1, $2, $3) '
+            'ON CONFLICT DO NOTHING',
+            [(group_id, a, 'owner' if a == owner else 'member') for a in addresses],
+        )
+        channel_id = await conn.fetchval(
+            "INSERT INTO channels (group_id, name, position, is_default) VALUES ($1, 'general', 0, true) RETURNING id",
+            group_id,
+        )
+        await conn.executemany(
+            'INSERT INTO channel_messages (channel_id, user_address, content, created_at) '
+            "VALUES ($1, $2, $3, NOW() - ($4 || ' seconds')::interval)",
+            [(channel_id, rng.choice(addresses), sentence(rng), str(args.messages - i))
+             for i in range(args.messages)],
+        )
+
+        await conn.executemany(
+            'INSERT INTO posts (author_address, content, image_url, privacy, moderation_status, metadata, is_public) '
+            "VALUES ($1, $2, '', 0, 'approved', '{}', $3)",
+            [(rng.choice(addresses), sentence(rng, 30), i % 4 == 0) for i in range(args.posts)],
+        )
+        await conn.executemany(
+            "INSERT INTO stories (user_address, media_url, media_type, text, is_public) VALUES ($1, $2, 'image', $3, $4)",
+            [(rng.choice(addresses), '/default-avatar.png', sentence(rng, 5), i % 2 == 0)
+             for i in range(max(1, args.posts // 20))],
+        )
+    finally:
+        await conn.close()
+
+    return {'addresses': addresses, 'group_id': group_id, 'channel_id': channel_id}
+
+
+def seed_mail(args, rng):
+    usernames = [f'perfuser{i}' for i in range(args.mail_users)]
+    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as smtp:
+        for username in usernames:
+            for i in range(args.mails):
+                msg = EmailMessage()
+                msg['From'] = f'sender{i % 7}@example.com'
+                msg['To'] = f'{username}@{MAIL_DOMAIN}'
+                msg['Subject'] = f'{rng.choice(SEARCH_TERMS)} {sentence(rng, 4)}'
+                msg.set_content('\n\n'.join(sentence(rng, 40) for _ in range(5)))
+                smtp.send_message(msg)
+    return {'mail_users': usernames, 'search_terms': SEARCH_TERMS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed the local perf stack')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=2000, help='channel messages in the seeded channel')
+    parser.add_argument('--posts', type=int, default=500)
+    parser.add_argument('--mail-users', type=int, default=10)
+    parser.add_argument('--mails', type=int, default=60, help='messages per mailbox')
+    parser.add_argument('--skip-mail', action='store_true')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    manifest = asyncio.run(seed_postgres(args, rng))
+    print(f"Seeded {args.users} users, group {manifest['group_id']}, channel {manifest['channel_id']}")
+    if not args.skip_mail:
+        manifest.update(seed_mail(args, rng))
+        print(f'Delivered {args.mails} mails to each of {args.mail_users} mailboxes')
+
+    save_json(SEED_MANIFEST, manifest)
+    print(f'Wrote {SEED_MANIFEST}')
+
+
+if __name__ == '__main__':
+    main()
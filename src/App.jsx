@@ -4,13 +4,19 @@ import { MemoryRouter, Routes, Route, Navigate } from 'react-router-dom';
 import { AuthProvider } from './hooks/useAuth';
 import { useAuth } from './hooks/useAuth';
 
-const Layout = lazy(() => import('./components/Layout/Layout'));
+// Every route is its own chunk (sizes are checked against perf/bundle-budgets.json at build time)
+const loadLayout = () => import('./components/Layout/Layout');
+const loadFeed = () => import('./components/Feed/Feed');
+const loadProfile = () => import('./components/Profile/Profile');
+const loadNotifications = () => import('./components/Notifications/Notifications');
+
+const Layout = lazy(loadLayout);
 const Login = lazy(() => import('./components/Auth/Login'));
-const Feed = lazy(() => import('./components/Feed/Feed'));
+const Feed = lazy(loadFeed);
 const PublicFeed = lazy(() => import('./components/Feed/PublicFeed'));
-const Profile = lazy(() => import('./components/Profile/Profile'));
+const Profile = lazy(loadProfile);
 const Friends = lazy(() => import('./components/Friends/Friends'));
-const Notifications = lazy(() => import('./components/Notifications/Notifications'));
+const Notifications = lazy(loadNotifications);
 const Discover = lazy(() => import('./components/Discover/Discover'));
 const Groups = lazy(() => import('./components/Groups/Groups'));
 const GroupDetail = lazy(() => import('./components/Groups/GroupDetail'));
@@ -40,22 +46,25 @@ function LoadingScreen() {
   );
 }
 
+// Warm the chunks most sessions reach next, once the page is idle. Groups, webmail and
+// moderation load only when visited; nothing is prefetched on data-saver or 2G.
+function prefetchLikelyRoutes() {
+  const connection = typeof navigator !== 'undefined' ? navigator.connection : null;
+  if (connection?.saveData || /2g/.test(connection?.effectiveType || '')) return () => {};
+
+  const run = () => {
+    [loadLayout, loadFeed, loadProfile, loadNotifications].forEach((load) => load().catch(() => {}));
+  };
+  if (typeof window.requestIdleCallback === 'function') {
+    const handle = window.requestIdleCallback(run, { timeout: 5000 });
+    return () => window.cancelIdleCallback(handle);
+  }
+  const timer = setTimeout(run, 2000);
+  return () => clearTimeout(timer);
+}
+
 function App() {
-  useEffect(() => {
-    const preloads = [
-      import('./components/Layout/Layout'),
-      import('./components/Feed/Feed'),
-      import('./components/Profile/Profile'),
-      import('./components/Friends/Friends'),
-      import('./components/Notifications/Notifications'),
-      import('./components/Discover/Discover'),
-      import('./components/Groups/Groups'),
-      import('./components/Auth/Login'),
-      import('./components/Email/EmailSignup'),
-      import('./components/Email/Webmail')
-    ];
-    preloads.forEach((promise) => promise.catch(() => {}));
-  }, []);
+  useEffect(() => prefetchLikelyRoutes(), []);
 
   return (
     <AuthProvider>
@@ -2,7 +2,7 @@
 import { useState, useEffect, useRef, useCallback } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../../hooks/useAuth';
-import { setE2EESignature } from '../../utils/e2ee';
+import { setE2EESignature } from '../../utils/e2eeSession';
 import { IconShield, IconZap, IconUsers, IconLock, IconChat, IconGlobe, IconMailbox } from '../Icons/Icons';
 import './Login.css';
 
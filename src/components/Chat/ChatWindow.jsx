@@ -1,12 +1,14 @@
 // src/components/Chat/ChatWindow.jsx
-import { useState, useEffect, useRef, useLayoutEffect } from 'react';
+import { Suspense, lazy, useState, useEffect, useRef, useLayoutEffect } from 'react';
 import { useAuth } from '../../hooks/useAuth';
 import api from '../../services/api';
 import { CloseIcon, SmileIcon } from '../Icons/Icons';
-import GifPicker from '../GifPicker/GifPicker';
 import './Chat.css';
 import { formatDateTime } from '../../utils/date';
 
+// Loaded the first time the picker opens
+const GifPicker = lazy(() => import('../GifPicker/GifPicker'));
+
 export default function ChatWindow({ conversation, onClose }) {
   const { user, socket } = useAuth();
   const [messages, setMessages] = useState([]);
@@ -277,10 +279,12 @@ export default function ChatWindow({ conversation, onClose }) {
       </form>
       {showGifPicker && (
         <div className="chat-gif-picker-wrap">
-          <GifPicker
-            onSelect={handleSendGif}
-            onClose={() => setShowGifPicker(false)}
-          />
+          <Suspense fallback={null}>
+            <GifPicker
+              onSelect={handleSendGif}
+              onClose={() => setShowGifPicker(false)}
+            />
+          </Suspense>
         </div>
       )}
       {showEmojiPicker && (
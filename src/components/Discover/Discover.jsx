@@ -1,60 +1,65 @@
 // src/components/Discover/Discover.jsx
-import { useEffect, useMemo, useState } from 'react';
+import { useEffect, useMemo, useRef, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { useAuth } from '../../hooks/useAuth';
 import api from '../../services/api';
 import './Discover.css';
 
 export default function Discover() {
-  const { user } = useAuth();
   const navigate = useNavigate();
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchQuery, setSearchQuery] = useState('');
   const [users, setUsers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [suggested, setSuggested] = useState(true);
   const [friends, setFriends] = useState([]);
   const [pendingRequests, setPendingRequests] = useState({});
-
-  function getUserHandle(userObj) {
-    return (userObj?.username || userObj?.user?.username || userObj?.name || '').toLowerCase();
-  }
+  const requestSeqRef = useRef(0);
 
   useEffect(() => {
-    loadDiscover();
+    api.getFriends()
+      .then((friendsData) => setFriends(friendsData.friends || friendsData || []))
+      .catch((error) => console.error('Load friends error:', error));
   }, []);
 
-  async function loadDiscover() {
+  // Ranking, paging and block filtering happen server-side; typing only re-queries after a pause
+  useEffect(() => {
+    const timer = setTimeout(() => loadPeople(searchQuery.trim()), searchQuery ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
+
+  async function loadPeople(query) {
+    const seq = ++requestSeqRef.current;
     try {
       setLoading(true);
-      const [usersData, blockedData, friendsData] = await Promise.all([
-        api.getUsers(),
-        api.getBlockedUsers(),
-        api.getFriends()
-      ]);
-
-      const friendList = friendsData.friends || friendsData || [];
-      setFriends(friendList);
-
-      const blockedList = blockedData?.blocks || blockedData?.blocked || blockedData?.users || blockedData || [];
-      const blockedHandles = new Set(
-        (Array.isArray(blockedList) ? blockedList : [])
-          .map(getUserHandle)
-          .filter(Boolean)
-      );
-
-      const allUsers = usersData.users || usersData || [];
-      const filtered = allUsers
-        .filter((u) => getUserHandle(u) !== user?.username?.toLowerCase?.())
-        .filter((u) => {
-          const handle = getUserHandle(u);
-          if (handle && blockedHandles.has(handle)) return false;
-          return true;
-        });
+      const data = await api.discoverUsers(query);
+      if (seq !== requestSeqRef.current) return;
+      setUsers(data.users || []);
+      setNextCursor(data.nextCursor || null);
+      setSuggested(!!data.suggested);
+    } catch (error) {
+      if (seq === requestSeqRef.current) console.error('Load discover error:', error);
+    } finally {
+      if (seq === requestSeqRef.current) setLoading(false);
+    }
+  }
 
-      setUsers(filtered);
+  async function loadMore() {
+    if (!nextCursor || loadingMore) return;
+    const seq = requestSeqRef.current;
+    try {
+      setLoadingMore(true);
+      const data = await api.discoverUsers(searchQuery.trim(), { cursor: nextCursor });
+      if (seq !== requestSeqRef.current) return;
+      setUsers((prev) => {
+        const seen = new Set(prev.map((u) => u.wallet_address));
+        return [...prev, ...(data.users || []).filter((u) => !seen.has(u.wallet_address))];
+      });
+      setNextCursor(data.nextCursor || null);
     } catch (error) {
-      console.error('Load discover error:', error);
+      console.error('Load more people error:', error);
     } finally {
-      setLoading(false);
+      setLoadingMore(false);
     }
   }
 
@@ -69,11 +74,6 @@ export default function Discover() {
     }
   }
 
-  const filteredUsers = useMemo(() => {
-    if (!searchQuery) return users;
-    return users.filter((u) => u.username?.toLowerCase().includes(searchQuery.toLowerCase()));
-  }, [users, searchQuery]);
-
   const friendHandleSet = useMemo(() => {
     return new Set(
       (friends || [])
@@ -100,26 +100,26 @@ export default function Discover() {
         </div>
       </div>
 
-      {loading ? (
+      {loading && users.length === 0 ? (
         <div className="discover-loading">Loading people...</div>
       ) : (
         <div className="discover-layout">
           <section className="discover-section">
             <div className="section-header">
-              <h2>People on Hyve Social</h2>
-              <span>{filteredUsers.length} people</span>
+              <h2>{suggested ? 'Suggested for you' : 'People on Hyve Social'}</h2>
+              <span>{users.length}{nextCursor ? '+' : ''} people</span>
             </div>
-            {filteredUsers.length === 0 ? (
+            {users.length === 0 ? (
               <div className="discover-empty">No users found.</div>
             ) : (
               <div className="users-grid">
-                {filteredUsers.map((person) => {
+                {users.map((person) => {
                   const username = person.username || person.name || 'User';
                   const profileHandle = person.username || person.name || '';
                   const isFriend = friendHandleSet.has(username.toLowerCase());
                   return (
                     <div
-                      key={username}
+                      key={person.wallet_address || username}
                       className="user-card"
                       role="button"
                       tabIndex={0}
@@ -148,6 +148,9 @@ export default function Discover() {
                         <div>
                           <div className="user-name">{person.username}</div>
                           {person.bio && <div className="user-bio">{person.bio}</div>}
+                          {person.mutual_count > 0 && (
+                            <div className="user-mutual">{person.mutual_count} mutual</div>
+                          )}
                         </div>
                       </div>
                       {isFriend ? (
@@ -169,6 +172,11 @@ export default function Discover() {
                 })}
               </div>
             )}
+            {nextCursor && (
+              <button className="discover-load-more" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            )}
           </section>
         </div>
       )}
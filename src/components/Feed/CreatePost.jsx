@@ -1,12 +1,14 @@
 // src/components/Feed/CreatePost.jsx
-import { useState, useRef, useCallback } from 'react';
+import { Suspense, lazy, useState, useRef, useCallback } from 'react';
 import { useAuth } from '../../hooks/useAuth';
 import api from '../../services/api';
 import { compressImage } from '../../utils/imageCompression';
 import { CameraIcon, SmileIcon, CloseIcon } from '../Icons/Icons';
-import GifPicker from '../GifPicker/GifPicker';
 import './CreatePost.css';
 
+// Loaded the first time the picker opens
+const GifPicker = lazy(() => import('../GifPicker/GifPicker'));
+
 // ── Text background presets (Facebook-style) ──────────────────────
 const TEXT_BACKGROUNDS = [
   { id: null, label: 'None', style: {} },
@@ -828,15 +830,17 @@ export default function CreatePost({ onPostCreated, groupId = null, contextLabel
 
         {/* GIF picker */}
         {showGifPicker && !imageFile && (
-          <GifPicker
-            onSelect={(gif) => {
-              setSelectedGif(gif);
-              setShowGifPicker(false);
-              setImageFile(null);
-              setImagePreview('');
-            }}
-            onClose={() => setShowGifPicker(false)}
-          />
+          <Suspense fallback={null}>
+            <GifPicker
+              onSelect={(gif) => {
+                setSelectedGif(gif);
+                setShowGifPicker(false);
+                setImageFile(null);
+                setImagePreview('');
+              }}
+              onClose={() => setShowGifPicker(false)}
+            />
+          </Suspense>
         )}
 
         {/* Emoji picker */}
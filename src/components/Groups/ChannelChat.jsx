@@ -1,10 +1,12 @@
-import { useCallback, useEffect, useRef, useState } from 'react';
+import { Suspense, lazy, useCallback, useEffect, useRef, useState } from 'react';
 import api from '../../services/api';
 import socketService from '../../services/socket';
 import { formatDate, formatDateTime } from '../../utils/date';
-import GifPicker from '../GifPicker/GifPicker';
 import './ChannelChat.css';
 
+// Loaded the first time the picker opens
+const GifPicker = lazy(() => import('../GifPicker/GifPicker'));
+
 // Common emoji grid for quick picking
 const EMOJI_LIST = [
   '😀','😂','😍','🥰','😎','🤔','😮','😢','😡','🥳',
@@ -23,6 +25,15 @@ function extractUrls(text) {
   return [...new Set(text.match(urlRegex) || [])];
 }
 
+// Search snippets mark matched terms with \u0001…\u0002 (never HTML)
+function renderHighlight(snippet) {
+  return snippet.split('\u0001').map((part, i) => {
+    if (i === 0) return part;
+    const [hit, rest = ''] = part.split('\u0002');
+    return <span key={i}><mark className="channel-search-hit">{hit}</mark>{rest}</span>;
+  });
+}
+
 export default function ChannelChat({ channel, groupId, user, isAdmin, onToggleMembers, showMembers, members = [] }) {
   const [messages, setMessages] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -39,6 +50,7 @@ export default function ChannelChat({ channel, groupId, user, isAdmin, onToggleM
   const [searchQuery, setSearchQuery] = useState('');
   const [searchResults, setSearchResults] = useState(null);
   const [searchLoading, setSearchLoading] = useState(false);
+  const [searchCursor, setSearchCursor] = useState(null);
   const [reactionPickerMsgId, setReactionPickerMsgId] = useState(null);
   const [lightboxUrl, setLightboxUrl] = useState(null);
   const [showPinnedPanel, setShowPinnedPanel] = useState(false);
@@ -92,6 +104,7 @@ export default function ChannelChat({ channel, groupId, user, isAdmin, onToggleM
   const inputRef = useRef(null);
   const fileInputRef = useRef(null);
   const searchTimeoutRef = useRef(null);
+  const searchSeqRef = useRef(0);
 
   const myUsername = (user?.username || '').toLowerCase();
   const myAddress = (user?.wallet_address || user?.walletAddress || '').toLowerCase();
@@ -302,6 +315,19 @@ export default function ChannelChat({ channel, groupId, user, isAdmin, onToggleM
       api.acknowledgeChannel(channel.id, msg.id).catch(() => {});
     };
 
+    // Announcements from followed channels arrive coalesced: one event per room per delivery tick
+    const handleMessageBatch = ({ channelId, messages: batch }) => {
+      if (Number(channelId) !== Number(channel.id) || !batch?.length) return;
+      setMessages((prev) => {
+        const seen = new Set(prev.map((m) => m.id));
+        const fresh = batch
+          .filter((m) => !seen.has(m.id))
+          .map((m) => ({ ...m, reactions: m.reactions || [], thread: m.thread || null }));
+        return fresh.length ? [...prev, ...fresh] : prev;
+      });
+      api.acknowledgeChannel(channel.id, batch[batch.length - 1].id).catch(() => {});
+    };
+
     const handleDeletedMessage = ({ messageId }) => {
       setMessages((prev) => prev.filter((m) => m.id !== messageId));
     };
@@ -334,6 +360,7 @@ export default function ChannelChat({ channel, groupId, user, isAdmin, onToggleM
     };
 
     socketService.socket.on('channel_message', handleNewMessage);
+    socketService.socket.on('channel_messages_batch', handleMessageBatch);
     socketService.socket.on('channel_message_deleted', handleDeletedMessage);
     socketService.socket.on('channel_message_edited', handleEditedMessage);
     socketService.socket.on('channel_typing', handleTyping);
@@ -344,6 +371,7 @@ export default function ChannelChat({ channel, groupId, user, isAdmin, onToggleM
     return () => {
       socketService.socket.emit('leave_channel', channel.id);
       socketService.socket.off('channel_message', handleNewMessage);
+      socketService.socket.off('channel_messages_batch', handleMessageBatch);
       socketService.socket.off('channel_message_deleted', handleDeletedMessage);
       socketService.socket.off('channel_message_edited', handleEditedMessage);
       socketService.socket.off('channel_typing', handleTyping);
@@ -503,7 +531,11 @@ export default function ChannelChat({ channel, groupId, user, isAdmin, onToggleM
   const handleAddReaction = async (msgId, emoji) => {
     setReactionPickerMsgId(null);
     try {
-      await api.toggleReaction(channel.id, msgId, emoji);
+      const data = await api.toggleReaction(channel.id, msgId, emoji);
+      // The room broadcast is coalesced server-side; show our own change right away
+      if (Array.isArray(data?.reactions)) {
+        setMessages((prev) => prev.map((m) => m.id !== msgId ? m : { ...m, reactions: data.reactions }));
+      }
     } catch (err) {
       console.error('Failed to toggle reaction:', err);
     }
@@ -564,21 +596,42 @@ export default function ChannelChat({ channel, groupId, user, isAdmin, onToggleM
   const handleSearchChange = (query) => {
     setSearchQuery(query);
     clearTimeout(searchTimeoutRef.current);
-    if (!query || query.length < 2) { setSearchResults(null); return; }
+    const seq = ++searchSeqRef.current;
+    setSearchCursor(null);
+    if (!query || query.length < 2) { setSearchResults(null); setSearchLoading(false); return; }
     setSearchLoading(true);
     searchTimeoutRef.current = setTimeout(async () => {
       try {
         const data = await api.searchGroupMessages(groupId, query, { channelId: channel.id, limit: 25 });
+        if (seq !== searchSeqRef.current) return; // a newer query is in flight
         setSearchResults(data.results || []);
+        setSearchCursor(data.nextCursor || null);
       } catch (err) {
+        if (seq !== searchSeqRef.current) return;
         const filtered = messages.filter(m => m.content?.toLowerCase().includes(query.toLowerCase()));
         setSearchResults(filtered);
       } finally {
-        setSearchLoading(false);
+        if (seq === searchSeqRef.current) setSearchLoading(false);
       }
     }, 400);
   };
 
+  const loadMoreSearchResults = async () => {
+    if (!searchCursor || searchLoading) return;
+    const seq = searchSeqRef.current;
+    setSearchLoading(true);
+    try {
+      const data = await api.searchGroupMessages(groupId, searchQuery, { channelId: channel.id, limit: 25, cursor: searchCursor });
+      if (seq !== searchSeqRef.current) return;
+      setSearchResults(prev => [...(prev || []), ...(data.results || [])]);
+      setSearchCursor(data.nextCursor || null);
+    } catch (err) {
+      console.error('Failed to load more search results:', err);
+    } finally {
+      if (seq === searchSeqRef.current) setSearchLoading(false);
+    }
+  };
+
   // ── Poll creation ──
   const handleCreatePoll = async () => {
     const validOpts = pollOptions.filter(o => o.trim());
@@ -944,9 +997,9 @@ export default function ChannelChat({ channel, groupId, user, isAdmin, onToggleM
           />
           {searchLoading && <span className="channel-search-count">Searching...</span>}
           {!searchLoading && searchResults && (
-            <span className="channel-search-count">{searchResults.length} result{searchResults.length !== 1 ? 's' : ''}</span>
+            <span className="channel-search-count">{searchResults.length}{searchCursor ? '+' : ''} result{searchResults.length !== 1 ? 's' : ''}</span>
           )}
-          <button onClick={() => { setShowSearch(false); setSearchQuery(''); setSearchResults(null); }}>✕</button>
+          <button onClick={() => { searchSeqRef.current++; setShowSearch(false); setSearchQuery(''); setSearchResults(null); setSearchCursor(null); }}>✕</button>
         </div>
       )}
 
@@ -961,10 +1014,15 @@ export default function ChannelChat({ channel, groupId, user, isAdmin, onToggleM
                   <span className="channel-search-result-user">{msg.username || 'Unknown'}</span>
                   <span className="channel-search-result-time">{new Date(msg.created_at).toLocaleString()}</span>
                 </div>
-                <div className="channel-search-result-text">{msg.content}</div>
+                <div className="channel-search-result-text">{msg.highlight ? renderHighlight(msg.highlight) : msg.content}</div>
               </div>
             </div>
           ))}
+          {searchCursor && (
+            <button className="channel-search-more" onClick={loadMoreSearchResults} disabled={searchLoading}>
+              {searchLoading ? 'Loading...' : 'Load more results'}
+            </button>
+          )}
         </div>
       )}
 
@@ -1024,8 +1082,9 @@ export default function ChannelChat({ channel, groupId, user, isAdmin, onToggleM
           </div>
         ) : (
           (() => {
+            // Results arrive ranked by relevance; the timeline shows them in time order
             const filtered = searchQuery && searchResults
-              ? searchResults
+              ? [...searchResults].sort((a, b) => new Date(a.created_at) - new Date(b.created_at))
               : messages;
             let lastDate = null;
             return filtered.map((msg, idx, arr) => {
@@ -1341,10 +1400,12 @@ export default function ChannelChat({ channel, groupId, user, isAdmin, onToggleM
       {/* GIF picker */}
       {showGifPicker && (
         <div className="channel-gif-picker-wrap">
-          <GifPicker
-            onSelect={handleGifSelect}
-            onClose={() => setShowGifPicker(false)}
-          />
+          <Suspense fallback={null}>
+            <GifPicker
+              onSelect={handleGifSelect}
+              onClose={() => setShowGifPicker(false)}
+            />
+          </Suspense>
         </div>
       )}
 
@@ -1,12 +1,15 @@
 // src/components/Groups/DmChat.jsx — Discord-style DM chat view
 // Features: edit, delete, typing indicators, reactions, file attachments, markdown, reply-to
-import { useState, useEffect, useRef, useLayoutEffect, useCallback } from 'react';
+import { Suspense, lazy, useState, useEffect, useRef, useLayoutEffect, useCallback } from 'react';
 import { useAuth } from '../../hooks/useAuth';
 import api from '../../services/api';
 import socketService from '../../services/socket';
 import { SmileIcon } from '../Icons/Icons';
-import GifPicker from '../GifPicker/GifPicker';
 import { formatDateTime } from '../../utils/date';
+import { isEncryptedMessage } from '../../utils/e2eeSession';
+
+// Loaded the first time the picker opens
+const GifPicker = lazy(() => import('../GifPicker/GifPicker'));
 
 const EMOJI_LIST = [
   '😀','😂','😍','🥰','😎','🤔','😮','😢','😡','🥳',
@@ -41,6 +44,8 @@ export default function DmChat({ selectedUser, onBack }) {
   const [searchQuery, setSearchQuery] = useState('');
   const [showJumpToPresent, setShowJumpToPresent] = useState(false);
   const [sending, setSending] = useState(false);
+  // ciphertext -> plaintext (null when it can't be decrypted); filled in by the E2EE worker
+  const [plaintexts, setPlaintexts] = useState(() => new Map());
 
   const messagesEndRef = useRef(null);
   const messagesContainerRef = useRef(null);
@@ -67,6 +72,7 @@ export default function DmChat({ selectedUser, onBack }) {
   useEffect(() => {
     if (!targetUsername) { setLoading(false); return; }
     setMessages([]);
+    setPlaintexts(new Map());
     hasInitialScrollRef.current = false;
     setEditingId(null);
     setReplyTo(null);
@@ -135,6 +141,43 @@ export default function DmChat({ selectedUser, onBack }) {
     };
   }, [targetUsername, socket]);
 
+  // ── Decrypt E2EE messages off the main thread, newest first ──
+  useEffect(() => {
+    const pending = [...new Set(
+      messages.filter(isEncryptedMessage).map((m) => m.content).filter((c) => !plaintexts.has(c))
+    )].reverse();
+    if (pending.length === 0) return;
+    const controller = new AbortController();
+    (async () => {
+      try {
+        // libsodium and the worker are only loaded once an encrypted message shows up
+        const { decryptMessageBatch } = await import('../../utils/e2ee');
+        await decryptMessageBatch(pending, {
+          signal: controller.signal,
+          onResults: (results) => {
+            if (controller.signal.aborted) return;
+            setPlaintexts((prev) => {
+              const next = new Map(prev);
+              results.forEach(({ content, plaintext }) => next.set(content, plaintext));
+              return next;
+            });
+          }
+        });
+      } catch (err) {
+        console.error('DmChat decrypt error:', err);
+        // Keys couldn't be unlocked: show the messages as undecryptable instead of pending
+        if (!controller.signal.aborted) {
+          setPlaintexts((prev) => {
+            const next = new Map(prev);
+            pending.forEach((content) => { if (!next.has(content)) next.set(content, null); });
+            return next;
+          });
+        }
+      }
+    })();
+    return () => controller.abort();
+  }, [messages]);
+
   // ── Load profile data for right panel ──
   useEffect(() => {
     if (!targetUsername) return;
@@ -442,12 +485,20 @@ export default function DmChat({ selectedUser, onBack }) {
     messagesEndRef.current?.scrollIntoView({ behavior });
   }
 
+  // Encrypted messages render their plaintext once the worker has it
+  const readableMessages = messages.map((msg) => {
+    if (!isEncryptedMessage(msg)) return msg;
+    const plaintext = plaintexts.get(msg.content);
+    const content = plaintext ?? (plaintexts.has(msg.content) ? '🔒 Unable to decrypt this message' : '🔒 Decrypting…');
+    return { ...msg, content, _encrypted: true };
+  });
+
   // ── Build grouped messages with date dividers ──
   const grouped = [];
   let lastDateStr = '';
-  messages.forEach((msg, i) => {
+  readableMessages.forEach((msg, i) => {
     const from = getMsgFrom(msg);
-    const prev = i > 0 ? messages[i - 1] : null;
+    const prev = i > 0 ? readableMessages[i - 1] : null;
     const prevFrom = prev ? getMsgFrom(prev) : '';
     const timeDiff = prev ? (new Date(msg.created_at || msg.createdAt || 0) - new Date(prev.created_at || prev.createdAt || 0)) : Infinity;
     const isGrouped = from === prevFrom && timeDiff < 7 * 60 * 1000;
@@ -520,7 +571,7 @@ export default function DmChat({ selectedUser, onBack }) {
           />
           {searchQuery && (
             <span className="dm-search-count">
-              {messages.filter((m) => m.content?.toLowerCase().includes(searchQuery.toLowerCase())).length} results
+              {readableMessages.filter((m) => m.content?.toLowerCase().includes(searchQuery.toLowerCase())).length} results
             </span>
           )}
           <button onClick={() => { setShowSearch(false); setSearchQuery(''); }}>✕</button>
@@ -553,7 +604,7 @@ export default function DmChat({ selectedUser, onBack }) {
 
               // Find replied message
               const replyId = msg.reply_to || (msg.content?.match(/^\[reply:(\d+)\]/)?.[1]);
-              const repliedMsg = replyId ? messages.find((m) => (m.id || m.message_id) == replyId) : null;
+              const repliedMsg = replyId ? readableMessages.find((m) => (m.id || m.message_id) == replyId) : null;
               const displayContent = msg.content?.replace(/^\[reply:\d+\]/, '') || msg.content;
 
               return (
@@ -629,7 +680,7 @@ export default function DmChat({ selectedUser, onBack }) {
                         <div className="dm-msg-actions">
                           <button title="Add Reaction" onClick={() => setReactionPickerMsgId((p) => p === msgId ? null : msgId)}>😊</button>
                           <button title="Reply" onClick={() => setReplyTo(msg)}>↩</button>
-                          {isOwn && <button title="Edit" onClick={() => { setEditingId(msgId); setEditText(displayContent); }}>✏️</button>}
+                          {isOwn && !msg._encrypted && <button title="Edit" onClick={() => { setEditingId(msgId); setEditText(displayContent); }}>✏️</button>}
                           {isOwn && <button title="Delete" onClick={() => handleDelete(msgId)}>🗑️</button>}
                         </div>
                       )}
@@ -715,7 +766,7 @@ export default function DmChat({ selectedUser, onBack }) {
                         <div className="dm-msg-actions">
                           <button title="Add Reaction" onClick={() => setReactionPickerMsgId((p) => p === msgId ? null : msgId)}>😊</button>
                           <button title="Reply" onClick={() => setReplyTo(msg)}>↩</button>
-                          {isOwn && <button title="Edit" onClick={() => { setEditingId(msgId); setEditText(displayContent); }}>✏️</button>}
+                          {isOwn && !msg._encrypted && <button title="Edit" onClick={() => { setEditingId(msgId); setEditText(displayContent); }}>✏️</button>}
                           {isOwn && <button title="Delete" onClick={() => handleDelete(msgId)}>🗑️</button>}
                         </div>
                       )}
@@ -847,7 +898,9 @@ export default function DmChat({ selectedUser, onBack }) {
       {/* ── GIF picker ── */}
       {showGifPicker && (
         <div className="dm-gif-picker-wrap">
-          <GifPicker onSelect={handleSendGif} onClose={() => setShowGifPicker(false)} />
+          <Suspense fallback={null}>
+            <GifPicker onSelect={handleSendGif} onClose={() => setShowGifPicker(false)} />
+          </Suspense>
         </div>
       )}
 
@@ -1,4 +1,4 @@
-import { useCallback, useEffect, useMemo, useRef, useState } from 'react';
+import { Suspense, lazy, useCallback, useEffect, useMemo, useRef, useState } from 'react';
 import { createPortal } from 'react-dom';
 import { Link, useNavigate, useParams } from 'react-router-dom';
 import api from '../../services/api';
@@ -7,18 +7,21 @@ import CreatePost from '../Feed/CreatePost';
 import Post from '../Post/Post';
 import ChannelChat from './ChannelChat';
 import MemberSidebar from './MemberSidebar';
-import UserSettings from './UserSettings';
-import ServerSettings from './ServerSettings';
 import { compressImage } from '../../utils/imageCompression';
 import { formatDate, formatDateTime } from '../../utils/date';
 import { IconArrowLeft } from '../Icons/Icons';
-import DmChat from './DmChat';
-import DmFriends from './DmFriends';
-import DmDiscover from './DmDiscover';
-import Notifications from '../Notifications/Notifications';
-import Profile from '../Profile/Profile';
 import './GroupDetail.css';
 
+// Views a server visit may never open: DMs, the mobile notification / profile panes and the
+// settings modals each load on first use instead of riding along with the channel view
+const UserSettings = lazy(() => import('./UserSettings'));
+const ServerSettings = lazy(() => import('./ServerSettings'));
+const DmChat = lazy(() => import('./DmChat'));
+const DmFriends = lazy(() => import('./DmFriends'));
+const DmDiscover = lazy(() => import('./DmDiscover'));
+const Notifications = lazy(() => import('../Notifications/Notifications'));
+const Profile = lazy(() => import('../Profile/Profile'));
+
 export default function GroupDetail() {
   const { groupId } = useParams();
   const navigate = useNavigate();
@@ -1467,12 +1470,16 @@ export default function GroupDetail() {
     {isMobile && mobileNotifView ? (
       /* ════════ MOBILE NOTIFICATIONS VIEW ════════ */
       <div className="discord-server discord-mobile-notif-view">
-        <Notifications />
+        <Suspense fallback={null}>
+          <Notifications />
+        </Suspense>
       </div>
     ) : isMobile && mobileProfileView ? (
       /* ════════ MOBILE PROFILE VIEW ════════ */
       <div className="discord-server discord-mobile-profile-view">
-        <Profile handle={user?.username} />
+        <Suspense fallback={null}>
+          <Profile handle={user?.username} />
+        </Suspense>
       </div>
     ) : dmMode ? (
       /* ════════ DM MODE LAYOUT ════════ */
@@ -1563,24 +1570,26 @@ export default function GroupDetail() {
 
         {/* DM main area */}
         <div className="discord-main discord-dm-main">
-          {dmSelectedUser ? (
-            <DmChat
-              selectedUser={dmSelectedUser}
-              onBack={() => setDmSelectedUser(null)}
-            />
-          ) : dmView === 'friends' ? (
-            <DmFriends onSelectUser={(u) => { setDmSelectedUser(u); setDmView('conversations'); }} />
-          ) : dmView === 'discover' ? (
-            <DmDiscover onJoinServer={(gid) => { setDmMode(false); navigate(`/groups/${gid}`); }} />
-          ) : (
-            <div className="discord-dm-welcome">
-              <div className="discord-dm-welcome-icon">
-                <svg width="60" height="60" viewBox="0 0 24 24" fill="currentColor" opacity="0.4"><path d="M16.5 13c-1.2 0-3.07.34-4.5 1-1.43-.67-3.3-1-4.5-1C5.33 13 1 14.08 1 16.25V19h22v-2.75c0-2.17-4.33-3.25-6.5-3.25zm-4 4.5h-10v-1.25c0-.54 2.56-1.75 5-1.75s5 1.21 5 1.75v1.25zm9 0H14v-1.25c0-.46-.2-.86-.52-1.22.88-.3 1.96-.53 3.02-.53 2.44 0 5 1.21 5 1.75v1.25zM7.5 12c1.93 0 3.5-1.57 3.5-3.5S9.43 5 7.5 5 4 6.57 4 8.5 5.57 12 7.5 12zm9 0c1.93 0 3.5-1.57 3.5-3.5S18.43 5 16.5 5 13 6.57 13 8.5s1.57 3.5 3.5 3.5z"/></svg>
+          <Suspense fallback={null}>
+            {dmSelectedUser ? (
+              <DmChat
+                selectedUser={dmSelectedUser}
+                onBack={() => setDmSelectedUser(null)}
+              />
+            ) : dmView === 'friends' ? (
+              <DmFriends onSelectUser={(u) => { setDmSelectedUser(u); setDmView('conversations'); }} />
+            ) : dmView === 'discover' ? (
+              <DmDiscover onJoinServer={(gid) => { setDmMode(false); navigate(`/groups/${gid}`); }} />
+            ) : (
+              <div className="discord-dm-welcome">
+                <div className="discord-dm-welcome-icon">
+                  <svg width="60" height="60" viewBox="0 0 24 24" fill="currentColor" opacity="0.4"><path d="M16.5 13c-1.2 0-3.07.34-4.5 1-1.43-.67-3.3-1-4.5-1C5.33 13 1 14.08 1 16.25V19h22v-2.75c0-2.17-4.33-3.25-6.5-3.25zm-4 4.5h-10v-1.25c0-.54 2.56-1.75 5-1.75s5 1.21 5 1.75v1.25zm9 0H14v-1.25c0-.46-.2-.86-.52-1.22.88-.3 1.96-.53 3.02-.53 2.44 0 5 1.21 5 1.75v1.25zM7.5 12c1.93 0 3.5-1.57 3.5-3.5S9.43 5 7.5 5 4 6.57 4 8.5 5.57 12 7.5 12zm9 0c1.93 0 3.5-1.57 3.5-3.5S18.43 5 16.5 5 13 6.57 13 8.5s1.57 3.5 3.5 3.5z"/></svg>
+                </div>
+                <h2>Select a conversation</h2>
+                <p>Choose a friend from the sidebar to start chatting</p>
               </div>
-              <h2>Select a conversation</h2>
-              <p>Choose a friend from the sidebar to start chatting</p>
-            </div>
-          )}
+            )}
+          </Suspense>
         </div>
       </div>
     ) : (
@@ -2632,39 +2641,45 @@ export default function GroupDetail() {
     )}
 
     {/* ── User Settings Modal ── */}
-    {showUserSettings && <UserSettings onClose={() => setShowUserSettings(false)} />}
+    {showUserSettings && (
+      <Suspense fallback={null}>
+        <UserSettings onClose={() => setShowUserSettings(false)} />
+      </Suspense>
+    )}
 
     {/* ── Server Settings Modal ── */}
     {showServerSettings && (
-      <ServerSettings
-        group={group}
-        groupId={groupId}
-        members={members}
-        bannedMembers={bannedMembers}
-        requests={requests}
-        customRoles={customRoles}
-        channels={channels}
-        categories={categories}
-        postingPermission={postingPermission}
-        setPostingPermission={setPostingPermission}
-        requirePostApproval={requirePostApproval}
-        setRequirePostApproval={setRequirePostApproval}
-        adminsBypassApproval={adminsBypassApproval}
-        setAdminsBypassApproval={setAdminsBypassApproval}
-        onClose={() => setShowServerSettings(false)}
-        onRefreshGroup={() => refreshGroup(groupId)}
-        onRefreshMembers={() => refreshMembers(groupId)}
-        onRefreshRoles={() => refreshRoles(groupId)}
-        onSavePostingPermission={handleSavePostingPermission}
-        onSaveModeration={handleSaveModeration}
-        onApprove={handleApprove}
-        onDecline={handleDecline}
-        onUnban={handleUnban}
-        onDeleteGroup={handleDeleteGroup}
-        isOwner={isOwner}
-        busy={busy}
-        setBusy={setBusy}
-      />
+      <Suspense fallback={null}>
+        <ServerSettings
+          group={group}
+          groupId={groupId}
+          members={members}
+          bannedMembers={bannedMembers}
+          requests={requests}
+          customRoles={customRoles}
+          channels={channels}
+          categories={categories}
+          postingPermission={postingPermission}
+          setPostingPermission={setPostingPermission}
+          requirePostApproval={requirePostApproval}
+          setRequirePostApproval={setRequirePostApproval}
+          adminsBypassApproval={adminsBypassApproval}
+          setAdminsBypassApproval={setAdminsBypassApproval}
+          onClose={() => setShowServerSettings(false)}
+          onRefreshGroup={() => refreshGroup(groupId)}
+          onRefreshMembers={() => refreshMembers(groupId)}
+          onRefreshRoles={() => refreshRoles(groupId)}
+          onSavePostingPermission={handleSavePostingPermission}
+          onSaveModeration={handleSaveModeration}
+          onApprove={handleApprove}
+          onDecline={handleDecline}
+          onUnban={handleUnban}
+          onDeleteGroup={handleDeleteGroup}
+          isOwner={isOwner}
+          busy={busy}
+          setBusy={setBusy}
+        />
+      </Suspense>
     )}
 
     {/* ── Create Server Modal ── */}
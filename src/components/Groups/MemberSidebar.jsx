@@ -1,85 +1,181 @@
-import { useCallback, useEffect, useState } from 'react';
+import { useCallback, useEffect, useRef, useState } from 'react';
 import api from '../../services/api';
 import socketService from '../../services/socket';
 import './MemberSidebar.css';
 
 const DEFAULT_AVATAR = "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 40 40'%3E%3Crect width='40' height='40' fill='%235865f2'/%3E%3Ctext x='50%25' y='54%25' text-anchor='middle' dominant-baseline='middle' fill='white' font-size='18' font-family='sans-serif'%3E%3F%3C/text%3E%3C/svg%3E";
 
+// Virtualized list: every row (section header or member) is ROW_HEIGHT tall,
+// and rows are fetched from the server in CHUNK_SIZE ranges as they scroll into view.
+const ROW_HEIGHT = 44;
+const CHUNK_SIZE = 100;
+const OVERSCAN = 10;
+const LAGGING_RETRY_MS = 500;
+
 export default function MemberSidebar({ groupId, user, isAdmin, isOwner, onMemberClick }) {
-  const [members, setMembers] = useState([]);
-  const [onlineUsernames, setOnlineUsernames] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [rows, setRows] = useState(() => new Map()); // row index -> row
+  const [presence, setPresence] = useState(() => new Map()); // address -> online (pushed diffs)
   const [loading, setLoading] = useState(true);
+  const [viewport, setViewport] = useState({ scrollTop: 0, height: 800 });
+
+  const containerRef = useRef(null);
+  const versionRef = useRef(0);
+  const loadedChunks = useRef(new Set());
+  const pendingChunks = useRef(new Set());
+  const groupRef = useRef(groupId);
 
-  const loadMembers = useCallback(async () => {
-    if (!groupId) return;
+  const loadChunk = useCallback(async (chunk) => {
+    if (!groupId || loadedChunks.current.has(chunk) || pendingChunks.current.has(chunk)) return;
+    pendingChunks.current.add(chunk);
+    let lagging = false;
     try {
-      const data = await api.getMembersWithRoles(groupId);
-      setMembers(data?.members || []);
+      const data = await api.getMemberListRange(groupId, chunk * CHUNK_SIZE, CHUNK_SIZE);
+      if (data.version < versionRef.current) {
+        // Served by a worker that has not seen the latest change yet — ask again shortly
+        lagging = true;
+        return;
+      }
+      const stale = data.version > versionRef.current;
+      if (stale) {
+        // List changed since the other chunks were fetched — start over from this one
+        loadedChunks.current = new Set();
+        versionRef.current = data.version;
+        setPresence(new Map());
+      }
+      loadedChunks.current.add(chunk);
+      setTotal(data.total);
+      setRows((prev) => {
+        const next = stale ? new Map() : new Map(prev);
+        data.rows.forEach((row) => next.set(row.index, row));
+        return next;
+      });
     } catch {
-      // fallback to regular members
-      try {
-        const data = await api.getGroupMembers(groupId);
-        setMembers((data?.members || []).map((m) => ({ ...m, custom_roles: [] })));
-      } catch { setMembers([]); }
+      // leave the chunk unloaded; it is retried on the next scroll
     } finally {
+      pendingChunks.current.delete(chunk);
       setLoading(false);
+      if (lagging) {
+        setTimeout(() => { if (groupRef.current === groupId) loadChunk(chunk); }, LAGGING_RETRY_MS);
+      }
     }
   }, [groupId]);
 
-  const loadOnline = useCallback(async () => {
-    if (!groupId) return;
-    try {
-      const data = await api.getGroupOnlineMembers(groupId);
-      setOnlineUsernames(data?.online || []);
-    } catch {
-      setOnlineUsernames([]);
-    }
-  }, [groupId]);
+  const firstVisible = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+  const lastVisible = Math.min(
+    Math.max(total - 1, 0),
+    Math.ceil((viewport.scrollTop + viewport.height) / ROW_HEIGHT) + OVERSCAN
+  );
+
+  const reload = useCallback(() => {
+    loadedChunks.current = new Set();
+    versionRef.current = 0;
+    const first = Math.floor(firstVisible / CHUNK_SIZE);
+    const last = Math.floor(lastVisible / CHUNK_SIZE);
+    for (let c = first; c <= last; c++) loadChunk(c);
+  }, [firstVisible, lastVisible, loadChunk]);
 
+  // Initial load / group switch
   useEffect(() => {
-    loadMembers();
-    loadOnline();
-    const interval = setInterval(loadOnline, 30000);
-    return () => clearInterval(interval);
-  }, [loadMembers, loadOnline]);
+    setRows(new Map());
+    setPresence(new Map());
+    setTotal(0);
+    setLoading(true);
+    groupRef.current = groupId;
+    loadedChunks.current = new Set();
+    versionRef.current = 0;
+    loadChunk(0);
+  }, [groupId, loadChunk]);
 
-  // Listen for presence updates
+  // Fetch whatever chunks the viewport now covers
   useEffect(() => {
-    if (!socketService.socket || !groupId) return;
-    socketService.socket.emit('join_group', groupId);
+    if (total === 0) return;
+    const first = Math.floor(firstVisible / CHUNK_SIZE);
+    const last = Math.floor(lastVisible / CHUNK_SIZE);
+    for (let c = first; c <= last; c++) loadChunk(c);
+  }, [firstVisible, lastVisible, total, loadChunk]);
 
-    const handlePresence = () => { loadOnline(); };
-    socketService.socket.on('group_presence_update', handlePresence);
+  const handleScroll = useCallback(() => {
+    const el = containerRef.current;
+    if (!el) return;
+    window.requestAnimationFrame(() => setViewport({ scrollTop: el.scrollTop, height: el.clientHeight }));
+  }, []);
 
-    return () => {
-      socketService.socket.emit('leave_group', groupId);
-      socketService.socket.off('group_presence_update', handlePresence);
+  useEffect(() => { handleScroll(); }, [handleScroll, loading]);
+
+  // Pushed diffs instead of polling
+  const reloadRef = useRef(reload);
+  reloadRef.current = reload;
+
+  useEffect(() => {
+    const socket = socketService.socket;
+    if (!socket || !groupId) return;
+    socket.emit('join_group', groupId);
+
+    const handleListUpdate = (evt) => {
+      if (Number(evt.groupId) !== Number(groupId)) return;
+      // Already reflected in the loaded rows (or older than them)
+      if (evt.version <= versionRef.current) return;
+      const inPlace = evt.version === versionRef.current + 1 && evt.ops.every((o) => o.op === 'update');
+      if (!inPlace) {
+        // Membership or ordering changed (or we missed a diff) — refetch the visible range
+        reloadRef.current();
+        return;
+      }
+      versionRef.current = evt.version;
+      const updates = new Map(evt.ops.map((o) => [o.member.address, o.member]));
+      setRows((prev) => {
+        const next = new Map(prev);
+        prev.forEach((row, idx) => {
+          if (row.type === 'member' && updates.has(row.address)) next.set(idx, { ...row, ...updates.get(row.address) });
+        });
+        return next;
+      });
     };
-  }, [groupId, loadOnline]);
 
-  // Split members into categories by role
-  const ownerMembers = members.filter((m) => m.role === 'owner');
-  const adminMembers = members.filter((m) => m.role === 'admin');
-  const regularMembers = members.filter((m) => m.role !== 'owner' && m.role !== 'admin');
+    const handlePresence = ({ groupId: gid, address, online }) => {
+      if (Number(gid) !== Number(groupId)) return;
+      setPresence((prev) => new Map(prev).set(address, online));
+    };
 
-  const isOnline = (username) => onlineUsernames.some((u) => u.toLowerCase() === (username || '').toLowerCase());
+    // Diffs may have been missed while disconnected
+    const handleReconnect = () => {
+      socket.emit('join_group', groupId);
+      reloadRef.current();
+    };
 
-  const renderMember = (m) => {
-    const online = isOnline(m.username);
+    socket.on('member_list_update', handleListUpdate);
+    socket.on('member_presence', handlePresence);
+    socket.on('connect', handleReconnect);
+
+    return () => {
+      socket.emit('leave_group', groupId);
+      socket.off('member_list_update', handleListUpdate);
+      socket.off('member_presence', handlePresence);
+      socket.off('connect', handleReconnect);
+    };
+  }, [groupId]);
+
+  const isOnline = (m) => (presence.has(m.address) ? presence.get(m.address) : !!m.online);
+
+  const renderMember = (m, style) => {
+    const online = isOnline(m);
     const roles = typeof m.custom_roles === 'string' ? JSON.parse(m.custom_roles) : (m.custom_roles || []);
     const topRole = roles.length > 0 ? roles[0] : null;
 
     return (
       <div
-        key={m.user_address || m.username}
+        key={m.address}
+        style={style}
         className={`member-item${online ? ' member-online' : ''}`}
-        onClick={(e) => onMemberClick?.(m, e)}
+        onClick={(e) => onMemberClick?.({ ...m, user_address: m.address }, e)}
       >
         <div className="member-avatar-wrap">
           <img
             src={m.profile_image || DEFAULT_AVATAR}
             alt=""
             className="member-avatar"
+            loading="lazy"
             onError={(e) => { if (e.target.src !== DEFAULT_AVATAR) e.target.src = DEFAULT_AVATAR; }}
           />
           <span className={`member-status-dot${online ? ' online' : ' offline'}`} />
@@ -89,7 +185,7 @@ export default function MemberSidebar({ groupId, user, isAdmin, isOwner, onMembe
             className="member-name"
             style={topRole?.color ? { color: topRole.color } : undefined}
           >
-            {m.username || 'Unknown'}
+            {m.nickname || m.username || 'Unknown'}
           </span>
         </div>
       </div>
@@ -104,32 +200,28 @@ export default function MemberSidebar({ groupId, user, isAdmin, isOwner, onMembe
     );
   }
 
-  return (
-    <div className="member-sidebar">
-      {ownerMembers.length > 0 && (
-        <div className="member-category">
-          <div className="member-category-header">
-            OWNER — {ownerMembers.length}
-          </div>
-          {ownerMembers.map(renderMember)}
+  const visible = [];
+  for (let i = firstVisible; i <= lastVisible && i < total; i++) {
+    const style = { position: 'absolute', top: i * ROW_HEIGHT, left: 8, right: 8, height: ROW_HEIGHT };
+    const row = rows.get(i);
+    if (!row) {
+      visible.push(<div key={`placeholder-${i}`} className="member-item member-placeholder" style={style} />);
+    } else if (row.type === 'header') {
+      visible.push(
+        <div key={`header-${row.section}`} className="member-category-header" style={style}>
+          {row.label} — {row.count}
         </div>
-      )}
-      {adminMembers.length > 0 && (
-        <div className="member-category">
-          <div className="member-category-header">
-            ADMINS — {adminMembers.length}
-          </div>
-          {adminMembers.map(renderMember)}
-        </div>
-      )}
-      {regularMembers.length > 0 && (
-        <div className="member-category">
-          <div className="member-category-header">
-            MEMBERS — {regularMembers.length}
-          </div>
-          {regularMembers.map(renderMember)}
-        </div>
-      )}
+      );
+    } else {
+      visible.push(renderMember(row, style));
+    }
+  }
+
+  return (
+    <div className="member-sidebar" ref={containerRef} onScroll={handleScroll}>
+      <div className="member-virtual-list" style={{ height: total * ROW_HEIGHT }}>
+        {visible}
+      </div>
     </div>
   );
 }
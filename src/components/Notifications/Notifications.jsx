@@ -1,5 +1,5 @@
 // src/components/Notifications/Notifications.jsx
-import { useState, useEffect, useMemo } from 'react';
+import { useState, useEffect, useMemo, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import { useAuth } from '../../hooks/useAuth';
 import api from '../../services/api';
@@ -13,6 +13,7 @@ export default function Notifications() {
   const [friendRequests, setFriendRequests] = useState([]);
   const [notifications, setNotifications] = useState([]);
   const [loading, setLoading] = useState(true);
+  const hydrationRequested = useRef(new Set());
 
   const READ_NOTIFICATIONS_KEY = 'read_notifications';
 
@@ -63,6 +64,27 @@ export default function Notifications() {
     loadFriendRequests();
   }, []);
 
+  // Fill in avatars for actors that arrived without one. Each lookup goes through
+  // api.getProfileCard, which batches them into a single request.
+  useEffect(() => {
+    const missing = notifications.filter((item) =>
+      item.user && !hydrationRequested.current.has(item.id) &&
+      !(item.user.profileImage || item.user.profile_image) && (item.user.username || item.user.address)
+    );
+    if (missing.length === 0) return;
+    missing.forEach((item) => hydrationRequested.current.add(item.id));
+    Promise.all(missing.map((item) =>
+      api.getProfileCard(item.user.address || item.user.username).catch(() => null)
+    )).then((cards) => {
+      const byId = new Map(missing.map((item, i) => [item.id, cards[i]]));
+      setNotifications((prev) => prev.map((item) => {
+        if (!byId.has(item.id)) return item;
+        const card = byId.get(item.id);
+        return card ? { ...item, user: { ...item.user, ...card } } : item;
+      }));
+    });
+  }, [notifications]);
+
   useEffect(() => {
     if (!socket) return;
 
@@ -74,8 +96,7 @@ export default function Notifications() {
       try {
         const username = payload?.fromUsername || payload?.from;
         if (!username) return;
-        const data = await api.getUserProfile(username);
-        const user = data?.user || {};
+        const user = (await api.getProfileCard(username)) || { username };
         const entry = {
           id: `accepted-${username}-${Date.now()}`,
           type: 'friend_accepted',
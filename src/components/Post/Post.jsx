@@ -46,6 +46,23 @@ function getAvatar(imageUrl, username, className) {
   );
 }
 
+// comment id -> numeric field, for the comments that carry it
+function commentFieldMap(list, field) {
+  const map = {};
+  list.forEach((comment) => {
+    if (comment[field] !== undefined && comment[field] !== null) {
+      map[comment.id] = Number(comment[field]);
+    }
+  });
+  return map;
+}
+
+// Append newly loaded comments, skipping ones already held (e.g. a reply posted locally)
+function mergeComments(prev, loaded) {
+  const seen = new Set(prev.map((comment) => comment.id));
+  return [...prev, ...loaded.filter((comment) => !seen.has(comment.id))];
+}
+
 export default function Post({ post, onDelete, onUpdate, onShare, autoOpenComments, focusCommentId }) {
   const { user } = useAuth();
   const initialReaction = Number.isFinite(Number(post.user_reaction))
@@ -53,6 +70,8 @@ export default function Post({ post, onDelete, onUpdate, onShare, autoOpenCommen
     : Number.isFinite(Number(post.reaction_type))
     ? Number(post.reaction_type)
     : null;
+  // Feed responses carry the top few comments, so the preview needs no extra request
+  const previewComments = Array.isArray(post.top_comments) ? post.top_comments : [];
   const [reactionType, setReactionType] = useState(initialReaction);
   const [likeCount, setLikeCount] = useState(Number(post.reaction_count) || 0);
   const [showComments, setShowComments] = useState(false);
@@ -67,8 +86,11 @@ export default function Post({ post, onDelete, onUpdate, onShare, autoOpenCommen
   const [replyImage, setReplyImage] = useState({});
   const [replyPreview, setReplyPreview] = useState({});
   const [replyEmojiOpen, setReplyEmojiOpen] = useState({});
-  const [commentReactions, setCommentReactions] = useState({});
-  const [commentReactionCounts, setCommentReactionCounts] = useState({});
+  const [commentReactions, setCommentReactions] = useState(() => commentFieldMap(previewComments, 'user_reaction'));
+  const [commentReactionCounts, setCommentReactionCounts] = useState(() => commentFieldMap(previewComments, 'reaction_count'));
+  // Next-page cursor per tree level ('root' or a parent comment id); null once a level is exhausted
+  const [levelCursors, setLevelCursors] = useState({});
+  const [loadingLevels, setLoadingLevels] = useState({});
   const [showReactionMenu, setShowReactionMenu] = useState(false);
   const [showReportModal, setShowReportModal] = useState(false);
   const [reportReason, setReportReason] = useState('');
@@ -254,9 +276,14 @@ export default function Post({ post, onDelete, onUpdate, onShare, autoOpenCommen
     return handleReact(0);
   }
 
+  function absorbComments(loaded) {
+    setCommentReactions((prev) => ({ ...prev, ...commentFieldMap(loaded, 'user_reaction') }));
+    setCommentReactionCounts((prev) => ({ ...prev, ...commentFieldMap(loaded, 'reaction_count') }));
+  }
+
   async function loadComments(options = {}) {
     const { forceOpen = false } = options;
-    if (comments.length > 0) {
+    if ('root' in levelCursors) {
       if (forceOpen) {
         setShowComments(true);
       } else {
@@ -267,21 +294,20 @@ export default function Post({ post, onDelete, onUpdate, onShare, autoOpenCommen
 
     try {
       setLoadingComments(true);
-      const data = await api.getComments(post.id);
-      const loadedComments = data.comments || [];
-      setComments(loadedComments);
-      const loadedReactions = {};
-      const loadedCounts = {};
-      loadedComments.forEach((comment) => {
-        if (comment.user_reaction !== undefined && comment.user_reaction !== null) {
-          loadedReactions[comment.id] = Number(comment.user_reaction);
-        }
-        if (comment.reaction_count !== undefined && comment.reaction_count !== null) {
-          loadedCounts[comment.id] = Number(comment.reaction_count);
-        }
-      });
-      setCommentReactions(loadedReactions);
-      setCommentReactionCounts(loadedCounts);
+      if (focusCommentId) {
+        // A linked comment can sit at any depth, so load the whole tree at once
+        const data = await api.getComments(post.id);
+        const loadedComments = data.comments || [];
+        setComments((prev) => mergeComments(prev, loadedComments));
+        absorbComments(loadedComments);
+        setLevelCursors({ root: null });
+      } else {
+        const data = await api.getCommentTree(post.id);
+        const loadedComments = data.comments || [];
+        setComments((prev) => mergeComments(prev, loadedComments));
+        absorbComments(loadedComments);
+        setLevelCursors({ root: data.nextCursor || null });
+      }
       setShowComments(true);
     } catch (error) {
       console.error('Load comments error:', error);
@@ -290,6 +316,24 @@ export default function Post({ post, onDelete, onUpdate, onShare, autoOpenCommen
     }
   }
 
+  // Next page of top-level comments (parentId null) or of one comment's replies
+  async function loadLevel(parentId) {
+    const key = parentId || 'root';
+    if (loadingLevels[key]) return;
+    try {
+      setLoadingLevels((prev) => ({ ...prev, [key]: true }));
+      const data = await api.getCommentTree(post.id, { parentId, cursor: levelCursors[key] });
+      const loadedComments = data.comments || [];
+      setComments((prev) => mergeComments(prev, loadedComments));
+      absorbComments(loadedComments);
+      setLevelCursors((prev) => ({ ...prev, [key]: data.nextCursor || null }));
+    } catch (error) {
+      console.error('Load replies error:', error);
+    } finally {
+      setLoadingLevels((prev) => ({ ...prev, [key]: false }));
+    }
+  }
+
   useEffect(() => {
     if (!autoOpenComments) return;
     if (!showComments) {
@@ -332,7 +376,14 @@ export default function Post({ post, onDelete, onUpdate, onShare, autoOpenCommen
         username: user.username,
         profile_image: user.profileImage
       };
-      setComments((prev) => [...prev, newReply]);
+      setComments((prev) => [
+        ...prev.map((comment) =>
+          comment.id === commentId
+            ? { ...comment, reply_count: Number(comment.reply_count || 0) + 1 }
+            : comment
+        ),
+        newReply
+      ]);
       setReplyText((prev) => ({ ...prev, [commentId]: '' }));
       setReplyImage((prev) => ({ ...prev, [commentId]: null }));
       setReplyPreview((prev) => ({ ...prev, [commentId]: '' }));
@@ -434,6 +485,23 @@ export default function Post({ post, onDelete, onUpdate, onShare, autoOpenCommen
       .map((reply) => renderCommentItem(reply, depth));
   }
 
+  function renderMoreReplies(comment) {
+    const loadedCount = comments.filter((reply) => reply.parent_comment_id === comment.id).length;
+    const remaining = Number(comment.reply_count) - loadedCount;
+    if (!(remaining > 0) || levelCursors[comment.id] === null) return null;
+    return (
+      <button
+        className="comments-more"
+        onClick={() => loadLevel(comment.id)}
+        disabled={loadingLevels[comment.id]}
+      >
+        {loadingLevels[comment.id]
+          ? 'Loading...'
+          : `View ${remaining} ${remaining === 1 ? 'reply' : 'replies'}`}
+      </button>
+    );
+  }
+
   function renderCommentItem(comment, depth = 0) {
     const isReply = depth > 0;
     const indentStyle = depth > 1 ? { marginLeft: depth * 24 } : undefined;
@@ -586,6 +654,7 @@ export default function Post({ post, onDelete, onUpdate, onShare, autoOpenCommen
           <div className="reply-list">
             {renderReplies(comment.id, depth + 1)}
           </div>
+          {renderMoreReplies(comment)}
         </div>
       </div>
     );
@@ -809,6 +878,21 @@ export default function Post({ post, onDelete, onUpdate, onShare, autoOpenCommen
         document.body
       )}
 
+      {!showComments && previewComments.length > 0 && (
+        <div className="comments-section comments-preview">
+          {previewComments.map((comment) => renderCommentItem(comment, 0))}
+          {Number(post.comment_count) > previewComments.length && (
+            <button
+              className="comments-more"
+              onClick={() => loadComments({ forceOpen: true })}
+              disabled={loadingComments}
+            >
+              {loadingComments ? 'Loading...' : `View all ${post.comment_count} comments`}
+            </button>
+          )}
+        </div>
+      )}
+
       {showComments && (
         <div className="comments-section">
           {loadingComments ? (
@@ -818,6 +902,15 @@ export default function Post({ post, onDelete, onUpdate, onShare, autoOpenCommen
               {comments
                 .filter((comment) => !comment.parent_comment_id)
                 .map((comment) => renderCommentItem(comment, 0))}
+              {levelCursors.root && (
+                <button
+                  className="comments-more"
+                  onClick={() => loadLevel(null)}
+                  disabled={loadingLevels.root}
+                >
+                  {loadingLevels.root ? 'Loading...' : 'View more comments'}
+                </button>
+              )}
             </>
           )}
 
@@ -1,5 +1,4 @@
 import { createContext, useContext, useState, useEffect } from 'react';
-import EthereumProvider from '@walletconnect/ethereum-provider';
 import api from '../services/api';
 import emailApi from '../services/emailApi';
 import socketService from '../services/socket';
@@ -128,6 +127,8 @@ export function AuthProvider({ children }) {
         }
 
         if (!walletConnectProvider) {
+          // Only needed without an injected wallet, so it stays out of the startup bundle
+          const { default: EthereumProvider } = await import('@walletconnect/ethereum-provider');
           walletConnectProvider = await EthereumProvider.init({
             projectId: WALLETCONNECT_PROJECT_ID,
             chains: [HYVE_CHAIN.chainIdDecimal],
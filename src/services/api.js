@@ -120,6 +120,18 @@ export async function searchUsers(query) {
   return response.json();
 }
 
+// Ranked people search (q) or suggestions (no q), paged with nextCursor; blocked users are excluded server-side
+export async function discoverUsers(query = '', { cursor, limit = 24 } = {}) {
+  const params = new URLSearchParams({ q: query, limit: String(limit) });
+  if (cursor) params.set('cursor', cursor);
+  const response = await fetch(`${API_URL}/api/discover/users?${params}`, {
+    headers: { 'Authorization': `Bearer ${getToken()}` },
+  });
+  const data = await response.json();
+  if (!response.ok) throw new Error(data.error || 'Failed to load people');
+  return data;
+}
+
 export async function getUserProfile(address) {
   const token = localStorage.getItem('token');
   const response = await fetch(`${API_URL}/api/profile/${address}`, {
@@ -132,6 +144,81 @@ export async function getUserProfile(address) {
   return data;
 }
 
+// ========================================
+// PROFILE CARDS (batched hydration)
+// ========================================
+
+const PROFILE_BATCH_MAX = 200;
+const PROFILE_BATCH_WINDOW_MS = 10;
+const PROFILE_CARD_TTL_MS = 30 * 1000;
+const profileCardCache = new Map(); // `${groupId}|${key}` -> { card, at }
+const pendingProfileBatches = new Map(); // groupId -> Map(key -> [{ resolve, reject }])
+
+function profileCardKey(addressOrUsername) {
+  const value = String(addressOrUsername || '').trim().toLowerCase();
+  return /^0x[0-9a-f]{40}$/.test(value) ? `a:${value}` : `u:${value}`;
+}
+
+// Compact cards ({ address, username, profileImage, nickname, online }) for many users in one request
+export async function getProfileCards({ addresses = [], usernames = [], groupId } = {}) {
+  const response = await fetch(`${API_URL}/api/profiles/batch`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${getToken()}` },
+    body: JSON.stringify({ addresses, usernames, groupId }),
+  });
+  const data = await response.json();
+  if (!response.ok) throw new Error(data.error || 'Failed to load profiles');
+  return data.profiles || [];
+}
+
+async function flushProfileBatch(groupKey) {
+  const pending = pendingProfileBatches.get(groupKey);
+  pendingProfileBatches.delete(groupKey);
+  const keys = [...pending.keys()];
+  for (let i = 0; i < keys.length; i += PROFILE_BATCH_MAX) {
+    const chunk = keys.slice(i, i + PROFILE_BATCH_MAX);
+    try {
+      const cards = await getProfileCards({
+        addresses: chunk.filter((k) => k.startsWith('a:')).map((k) => k.slice(2)),
+        usernames: chunk.filter((k) => k.startsWith('u:')).map((k) => k.slice(2)),
+        groupId: groupKey || undefined,
+      });
+      const byKey = new Map();
+      cards.forEach((card) => {
+        byKey.set(`a:${card.address.toLowerCase()}`, card);
+        if (card.username) byKey.set(`u:${card.username.toLowerCase()}`, card);
+      });
+      const now = Date.now();
+      chunk.forEach((key) => {
+        const card = byKey.get(key) || null;
+        profileCardCache.set(`${groupKey}|${key}`, { card, at: now });
+        pending.get(key).forEach(({ resolve }) => resolve(card));
+      });
+    } catch (error) {
+      chunk.forEach((key) => pending.get(key).forEach(({ reject }) => reject(error)));
+    }
+  }
+}
+
+// Single-profile lookup; calls made within a few ms of each other share one batch request
+export function getProfileCard(addressOrUsername, { groupId } = {}) {
+  const key = profileCardKey(addressOrUsername);
+  const groupKey = groupId ? String(groupId) : '';
+  const cached = profileCardCache.get(`${groupKey}|${key}`);
+  if (cached && Date.now() - cached.at < PROFILE_CARD_TTL_MS) return Promise.resolve(cached.card);
+
+  return new Promise((resolve, reject) => {
+    let pending = pendingProfileBatches.get(groupKey);
+    if (!pending) {
+      pending = new Map();
+      pendingProfileBatches.set(groupKey, pending);
+      setTimeout(() => flushProfileBatch(groupKey), PROFILE_BATCH_WINDOW_MS);
+    }
+    if (!pending.has(key)) pending.set(key, []);
+    pending.get(key).push({ resolve, reject });
+  });
+}
+
 export async function getUserPosts(address) {
   const token = localStorage.getItem('token');
   const response = await fetch(`${API_URL}/api/posts/user/${address}`, {
@@ -181,10 +268,12 @@ export async function updateProfile(data) {
   }
 
   if (!contentType.includes('application/json')) {
+    profileCardCache.clear();
     console.log('updateProfile - non-JSON response, returning success');
     return { success: true };
   }
 
+  profileCardCache.clear();
   const result = await response.json();
   console.log('updateProfile - response:', result);
   return result;
@@ -216,14 +305,13 @@ export async function getPublicPosts(options = {}) {
   if (limit !== undefined && limit !== null) params.set('limit', String(limit));
   if (offset !== undefined && offset !== null) params.set('offset', String(offset));
 
-  // Try dedicated public endpoint first
+  // Try dedicated public endpoint first (no auth header: keeps it a simple,
+  // cacheable request with no CORS preflight)
   try {
     const publicUrl = params.toString()
       ? `${API_URL}/api/posts/public?${params}`
       : `${API_URL}/api/posts/public`;
-    const res = await fetch(publicUrl, {
-      headers: { 'Authorization': `Bearer ${token}` },
-    });
+    const res = await fetch(publicUrl);
     if (res.ok) {
       const ct = res.headers.get('content-type') || '';
       if (ct.includes('application/json')) {
@@ -463,6 +551,24 @@ export async function getComments(postId) {
   return response.json();
 }
 
+// One level of a post's comment tree (top level unless parentId), paged with nextCursor
+export async function getCommentTree(postId, options = {}) {
+  const { parentId, cursor, limit } = options || {};
+  const token = localStorage.getItem('token');
+  const params = new URLSearchParams();
+  if (parentId) params.set('parentId', String(parentId));
+  if (cursor) params.set('cursor', cursor);
+  if (limit !== undefined && limit !== null) params.set('limit', String(limit));
+  const response = await fetch(`${API_URL}/api/posts/${postId}/comments/tree?${params}`, {
+    headers: {
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+  const data = await response.json();
+  if (!response.ok) throw new Error(data.error || 'Failed to get comments');
+  return data;
+}
+
 export async function addComment(postId, content, options = {}) {
   const { parentCommentId, imageFile } = options;
   let mediaUrl = null;
@@ -609,12 +715,7 @@ export async function getStories() {
 }
 
 export async function getPublicStories() {
-  const token = localStorage.getItem('token');
-  const response = await fetch(`${API_URL}/api/stories/public`, {
-    headers: {
-      'Authorization': `Bearer ${token}`,
-    },
-  });
+  const response = await fetch(`${API_URL}/api/stories/public`);
 
   if (!response.ok) {
     return { stories: [] };
@@ -1346,6 +1447,17 @@ export async function getGroupOnlineMembers(groupId) {
   return response.json();
 }
 
+// Flattened, role-grouped member rows [start, start + count) for the virtualized sidebar
+export async function getMemberListRange(groupId, start = 0, count = 100) {
+  const token = localStorage.getItem('token');
+  const response = await fetch(`${API_URL}/api/groups/${groupId}/member-list?start=${start}&count=${count}`, {
+    headers: { 'Authorization': `Bearer ${token}` }
+  });
+  const data = await response.json();
+  if (!response.ok) throw new Error(data.error || 'Failed to get member list');
+  return data;
+}
+
 export async function deleteAccount() {
   const token = localStorage.getItem('token');
   try {
@@ -1842,6 +1954,11 @@ export async function searchGroupMessages(groupId, query, options = {}) {
   const params = new URLSearchParams({ q: query });
   if (options.channelId) params.append('channelId', options.channelId);
   if (options.authorId) params.append('authorId', options.authorId);
+  if (options.hasImage) params.append('hasImage', 'true');
+  if (options.since) params.append('since', options.since);
+  if (options.until) params.append('until', options.until);
+  if (options.sort) params.append('sort', options.sort);
+  if (options.cursor) params.append('cursor', options.cursor);
   if (options.limit) params.append('limit', options.limit);
   const response = await fetch(`${API_URL}/api/groups/${groupId}/search?${params}`, {
     headers: { 'Authorization': `Bearer ${getToken()}` },
@@ -2410,6 +2527,36 @@ export async function publishAnnouncement(channelId, messageId) {
   return data;
 }
 
+export async function followAnnouncementChannel(channelId, targetChannelId) {
+  const response = await fetch(`${API_URL}/api/channels/${channelId}/followers`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${getToken()}` },
+    body: JSON.stringify({ targetChannelId }),
+  });
+  const data = await response.json();
+  if (!response.ok) throw new Error(data.error || 'Failed to follow channel');
+  return data;
+}
+
+export async function unfollowAnnouncementChannel(channelId, targetChannelId) {
+  const response = await fetch(`${API_URL}/api/channels/${channelId}/followers/${targetChannelId}`, {
+    method: 'DELETE',
+    headers: { 'Authorization': `Bearer ${getToken()}` },
+  });
+  const data = await response.json();
+  if (!response.ok) throw new Error(data.error || 'Failed to unfollow channel');
+  return data;
+}
+
+export async function getAnnouncementFollowers(channelId) {
+  const response = await fetch(`${API_URL}/api/channels/${channelId}/followers`, {
+    headers: { 'Authorization': `Bearer ${getToken()}` },
+  });
+  const data = await response.json();
+  if (!response.ok) throw new Error(data.error || 'Failed to get followers');
+  return data;
+}
+
 // ========================================
 // USER PREFERENCES
 // ========================================
@@ -2461,7 +2608,10 @@ export default {
   // Users
   getUsers,
   searchUsers,
+  discoverUsers,
   getUserProfile,
+  getProfileCard,
+  getProfileCards,
   getUserPosts,
   updateProfile,
   
@@ -2482,6 +2632,7 @@ export default {
   
   // Comments
   getComments,
+  getCommentTree,
   addComment,
   deleteComment,
   reactToComment,
@@ -2561,6 +2712,7 @@ export default {
   removeMemberRole,
   getMembersWithRoles,
   getGroupOnlineMembers,
+  getMemberListRange,
 
   // Account
   deleteAccount,
@@ -2692,6 +2844,9 @@ export default {
 
   // Announcement Publish
   publishAnnouncement,
+  followAnnouncementChannel,
+  unfollowAnnouncementChannel,
+  getAnnouncementFollowers,
 
   // User Preferences
   updateUserPreferences,
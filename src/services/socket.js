@@ -6,6 +6,7 @@ class SocketService {
   constructor() {
     this.socket = null;
     this.connected = false;
+    this.drainTimer = null;
   }
 
   connect(userIdentifier) {
@@ -35,9 +36,22 @@ class SocketService {
       console.error('Socket connection error:', error);
       this.connected = false;
     });
+
+    // The server is restarting for a deploy: move to another worker after the delay it picked
+    // for this client, so the whole user base doesn't reconnect in the same second
+    this.socket.on('server_draining', ({ reconnectInMs = 0 } = {}) => {
+      clearTimeout(this.drainTimer);
+      const socket = this.socket;
+      this.drainTimer = setTimeout(() => {
+        if (this.socket !== socket || !socket.connected) return;
+        socket.disconnect();
+        socket.connect();
+      }, reconnectInMs);
+    });
   }
 
   disconnect() {
+    clearTimeout(this.drainTimer);
     if (this.socket) {
       this.socket.disconnect();
       this.socket = null;
@@ -1,11 +1,13 @@
 // src/utils/e2ee.js
 import sodium from 'libsodium-wrappers';
+import { SIGNATURE_SESSION_KEY, onE2EESignature } from './e2eeSession';
+
+export { setE2EESignature } from './e2eeSession';
 
 const PUBLIC_KEY_KEY = 'e2ee_public_key';
 const PRIVATE_KEY_KEY = 'e2ee_private_key_encrypted';
 const PRIVATE_KEY_NONCE_KEY = 'e2ee_private_key_nonce';
 const UNLOCK_KEY_SESSION = 'e2ee_unlock_key_session';
-const SIGNATURE_SESSION_KEY = 'e2ee_unlock_signature';
 const UNLOCK_KEY_PERSIST = 'e2ee_unlock_key_persist';
 
 let cachedPublicKey = null;
@@ -13,6 +15,20 @@ let cachedSecretKey = null;
 let cachedUnlockKey = null;
 let e2eeProvider = null;
 
+// Batch decryption runs in e2ee.worker.js; results are kept here so reopening a
+// conversation doesn't go back to the worker at all
+const PLAINTEXT_CACHE_MAX = 2000;
+const plaintextCache = new Map(); // ciphertext -> plaintext, least recently used first
+let worker = null;
+let workerKeys = null;
+let nextJobId = 1;
+const workerJobs = new Map();
+
+// A fresh signature from login replaces whatever unlock key was derived before
+onE2EESignature(() => {
+  cachedUnlockKey = null;
+});
+
 export function setE2EEProvider(provider) {
   e2eeProvider = provider || null;
 }
@@ -179,6 +195,7 @@ export async function restoreKeypairFromServer(payload) {
   localStorage.setItem(PRIVATE_KEY_NONCE_KEY, payload.encryptedPrivateKeyNonce);
   cachedPublicKey = fromBase64(payload.publicKey);
   cachedSecretKey = secret;
+  forgetWorkerKeys();
   return true;
 }
 
@@ -202,10 +219,122 @@ export async function decryptMessageContent(cipherBase64) {
   return sodium.to_string(plain);
 }
 
+function getWorker() {
+  if (!worker) {
+    worker = new Worker(new URL('./e2ee.worker.js', import.meta.url), { type: 'module' });
+    worker.onmessage = ({ data }) => {
+      const job = workerJobs.get(data.id);
+      if (!job) return;
+      if (data.type === 'chunk') {
+        job.onChunk(data.start, data.results);
+      } else {
+        workerJobs.delete(data.id);
+        if (data.error) job.reject(new Error(data.error));
+        else job.resolve(data.content);
+      }
+    };
+  }
+  return worker;
+}
+
+// Unlocks on the main thread (it needs storage and the wallet), then hands the keypair over
+async function ensureWorkerKeys() {
+  if (!workerKeys) {
+    workerKeys = (async () => {
+      await ensureKeypair();
+      getWorker().postMessage({ type: 'keys', publicKey: cachedPublicKey, secretKey: cachedSecretKey });
+    })().catch((error) => {
+      workerKeys = null;
+      throw error;
+    });
+  }
+  return workerKeys;
+}
+
+function forgetWorkerKeys() {
+  workerKeys = null;
+  plaintextCache.clear();
+  worker?.postMessage({ type: 'reset' });
+}
+
+function rememberPlaintext(cipher, plaintext) {
+  plaintextCache.delete(cipher);
+  plaintextCache.set(cipher, plaintext);
+  while (plaintextCache.size > PLAINTEXT_CACHE_MAX) {
+    plaintextCache.delete(plaintextCache.keys().next().value);
+  }
+}
+
+// Decrypts many message contents off the main thread. onResults receives
+// [{ index, content, plaintext }] as they become available (plaintext is null when a message
+// can't be decrypted): cached ones at once, then the rest slice by slice in the given order.
+// Resolves with the plaintexts aligned to contents; aborting stops the worker between slices.
+export async function decryptMessageBatch(contents, { onResults, signal } = {}) {
+  const results = new Array(contents.length).fill(null);
+  const hits = [];
+  const misses = [];
+  contents.forEach((content, index) => {
+    if (plaintextCache.has(content)) {
+      const plaintext = plaintextCache.get(content);
+      rememberPlaintext(content, plaintext);
+      results[index] = plaintext;
+      hits.push({ index, content, plaintext });
+    } else {
+      misses.push(index);
+    }
+  });
+  if (hits.length > 0) onResults?.(hits);
+  if (misses.length === 0 || signal?.aborted) return results;
+
+  await ensureWorkerKeys();
+  if (signal?.aborted) return results;
+
+  const id = nextJobId++;
+  await new Promise((resolve, reject) => {
+    const onAbort = () => {
+      worker.postMessage({ type: 'cancel', id });
+      workerJobs.delete(id);
+      resolve();
+    };
+    workerJobs.set(id, {
+      resolve: () => { signal?.removeEventListener('abort', onAbort); resolve(); },
+      reject,
+      onChunk: (start, chunk) => {
+        const ready = chunk.map((result, offset) => {
+          const index = misses[start + offset];
+          const content = contents[index];
+          const plaintext = result.plaintext ?? null;
+          if (plaintext !== null) rememberPlaintext(content, plaintext);
+          results[index] = plaintext;
+          return { index, content, plaintext };
+        });
+        onResults?.(ready);
+      }
+    });
+    signal?.addEventListener('abort', onAbort, { once: true });
+    worker.postMessage({ type: 'decrypt', id, items: misses.map((index) => contents[index]) });
+  });
+  return results;
+}
+
+// Shared-key counterpart of encryptMessageForRecipient: both sides can read the result
+export async function encryptMessageForPeer(peerPublicKeyBase64, message) {
+  if (!peerPublicKeyBase64) {
+    throw new Error('Recipient has no public key');
+  }
+  await ensureWorkerKeys();
+  const id = nextJobId++;
+  return new Promise((resolve, reject) => {
+    workerJobs.set(id, { resolve, reject, onChunk: () => {} });
+    worker.postMessage({ type: 'encrypt', id, peerPublicKey: peerPublicKeyBase64, text: message });
+  });
+}
+
 export function resetE2EESession() {
   cachedUnlockKey = null;
   cachedSecretKey = null;
   cachedPublicKey = null;
+  forgetWorkerKeys();
   sessionStorage.removeItem(UNLOCK_KEY_SESSION);
   sessionStorage.removeItem(SIGNATURE_SESSION_KEY);
 }
@@ -219,8 +348,3 @@ export function clearE2EEUnlock(persist = true) {
   }
 }
 
-export function setE2EESignature(signature) {
-  if (!signature) return;
-  sessionStorage.setItem(SIGNATURE_SESSION_KEY, signature);
-  cachedUnlockKey = null;
-}
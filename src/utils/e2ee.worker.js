@@ -0,0 +1,128 @@
+// src/utils/e2ee.worker.js — E2EE crypto off the main thread
+// Holds the unlocked keypair (handed over by e2ee.js once the wallet unlock has happened),
+// caches the crypto_box shared key per peer, and decrypts message history in slices,
+// posting each slice back as soon as it is done so the chat fills in newest-first
+// without blocking scrolling.
+import sodium from 'libsodium-wrappers';
+import { E2EE_ENVELOPE_PREFIX } from './e2eeSession';
+
+const DECRYPT_SLICE = 32;
+const SHARED_KEY_MAX = 256;
+
+let publicKey = null;
+let secretKey = null;
+let publicKeyBase64 = null;
+const sharedKeys = new Map(); // peer public key (base64) -> precomputed shared key, LRU
+const cancelled = new Set();
+let queue = Promise.resolve();
+
+// Work runs one job at a time, in the order the main thread sent it
+function enqueue(task) {
+  queue = queue.then(task).catch((error) => console.error('E2EE worker error:', error));
+}
+
+function fromBase64(value) {
+  return sodium.from_base64(value, sodium.base64_variants.ORIGINAL);
+}
+
+function toBase64(bytes) {
+  return sodium.to_base64(bytes, sodium.base64_variants.ORIGINAL);
+}
+
+function wipeKeys() {
+  if (secretKey) sodium.memzero(secretKey);
+  sharedKeys.forEach((key) => sodium.memzero(key));
+  sharedKeys.clear();
+  publicKey = null;
+  secretKey = null;
+  publicKeyBase64 = null;
+}
+
+function sharedKeyFor(peerPublicKeyBase64) {
+  let key = sharedKeys.get(peerPublicKeyBase64);
+  if (key) {
+    sharedKeys.delete(peerPublicKeyBase64);
+  } else {
+    key = sodium.crypto_box_beforenm(fromBase64(peerPublicKeyBase64), secretKey);
+  }
+  sharedKeys.set(peerPublicKeyBase64, key);
+  while (sharedKeys.size > SHARED_KEY_MAX) {
+    const [oldest, oldKey] = sharedKeys.entries().next().value;
+    sodium.memzero(oldKey);
+    sharedKeys.delete(oldest);
+  }
+  return key;
+}
+
+// Envelope: e2ee:1:<sender public key>:<recipient public key>:<nonce>:<ciphertext>, so either
+// side can derive the same shared key. Anything else is a sealed box addressed to us.
+function decryptOne(content) {
+  if (!secretKey) return { error: 'locked' };
+  try {
+    if (content.startsWith(E2EE_ENVELOPE_PREFIX)) {
+      const [sender, recipient, nonce, cipher] = content.slice(E2EE_ENVELOPE_PREFIX.length).split(':');
+      const peer = sender === publicKeyBase64 ? recipient : sender;
+      const plain = sodium.crypto_box_open_easy_afternm(fromBase64(cipher), fromBase64(nonce), sharedKeyFor(peer));
+      return { plaintext: sodium.to_string(plain) };
+    }
+    const plain = sodium.crypto_box_seal_open(fromBase64(content), publicKey, secretKey);
+    return { plaintext: sodium.to_string(plain) };
+  } catch (error) {
+    return { error: 'undecryptable' };
+  }
+}
+
+async function decryptBatch({ id, items }) {
+  await sodium.ready;
+  for (let start = 0; start < items.length; start += DECRYPT_SLICE) {
+    if (cancelled.has(id)) break;
+    const results = items.slice(start, start + DECRYPT_SLICE).map(decryptOne);
+    self.postMessage({ type: 'chunk', id, start, results });
+    // Let cancel / new key messages in between slices
+    await new Promise((resolve) => setTimeout(resolve, 0));
+  }
+  cancelled.delete(id);
+  self.postMessage({ type: 'done', id });
+}
+
+async function encryptOne({ id, peerPublicKey, text }) {
+  await sodium.ready;
+  try {
+    if (!secretKey) throw new Error('E2EE keys are locked');
+    const nonce = sodium.randombytes_buf(sodium.crypto_box_NONCEBYTES);
+    const cipher = sodium.crypto_box_easy_afternm(sodium.from_string(text), nonce, sharedKeyFor(peerPublicKey));
+    const content = `${E2EE_ENVELOPE_PREFIX}${publicKeyBase64}:${peerPublicKey}:${toBase64(nonce)}:${toBase64(cipher)}`;
+    self.postMessage({ type: 'encrypted', id, content });
+  } catch (error) {
+    self.postMessage({ type: 'encrypted', id, error: error.message });
+  }
+}
+
+self.onmessage = (event) => {
+  const message = event.data;
+  switch (message.type) {
+    case 'keys':
+      enqueue(async () => {
+        await sodium.ready;
+        wipeKeys();
+        publicKey = message.publicKey;
+        secretKey = message.secretKey;
+        publicKeyBase64 = toBase64(publicKey);
+      });
+      break;
+    case 'reset':
+      enqueue(wipeKeys);
+      break;
+    case 'cancel':
+      cancelled.add(message.id);
+      break;
+    case 'decrypt':
+      enqueue(() => decryptBatch(message));
+      break;
+    case 'encrypt':
+      enqueue(() => encryptOne(message));
+      break;
+    default:
+      break;
+  }
+};
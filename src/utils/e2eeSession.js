@@ -0,0 +1,27 @@
+// src/utils/e2eeSession.js
+// The parts of the E2EE session that don't need libsodium, so the login screen can hand
+// over the unlock signature (and chat views can spot encrypted messages) without pulling
+// the crypto library into their chunks.
+
+export const SIGNATURE_SESSION_KEY = 'e2ee_unlock_signature';
+export const E2EE_ENVELOPE_PREFIX = 'e2ee:1:';
+
+const signatureListeners = new Set();
+
+export function setE2EESignature(signature) {
+  if (!signature) return;
+  sessionStorage.setItem(SIGNATURE_SESSION_KEY, signature);
+  signatureListeners.forEach((listener) => listener(signature));
+}
+
+export function onE2EESignature(listener) {
+  signatureListeners.add(listener);
+  return () => signatureListeners.delete(listener);
+}
+
+// Shared-key envelopes are recognisable from the content; sealed boxes carry a flag
+export function isEncryptedMessage(message) {
+  const content = message?.content;
+  if (typeof content !== 'string' || !content) return false;
+  return content.startsWith(E2EE_ENVELOPE_PREFIX) || !!(message.is_encrypted || message.encrypted);
+}
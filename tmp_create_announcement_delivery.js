@@ -0,0 +1,106 @@
+// Tables for announcement delivery (tmp_patch_announcement_delivery.js):
+//   - channel_follows: which channels follow an announcement channel (any group); rows go
+//     away with either channel or the target group, so delivery never targets a deleted one
+//   - announcement_deliveries: durable work queue, one row per published message,
+//     with a keyset cursor over channel_follows so a retry resumes where it stopped
+//   - channel_messages.crosspost_of + a unique index per target channel, so
+//     re-running a batch after a crash inserts nothing twice
+// Run on server: node tmp_create_announcement_delivery.js
+const { Client } = require('pg');
+require('dotenv').config();
+
+async function main() {
+  const db = new Client({
+    host: process.env.DB_HOST || 'localhost',
+    port: process.env.DB_PORT || 5432,
+    database: process.env.DB_NAME || 'hyve_social',
+    user: process.env.DB_USER || 'hyve_admin',
+    password: process.env.DB_PASSWORD,
+  });
+  await db.connect();
+
+  const invalid = await db.query(
+    `SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+     WHERE NOT i.indisvalid AND c.relname = 'idx_channel_messages_crosspost'`
+  );
+  for (const row of invalid.rows) {
+    await db.query(`DROP INDEX CONCURRENTLY IF EXISTS ${row.relname}`);
+    console.log('Dropped invalid index:', row.relname);
+  }
+
+  const queries = [
+    `CREATE TABLE IF NOT EXISTS published_announcements (
+      id SERIAL PRIMARY KEY,
+      message_id INTEGER NOT NULL,
+      channel_id INTEGER NOT NULL,
+      published_by VARCHAR(255) NOT NULL,
+      created_at TIMESTAMP DEFAULT NOW()
+    )`,
+
+    `CREATE TABLE IF NOT EXISTS channel_follows (
+      id SERIAL PRIMARY KEY,
+      source_channel_id INTEGER NOT NULL REFERENCES channels(id) ON DELETE CASCADE,
+      target_channel_id INTEGER NOT NULL REFERENCES channels(id) ON DELETE CASCADE,
+      target_group_id INTEGER NOT NULL REFERENCES groups(id) ON DELETE CASCADE,
+      created_by VARCHAR(255) NOT NULL,
+      created_at TIMESTAMP DEFAULT NOW(),
+      UNIQUE(source_channel_id, target_channel_id)
+    )`,
+    `CREATE INDEX IF NOT EXISTS idx_channel_follows_target ON channel_follows(target_channel_id)`,
+    // Tables created by an earlier run have no foreign keys: drop follows of channels / groups
+    // deleted since, then add the constraints (re-runnable)
+    `DELETE FROM channel_follows f
+      WHERE NOT EXISTS (SELECT 1 FROM channels c WHERE c.id = f.source_channel_id)
+         OR NOT EXISTS (SELECT 1 FROM channels c WHERE c.id = f.target_channel_id)
+         OR NOT EXISTS (SELECT 1 FROM groups g WHERE g.id = f.target_group_id)`,
+    `ALTER TABLE channel_follows
+      DROP CONSTRAINT IF EXISTS channel_follows_source_channel_id_fkey,
+      ADD CONSTRAINT channel_follows_source_channel_id_fkey
+        FOREIGN KEY (source_channel_id) REFERENCES channels(id) ON DELETE CASCADE`,
+    `ALTER TABLE channel_follows
+      DROP CONSTRAINT IF EXISTS channel_follows_target_channel_id_fkey,
+      ADD CONSTRAINT channel_follows_target_channel_id_fkey
+        FOREIGN KEY (target_channel_id) REFERENCES channels(id) ON DELETE CASCADE`,
+    `ALTER TABLE channel_follows
+      DROP CONSTRAINT IF EXISTS channel_follows_target_group_id_fkey,
+      ADD CONSTRAINT channel_follows_target_group_id_fkey
+        FOREIGN KEY (target_group_id) REFERENCES groups(id) ON DELETE CASCADE`,
+
+    `CREATE TABLE IF NOT EXISTS announcement_deliveries (
+      id SERIAL PRIMARY KEY,
+      announcement_id INTEGER NOT NULL,
+      message_id INTEGER NOT NULL,
+      source_channel_id INTEGER NOT NULL,
+      status VARCHAR(16) NOT NULL DEFAULT 'pending',
+      follow_cursor INTEGER NOT NULL DEFAULT 0,
+      delivered INTEGER NOT NULL DEFAULT 0,
+      attempts INTEGER NOT NULL DEFAULT 0,
+      last_error TEXT,
+      next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+      locked_by VARCHAR(64),
+      locked_until TIMESTAMP,
+      created_at TIMESTAMP DEFAULT NOW(),
+      completed_at TIMESTAMP
+    )`,
+    `CREATE INDEX IF NOT EXISTS idx_announcement_deliveries_due
+      ON announcement_deliveries(next_attempt_at, id) WHERE status IN ('pending', 'running')`,
+
+    `ALTER TABLE channel_messages ADD COLUMN IF NOT EXISTS crosspost_of INTEGER`,
+    `CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_channel_messages_crosspost
+      ON channel_messages(channel_id, crosspost_of) WHERE crosspost_of IS NOT NULL`,
+  ];
+
+  for (const q of queries) {
+    try {
+      const result = await db.query(q);
+      console.log('OK:', q.substring(0, 60), result.rowCount != null ? `(${result.rowCount} rows)` : '');
+    } catch(e) {
+      console.error('ERR:', q.substring(0, 60), e.message);
+    }
+  }
+
+  console.log('Announcement delivery tables ready!');
+  await db.end();
+}
+
+main().catch(e => { console.error(e); process.exit(1); });
@@ -0,0 +1,78 @@
+// Indexes for user discovery (GET /api/discover/users)
+//   - trigram GIN on LOWER(username) (and LOWER(display_name) if that column exists):
+//     serves both prefix (LIKE 'abc%') and fuzzy (%) matching
+//   - posts(author_address, created_at DESC) for the "recently active" ranking signal
+//   - LOWER(address) on the follow / block tables, which discovery compares case-insensitively
+// Built CONCURRENTLY so signups and posting are not blocked.
+// Run on server: node tmp_create_discovery_indexes.js
+const { Client } = require('pg');
+require('dotenv').config();
+
+async function main() {
+  const db = new Client({
+    host: process.env.DB_HOST || 'localhost',
+    port: process.env.DB_PORT || 5432,
+    database: process.env.DB_NAME || 'hyve_social',
+    user: process.env.DB_USER || 'hyve_admin',
+    password: process.env.DB_PASSWORD,
+  });
+  await db.connect();
+
+  // Same candidates tmp_patch_discovery.js resolves at startup
+  const relationCols = await db.query(
+    `SELECT table_name, column_name FROM information_schema.columns
+     WHERE table_schema = 'public' AND table_name = ANY($1) AND column_name = ANY($2)`,
+    [['follows', 'user_follows', 'followers', 'blocks', 'user_blocks', 'blocked_users'],
+     ['follower_address', 'following_address', 'followed_address', 'followee_address',
+      'blocker_address', 'user_address', 'blocked_address']]
+  );
+  const lowerIndexes = relationCols.rows.map(r => ({
+    name: `idx_${r.table_name}_${r.column_name}_lower`,
+    sql: `CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_${r.table_name}_${r.column_name}_lower
+      ON ${r.table_name} (LOWER(${r.column_name}))`,
+  }));
+
+  const names = ['idx_users_username_trgm', 'idx_users_display_name_trgm', 'idx_posts_author_created',
+    ...lowerIndexes.map(i => i.name)];
+  const invalid = await db.query(
+    `SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+     WHERE NOT i.indisvalid AND c.relname = ANY($1)`,
+    [names]
+  );
+  for (const row of invalid.rows) {
+    await db.query(`DROP INDEX CONCURRENTLY IF EXISTS ${row.relname}`);
+    console.log('Dropped invalid index:', row.relname);
+  }
+
+  const displayName = await db.query(
+    `SELECT 1 FROM information_schema.columns WHERE table_name = 'users' AND column_name = 'display_name'`
+  );
+
+  const queries = [
+    `CREATE EXTENSION IF NOT EXISTS pg_trgm`,
+    `CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_username_trgm
+      ON users USING GIN (LOWER(username) gin_trgm_ops)`,
+    ...(displayName.rows.length > 0 ? [
+      `CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_display_name_trgm
+        ON users USING GIN (LOWER(display_name) gin_trgm_ops)`,
+    ] : []),
+    `CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_posts_author_created
+      ON posts (author_address, created_at DESC)`,
+    ...lowerIndexes.map(i => i.sql),
+    `ANALYZE users`,
+  ];
+
+  for (const q of queries) {
+    try {
+      await db.query(q);
+      console.log('OK:', q.substring(0, 60));
+    } catch(e) {
+      console.error('ERR:', q.substring(0, 60), e.message);
+    }
+  }
+
+  console.log('Discovery indexes ready!');
+  await db.end();
+}
+
+main().catch(e => { console.error(e); process.exit(1); });
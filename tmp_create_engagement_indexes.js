@@ -0,0 +1,71 @@
+// Indexes for batched post engagement (tmp_patch_post_engagement.js)
+//   - reactions(post_id) / comments(post_id, id) for the per-post counts
+//   - comments(post_id, id) WHERE top level, comments(parent, id) for paged tree levels
+//     and reply counts
+//   - comment_reactions(comment_id) for comment reaction counts
+// Built CONCURRENTLY so posting and reacting are not blocked.
+// Run on server: node tmp_create_engagement_indexes.js
+const { Client } = require('pg');
+require('dotenv').config();
+
+async function main() {
+  const db = new Client({
+    host: process.env.DB_HOST || 'localhost',
+    port: process.env.DB_PORT || 5432,
+    database: process.env.DB_NAME || 'hyve_social',
+    user: process.env.DB_USER || 'hyve_admin',
+    password: process.env.DB_PASSWORD,
+  });
+  await db.connect();
+
+  const names = [
+    'idx_reactions_post', 'idx_comments_post_id', 'idx_comments_post_top',
+    'idx_comments_parent_id', 'idx_comment_reactions_comment',
+  ];
+  const invalid = await db.query(
+    `SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+     WHERE NOT i.indisvalid AND c.relname = ANY($1)`,
+    [names]
+  );
+  for (const row of invalid.rows) {
+    await db.query(`DROP INDEX CONCURRENTLY IF EXISTS ${row.relname}`);
+    console.log('Dropped invalid index:', row.relname);
+  }
+
+  const cols = await db.query(
+    `SELECT table_name, column_name FROM information_schema.columns
+     WHERE table_schema = 'public' AND table_name IN ('comments', 'comment_reactions')`
+  );
+  const has = (t, c) => cols.rows.some(r => r.table_name === t && r.column_name === c);
+  const parent = ['parent_comment_id', 'parent_id'].find(c => has('comments', c));
+
+  const queries = [
+    `CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reactions_post ON reactions (post_id)`,
+    `CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_comments_post_id ON comments (post_id, id)`,
+    ...(parent ? [
+      `CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_comments_post_top
+        ON comments (post_id, id) WHERE ${parent} IS NULL`,
+      `CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_comments_parent_id
+        ON comments (${parent}, id) WHERE ${parent} IS NOT NULL`,
+    ] : []),
+    ...(has('comment_reactions', 'comment_id') ? [
+      `CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_comment_reactions_comment ON comment_reactions (comment_id)`,
+    ] : []),
+    `ANALYZE reactions`,
+    `ANALYZE comments`,
+  ];
+
+  for (const q of queries) {
+    try {
+      await db.query(q);
+      console.log('OK:', q.substring(0, 60));
+    } catch(e) {
+      console.error('ERR:', q.substring(0, 60), e.message);
+    }
+  }
+
+  console.log('Engagement indexes ready!');
+  await db.end();
+}
+
+main().catch(e => { console.error(e); process.exit(1); });
@@ -0,0 +1,61 @@
+// Unique per-user reaction rows, needed by the write-behind reaction upserts
+// (tmp_patch_reaction_counters.js):
+//   - reactions: one row per (post_id, user) — duplicates left by the old
+//     read-then-insert race are removed first, keeping the newest row
+//   - channel_reactions already has UNIQUE(message_id, user_address, emoji)
+// Built CONCURRENTLY so reacting is not blocked.
+// Run on server: node tmp_create_reaction_constraints.js
+const { Client } = require('pg');
+require('dotenv').config();
+
+async function main() {
+  const db = new Client({
+    host: process.env.DB_HOST || 'localhost',
+    port: process.env.DB_PORT || 5432,
+    database: process.env.DB_NAME || 'hyve_social',
+    user: process.env.DB_USER || 'hyve_admin',
+    password: process.env.DB_PASSWORD,
+  });
+  await db.connect();
+
+  const invalid = await db.query(
+    `SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+     WHERE NOT i.indisvalid AND c.relname = 'idx_reactions_post_user'`
+  );
+  for (const row of invalid.rows) {
+    await db.query(`DROP INDEX CONCURRENTLY IF EXISTS ${row.relname}`);
+    console.log('Dropped invalid index:', row.relname);
+  }
+
+  const cols = await db.query(
+    `SELECT column_name FROM information_schema.columns
+     WHERE table_schema = 'public' AND table_name = 'reactions'`
+  );
+  const userCol = ['user_address', 'wallet_address'].find(c => cols.rows.some(r => r.column_name === c));
+  if (!userCol) {
+    console.error('reactions has no user_address / wallet_address column');
+    process.exit(1);
+  }
+
+  const queries = [
+    `DELETE FROM reactions a USING reactions b
+      WHERE a.post_id = b.post_id AND a.${userCol} = b.${userCol} AND a.ctid < b.ctid`,
+    `CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_reactions_post_user
+      ON reactions (post_id, ${userCol})`,
+    `ANALYZE reactions`,
+  ];
+
+  for (const q of queries) {
+    try {
+      const result = await db.query(q);
+      console.log('OK:', q.substring(0, 60), result.rowCount != null ? `(${result.rowCount} rows)` : '');
+    } catch(e) {
+      console.error('ERR:', q.substring(0, 60), e.message);
+    }
+  }
+
+  console.log('Reaction constraints ready!');
+  await db.end();
+}
+
+main().catch(e => { console.error(e); process.exit(1); });
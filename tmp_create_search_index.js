@@ -0,0 +1,54 @@
+// Channel message search indexes (used by GET /api/groups/:id/search)
+// Both are expression indexes on channel_messages.content, so Postgres keeps them
+// current on every insert, edit (including the edit-history path) and delete —
+// no extra column on the hot table and no triggers to maintain.
+// Built CONCURRENTLY so sends/edits are not blocked while they build.
+// Run on server: node tmp_create_search_index.js
+const { Client } = require('pg');
+require('dotenv').config();
+
+async function main() {
+  const db = new Client({
+    host: process.env.DB_HOST || 'localhost',
+    port: process.env.DB_PORT || 5432,
+    database: process.env.DB_NAME || 'hyve_social',
+    user: process.env.DB_USER || 'hyve_admin',
+    password: process.env.DB_PASSWORD,
+  });
+  await db.connect();
+
+  // A failed CONCURRENTLY build leaves an INVALID index behind that IF NOT EXISTS would skip
+  const invalid = await db.query(
+    `SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+     WHERE NOT i.indisvalid AND c.relname IN ('idx_channel_messages_fts', 'idx_channel_messages_trgm')`
+  );
+  for (const row of invalid.rows) {
+    await db.query(`DROP INDEX CONCURRENTLY IF EXISTS ${row.relname}`);
+    console.log('Dropped invalid index:', row.relname);
+  }
+
+  const queries = [
+    `CREATE EXTENSION IF NOT EXISTS pg_trgm`,
+    // Ranked word/prefix search — the expression must match the one in the search endpoint
+    `CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_channel_messages_fts
+      ON channel_messages USING GIN (to_tsvector('english', content))`,
+    // Substring matches (ILIKE '%term%') for fragments the tsvector can't see, e.g. inside URLs or handles
+    `CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_channel_messages_trgm
+      ON channel_messages USING GIN (content gin_trgm_ops)`,
+    `ANALYZE channel_messages`,
+  ];
+
+  for (const q of queries) {
+    try {
+      await db.query(q);
+      console.log('OK:', q.substring(0, 60));
+    } catch(e) {
+      console.error('ERR:', q.substring(0, 60), e.message);
+    }
+  }
+
+  console.log('Search indexes ready!');
+  await db.end();
+}
+
+main().catch(e => { console.error(e); process.exit(1); });
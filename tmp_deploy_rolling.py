@@ -0,0 +1,410 @@
+"""Zero-downtime rolling deploys for the social API (/root/server.js).
+
+The API runs as a small cluster of pm2 processes, one per worker slot, behind an nginx
+upstream (`hyve_api`). Every slot owns two ports and alternates between them. A deploy
+replaces one slot at a time:
+
+  1. run the patch scripts given with --patch, then `node --check` the result
+     (a failed patch or syntax error restores the previous server.js and stops there)
+  2. start the new code on the slot's spare port and wait until GET /api/health answers
+     200 several times in a row
+  3. swap the port in the nginx upstream (`nginx -t`, then a graceful reload)
+  4. stop the old process: tmp_patch_graceful_drain.js makes it stop accepting, send each
+     socket a `server_draining` hint with a random reconnect delay, finish in-flight
+     requests and exit
+  5. wait --settle seconds for the moved clients to land, then do the next slot
+
+If a new worker never becomes healthy, the last good server.js is restored and every slot
+that was already replaced is rolled back the same way, so users never hit the bad build.
+
+More than one worker needs the socket.io Postgres adapter (`npm install
+@socket.io/postgres-adapter`, picked up by tmp_patch_graceful_drain.js): without it a room
+emit only reaches the sockets on the worker that sent it. `setup --workers N` refuses N > 1
+until /api/health reports `socketAdapter: postgres`, and lists the server.js lines that still
+look sockets up in the per-process `onlineUsers` map, which only ever see their own worker.
+
+Run on server (after tmp_patch_graceful_drain.js):
+    python3 tmp_deploy_rolling.py setup --retire hyve-social-api
+    python3 tmp_deploy_rolling.py setup --workers 2 --retire hyve-social-api   # with the adapter
+    python3 tmp_deploy_rolling.py deploy --patch tmp_patch_discovery.js
+    python3 tmp_deploy_rolling.py deploy            # server.js already edited by hand
+    python3 tmp_deploy_rolling.py status
+    python3 tmp_deploy_rolling.py rollback          # previous release, rolled the same way
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+APP_DIR = "/root"
+SERVER_JS = f"{APP_DIR}/server.js"
+STATE_DIR = f"{APP_DIR}/.hyve-deploy"
+STATE_FILE = f"{STATE_DIR}/state.json"
+RELEASES_DIR = f"{STATE_DIR}/releases"
+KEEP_RELEASES = 10
+SITE = "social-api.hyvechain.com"
+SITE_FILE = f"/etc/nginx/sites-available/{SITE}"
+UPSTREAM_CONF = "/etc/nginx/conf.d/hyve_api_upstream.conf"
+UPSTREAM_NAME = "hyve_api"
+PROCESS_PREFIX = "hyve-api-"
+
+
+class DeployError(Exception):
+    pass
+
+
+def run(cmd, desc, check=True, env=None, timeout=120):
+    print(f"\n{'='*60}")
+    print(f"STEP: {desc}")
+    print(f"CMD:  {cmd}")
+    print(f"{'='*60}")
+    proc = subprocess.run(cmd, shell=True, cwd=APP_DIR, capture_output=True, text=True,
+                          env={**os.environ, **(env or {})}, timeout=timeout)
+    if proc.stdout.strip():
+        print(proc.stdout)
+    if proc.stderr.strip():
+        print(f"STDERR: {proc.stderr}")
+    if check and proc.returncode != 0:
+        raise DeployError(f"{desc} failed (exit {proc.returncode})")
+    return proc.returncode, proc.stdout
+
+
+# ── State ──
+
+def load_state():
+    if not os.path.exists(STATE_FILE):
+        return None
+    with open(STATE_FILE) as fh:
+        return json.load(fh)
+
+
+def save_state(state):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    tmp = STATE_FILE + ".tmp"
+    with open(tmp, "w") as fh:
+        json.dump(state, fh, indent=2)
+    os.replace(tmp, STATE_FILE)
+
+
+def spare_port(state, port):
+    # Slot i owns base + 2i and base + 2i + 1
+    return port + 1 if (port - state["base_port"]) % 2 == 0 else port - 1
+
+
+def record_release(state):
+    """Keep a copy of the server.js that is now live on every worker."""
+    os.makedirs(RELEASES_DIR, exist_ok=True)
+    name = time.strftime("%Y%m%d-%H%M%S") + ".js"
+    shutil.copy2(SERVER_JS, f"{RELEASES_DIR}/{name}")
+    state["releases"] = (state.get("releases", []) + [name])[-KEEP_RELEASES:]
+    for old in os.listdir(RELEASES_DIR):
+        if old not in state["releases"]:
+            os.remove(f"{RELEASES_DIR}/{old}")
+    save_state(state)
+    print(f"Recorded release {name}")
+
+
+def live_release(state):
+    return f"{RELEASES_DIR}/{state['releases'][-1]}" if state.get("releases") else None
+
+
+# ── Health ──
+
+def health(port, path, timeout=3):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=timeout) as resp:
+            return resp.status, json.loads(resp.read() or b"{}")
+    except urllib.error.HTTPError as err:
+        return err.code, {}
+    except (urllib.error.URLError, OSError, ValueError):
+        return None, {}
+
+
+def wait_healthy(port, args):
+    """True once the worker passes --healthy-checks consecutive checks within --health-timeout."""
+    deadline = time.time() + args.health_timeout
+    streak = 0
+    while time.time() < deadline:
+        status, body = health(port, args.health_path)
+        if status == 200:
+            streak += 1
+            print(f"  :{port} healthy ({streak}/{args.healthy_checks}) pid={body.get('pid')}")
+            if streak >= args.healthy_checks:
+                return True
+        else:
+            if streak:
+                print(f"  :{port} check failed after {streak} good ones (status {status})")
+            streak = 0
+        time.sleep(args.health_interval)
+    print(f"  :{port} not healthy after {args.health_timeout}s")
+    return False
+
+
+# ── Processes and nginx ──
+
+def start_worker(port, args):
+    name = f"{PROCESS_PREFIX}{port}"
+    run(f"pm2 delete {name}", f"Clear any stale {name}", check=False)
+    kill_timeout = (args.drain_timeout + 5) * 1000
+    run(f"pm2 start {SERVER_JS} --name {name} --cwd {APP_DIR} --kill-timeout {kill_timeout} --time",
+        f"Start {name}",
+        env={
+            "PORT": str(port),
+            "DRAIN_TIMEOUT_MS": str(args.drain_timeout * 1000),
+            "RECONNECT_SPREAD_MS": str(args.reconnect_spread * 1000),
+        })
+
+
+def stop_worker(port, args):
+    # pm2 sends SIGINT and waits up to --kill-timeout while the worker drains
+    name = f"{PROCESS_PREFIX}{port}"
+    run(f"pm2 delete {name}", f"Drain and stop {name}", check=False, timeout=args.drain_timeout + 60)
+
+
+def write_upstream(ports):
+    servers = "\n".join(f"    server 127.0.0.1:{port} max_fails=2 fail_timeout=5s;" for port in ports)
+    conf = f"""# Managed by tmp_deploy_rolling.py — do not edit by hand
+upstream {UPSTREAM_NAME} {{
+    # Same client, same worker, so socket.io long-polling stays on one process;
+    # consistent hashing only moves the clients of the slot being replaced
+    hash $remote_addr consistent;
+{servers}
+    keepalive 64;
+}}
+"""
+    previous = open(UPSTREAM_CONF).read() if os.path.exists(UPSTREAM_CONF) else None
+    with open(UPSTREAM_CONF, "w") as fh:
+        fh.write(conf)
+    status, _ = run("nginx -t", "Test nginx configuration", check=False)
+    if status != 0:
+        if previous is None:
+            os.remove(UPSTREAM_CONF)
+        else:
+            with open(UPSTREAM_CONF, "w") as fh:
+                fh.write(previous)
+        raise DeployError("nginx -t rejected the upstream config (previous config restored)")
+    run("systemctl reload nginx", "Reload nginx (graceful)")
+
+
+# ── Rolling replacement ──
+
+def replace_slot(state, slot, args):
+    """Bring the slot up on its spare port with the current server.js. False if never healthy."""
+    old = state["slots"][slot]
+    new = spare_port(state, old)
+    print(f"\n──── slot {slot}: :{old} -> :{new} ────")
+    start_worker(new, args)
+    if not wait_healthy(new, args):
+        run(f"pm2 logs {PROCESS_PREFIX}{new} --lines 40 --nostream", f"Last log lines of {PROCESS_PREFIX}{new}", check=False)
+        stop_worker(new, args)
+        return False
+    ports = list(state["slots"])
+    ports[slot] = new
+    try:
+        write_upstream(ports)
+    except DeployError:
+        stop_worker(new, args)
+        raise
+    state["slots"] = ports
+    save_state(state)
+    stop_worker(old, args)
+    return True
+
+
+def roll(state, args, slots):
+    """Replace the given slots in order; returns the slots that were replaced before a failure."""
+    replaced = []
+    for index, slot in enumerate(slots):
+        if not replace_slot(state, slot, args):
+            return replaced, slot
+        replaced.append(slot)
+        if index < len(slots) - 1 and args.settle:
+            print(f"Waiting {args.settle}s for moved clients to settle")
+            time.sleep(args.settle)
+    return replaced, None
+
+
+def rollback_to(state, release, slots, args):
+    print(f"\n!!!! Rolling back slots {slots} to {os.path.basename(release)} !!!!")
+    shutil.copy2(release, SERVER_JS)
+    replaced, failed = roll(state, args, slots)
+    if failed is not None:
+        raise DeployError(f"rollback could not bring slot {failed} back up — check `pm2 logs` now")
+    return replaced
+
+
+def check_cluster_ready(port, args):
+    """Exit unless the worker on `port` can share socket emits with other workers."""
+    _, body = health(port, args.health_path)
+    if body.get("socketAdapter") != "postgres":
+        stop_worker(port, args)
+        sys.exit(f"--workers {args.workers} needs the socket.io Postgres adapter, but /api/health reports "
+                 f"socketAdapter={body.get('socketAdapter')!r}. Run `npm install @socket.io/postgres-adapter` "
+                 f"in {APP_DIR} and retry, or use --workers 1 — nothing was switched")
+    with open(SERVER_JS) as fh:
+        local = [f"{n}: {line.strip()}" for n, line in enumerate(fh, 1) if "onlineUsers.get(" in line]
+    if local:
+        print(f"WARNING: {len(local)} server.js line(s) still emit through this worker's onlineUsers; "
+              f"users on another worker miss those events until they use io.to('user-' + address):")
+        for line in local:
+            print(f"    {line}")
+
+
+# ── Commands ──
+
+def cmd_setup(args):
+    if load_state():
+        sys.exit(f"Already set up ({STATE_FILE}); use `deploy` or `status`")
+    run(f"node --check {SERVER_JS}", "Syntax check server.js")
+    with open(SERVER_JS) as fh:
+        if "serverLifecycle" not in fh.read():
+            sys.exit("server.js has no /api/health or drain handling — run tmp_patch_graceful_drain.js first")
+
+    state = {"base_port": args.base_port, "slots": [], "releases": []}
+    for slot in range(args.workers):
+        port = args.base_port + 2 * slot
+        start_worker(port, args)
+        if not wait_healthy(port, args):
+            for started in state["slots"] + [port]:
+                stop_worker(started, args)
+            sys.exit(f"Worker on :{port} never became healthy — nothing was switched")
+        if slot == 0 and args.workers > 1:
+            check_cluster_ready(port, args)
+        state["slots"].append(port)
+    write_upstream(state["slots"])
+    save_state(state)
+
+    with open(SITE_FILE) as fh:
+        site_conf = fh.read()
+    target = f"proxy_pass http://{UPSTREAM_NAME};"
+    legacy = f"proxy_pass {args.legacy_upstream};"
+    if legacy in site_conf:
+        run(f"cp {SITE_FILE} {SITE_FILE}.bak-rolling", "Back up site config")
+        with open(SITE_FILE, "w") as fh:
+            fh.write(site_conf.replace(legacy, target))
+        status, _ = run("nginx -t", "Test nginx configuration", check=False)
+        if status != 0:
+            run(f"cp {SITE_FILE}.bak-rolling {SITE_FILE}", "Restore site config (nginx -t failed)")
+            sys.exit(1)
+        run("systemctl reload nginx", "Point the site at the worker upstream")
+    elif target not in site_conf:
+        print(f"WARNING: no `{legacy}` in {SITE_FILE}; point its locations at http://{UPSTREAM_NAME} by hand")
+
+    if args.retire:
+        run(f"pm2 stop {args.retire}", f"Retire the single-process API ({args.retire})", check=False,
+            timeout=args.drain_timeout + 60)
+    record_release(state)
+    print(f"\n\nDONE - {args.workers} workers on {state['slots']} behind upstream {UPSTREAM_NAME}.")
+
+
+def cmd_deploy(args):
+    state = load_state()
+    if not state:
+        sys.exit("Not set up yet — run `setup` first")
+    os.makedirs(STATE_DIR, exist_ok=True)
+    pre_deploy = f"{STATE_DIR}/server.pre-deploy.js"
+    shutil.copy2(SERVER_JS, pre_deploy)
+
+    try:
+        for patch in args.patch:
+            run(f"node {os.path.abspath(patch)}", f"Apply {os.path.basename(patch)}")
+        run(f"node --check {SERVER_JS}", "Syntax check server.js")
+    except DeployError as err:
+        if args.patch:
+            shutil.copy2(pre_deploy, SERVER_JS)
+            sys.exit(f"{err} — server.js restored to its pre-patch state, no worker was touched")
+        sys.exit(f"{err} — fix server.js and deploy again, no worker was touched")
+
+    slots = list(range(len(state["slots"])))
+    replaced, failed = roll(state, args, slots)
+    if failed is None:
+        record_release(state)
+        print(f"\n\nDONE - all {len(slots)} workers running the new build.")
+        return
+
+    # The new build never came up on slot `failed`: put the replaced slots back on the last good one
+    release = live_release(state) or pre_deploy
+    try:
+        rollback_to(state, release, replaced, args)
+    except DeployError as err:
+        sys.exit(f"ROLLBACK INCOMPLETE: {err}")
+    sys.exit(f"\n\nROLLED BACK - slot {failed} failed its health checks; "
+             f"{len(replaced)} replaced slot(s) are back on {os.path.basename(release)}.")
+
+
+def cmd_rollback(args):
+    state = load_state()
+    if not state or (len(state.get("releases", [])) < 2 and not args.to):
+        sys.exit("No previous release to roll back to")
+    release = args.to or f"{RELEASES_DIR}/{state['releases'][-2]}"
+    run(f"node --check {release}", "Syntax check the release")
+    try:
+        rollback_to(state, release, list(range(len(state["slots"]))), args)
+    except DeployError as err:
+        sys.exit(f"ROLLBACK INCOMPLETE: {err}")
+    record_release(state)
+    print(f"\n\nDONE - rolled back to {os.path.basename(release)}.")
+
+
+def cmd_status(args):
+    state = load_state()
+    if not state:
+        sys.exit("Not set up yet — run `setup` first")
+    print(f"Live release: {state['releases'][-1] if state.get('releases') else 'unknown'}")
+    for slot, port in enumerate(state["slots"]):
+        status, body = health(port, args.health_path)
+        print(f"  slot {slot}  :{port}  {status or 'down'}  pid={body.get('pid', '-')}  "
+              f"uptime={body.get('uptime', '-')}s  sockets={body.get('sockets', '-')}  inFlight={body.get('inFlight', '-')}  "
+              f"adapter={body.get('socketAdapter', '-')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zero-downtime rolling deploys for the social API")
+    parser.add_argument("--health-path", default="/api/health")
+    parser.add_argument("--health-timeout", type=int, default=60, help="seconds a new worker gets to become healthy")
+    parser.add_argument("--health-interval", type=float, default=1.0)
+    parser.add_argument("--healthy-checks", type=int, default=3, help="consecutive 200s required")
+    parser.add_argument("--drain-timeout", type=int, default=25, help="seconds an old worker gets to drain")
+    parser.add_argument("--reconnect-spread", type=int, default=15,
+                        help="seconds over which drained clients spread their reconnects")
+    parser.add_argument("--settle", type=int, default=None,
+                        help="pause between slots (default: --reconnect-spread)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    setup = sub.add_parser("setup", help="start the worker slots and put nginx in front of them")
+    setup.add_argument("--workers", type=int, default=1,
+                       help="more than one needs the socket.io Postgres adapter")
+    setup.add_argument("--base-port", type=int, default=3100)
+    setup.add_argument("--legacy-upstream", default="http://localhost:3000",
+                       help="proxy_pass target in the site config to replace")
+    setup.add_argument("--retire", help="pm2 name of the old single-process API to stop afterwards")
+    setup.set_defaults(func=cmd_setup)
+
+    deploy = sub.add_parser("deploy", help="patch, check and roll the new server.js across the workers")
+    deploy.add_argument("--patch", action="append", default=[], help="patch script to apply first (repeatable)")
+    deploy.set_defaults(func=cmd_deploy)
+
+    rollback = sub.add_parser("rollback", help="roll the previous release back out")
+    rollback.add_argument("--to", help="release file to roll out instead of the previous one")
+    rollback.set_defaults(func=cmd_rollback)
+
+    status = sub.add_parser("status", help="health of every worker slot")
+    status.set_defaults(func=cmd_status)
+
+    args = parser.parse_args()
+    if args.settle is None:
+        args.settle = args.reconnect_spread
+    try:
+        args.func(args)
+    except DeployError as err:
+        sys.exit(f"FAILED: {err}")
+
+
+if __name__ == "__main__":
+    main()
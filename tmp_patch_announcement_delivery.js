@@ -0,0 +1,376 @@
+// Backend patch: deliver published announcements to every following channel
+// Needs tmp_create_announcement_delivery.js (channel_follows, announcement_deliveries,
+// channel_messages.crosspost_of).
+// Adds:
+//   POST   /api/channels/:channelId/followers           { targetChannelId } — follow an announcement
+//                                                        channel into a channel you can manage
+//   DELETE /api/channels/:channelId/followers/:targetChannelId
+//   GET    /api/channels/:channelId/followers           -> { count }
+// Publish (POST /api/channels/:channelId/messages/:messageId/publish) now records the
+// announcement and a delivery job in one transaction and answers right away. Delivery runs
+// in the background on whichever API worker claims the job (FOR UPDATE SKIP LOCKED + lease):
+//   - followers are walked by keyset in DELIVERY_BATCH_SIZE batches; each batch is one
+//     INSERT ... SELECT FROM unnest() committed together with the job cursor, and
+//     crosspost_of makes a replayed batch a no-op, so a crash or retry never double-posts
+//   - a token bucket caps inserts at DELIVERY_RATE_PER_SEC target channels per worker, and
+//     after DELIVERY_BATCHES_PER_TURN batches the job goes back in the queue so a huge
+//     fan-out doesn't hold up the announcements published after it
+//   - failures retry with exponential backoff; after DELIVERY_MAX_ATTEMPTS the job is 'failed'
+//   - new rows are emitted every DELIVERY_EMIT_MS as one 'channel_messages_batch' per target
+//     room, and the channel tail cache on every worker drops those channels (one NOTIFY per
+//     chunk of rooms instead of one per message)
+// Run on server: node tmp_patch_announcement_delivery.js
+
+const fs = require('fs');
+
+const serverPath = '/root/server.js';
+let code = fs.readFileSync(serverPath, 'utf8');
+let changes = 0;
+
+if (code.includes('const announcementDelivery')) {
+  console.log('SKIP - announcement delivery already patched');
+  process.exit(0);
+}
+
+// ── 1. Delivery service + follow routes, before server.listen ──
+const SERVICE = `
+// ═══════════════════════════════════════════════════════════
+// ANNOUNCEMENT DELIVERY (published message -> following channels)
+// ═══════════════════════════════════════════════════════════
+const DELIVERY_BATCH_SIZE = parseInt(process.env.DELIVERY_BATCH_SIZE || '500');
+const DELIVERY_RATE_PER_SEC = parseInt(process.env.DELIVERY_RATE_PER_SEC || '2000'); // target channels, per worker
+const DELIVERY_BATCHES_PER_TURN = 10;
+const DELIVERY_LEASE_MS = 60000;
+const DELIVERY_POLL_MS = 2000;
+const DELIVERY_EMIT_MS = 250;
+const DELIVERY_EMIT_CHUNK = 200; // rooms per event-loop turn (and per cache NOTIFY)
+const DELIVERY_MAX_ATTEMPTS = 8;
+const DELIVERY_MAX_BACKOFF_MS = 10 * 60 * 1000;
+
+const announcementDelivery = (() => {
+  const workerId = \`\${require('os').hostname()}:\${process.pid}\`;
+  let running = false;
+  let rerun = false;
+  let tokens = DELIVERY_RATE_PER_SEC;
+  let refilledAt = Date.now();
+  const outbox = new Map(); // target channel id -> [message payloads] for the next coalesced emit
+  let emitTimer = null;
+
+  async function inTransaction(fn) {
+    const client = await db.connect();
+    try {
+      await client.query('BEGIN');
+      const result = await fn(client);
+      await client.query('COMMIT');
+      return result;
+    } catch (err) {
+      await client.query('ROLLBACK').catch(() => {});
+      throw err;
+    } finally {
+      client.release();
+    }
+  }
+
+  // Token bucket: a 20k-channel fan-out is spread over ~10s instead of landing at once
+  async function takeTokens(count) {
+    const need = Math.min(count, DELIVERY_RATE_PER_SEC);
+    for (;;) {
+      const now = Date.now();
+      tokens = Math.min(DELIVERY_RATE_PER_SEC, tokens + (now - refilledAt) * DELIVERY_RATE_PER_SEC / 1000);
+      refilledAt = now;
+      if (tokens >= need) {
+        tokens -= need;
+        return;
+      }
+      await new Promise(resolve => setTimeout(resolve, Math.ceil((need - tokens) * 1000 / DELIVERY_RATE_PER_SEC)));
+    }
+  }
+
+  async function publish({ messageId, channelId, address }) {
+    await inTransaction(async (client) => {
+      const announcement = await client.query(
+        'INSERT INTO published_announcements (message_id, channel_id, published_by) VALUES ($1, $2, $3) RETURNING id',
+        [messageId, channelId, address]
+      );
+      await client.query(
+        'INSERT INTO announcement_deliveries (announcement_id, message_id, source_channel_id) VALUES ($1, $2, $3)',
+        [announcement.rows[0].id, messageId, channelId]
+      );
+    });
+    const followers = await db.query('SELECT COUNT(*)::int AS count FROM channel_follows WHERE source_channel_id = $1', [channelId]);
+    run();
+    return { followers: followers.rows[0].count };
+  }
+
+  async function claim() {
+    const result = await db.query(
+      \`UPDATE announcement_deliveries d
+       SET status = 'running', locked_by = $1, locked_until = NOW() + $2 * INTERVAL '1 millisecond'
+       WHERE d.id = (
+         SELECT id FROM announcement_deliveries
+         WHERE status IN ('pending', 'running') AND next_attempt_at <= NOW()
+           AND (locked_until IS NULL OR locked_until < NOW())
+         ORDER BY next_attempt_at, id
+         LIMIT 1
+         FOR UPDATE SKIP LOCKED
+       )
+       RETURNING d.*\`,
+      [workerId, DELIVERY_LEASE_MS]
+    );
+    return result.rows[0] || null;
+  }
+
+  // Author and origin, looked up once per job and attached to every delivered copy
+  async function describe(messageId) {
+    const result = await db.query(
+      \`SELECT m.id, m.channel_id, u.username, u.profile_image,
+              c.name AS channel_name, g.id AS group_id, g.name AS group_name
+       FROM channel_messages m
+       JOIN channels c ON c.id = m.channel_id
+       JOIN groups g ON g.id = c.group_id
+       LEFT JOIN users u ON u.wallet_address = m.user_address
+       WHERE m.id = $1\`,
+      [messageId]
+    );
+    return result.rows[0] || null;
+  }
+
+  async function deliverBatch(job, source) {
+    const follows = await db.query(
+      'SELECT id, target_channel_id FROM channel_follows WHERE source_channel_id = $1 AND id > $2 ORDER BY id LIMIT $3',
+      [job.source_channel_id, job.follow_cursor, DELIVERY_BATCH_SIZE]
+    );
+    if (follows.rows.length === 0) return false;
+    await takeTokens(follows.rows.length);
+
+    const cursor = follows.rows[follows.rows.length - 1].id;
+    const inserted = await inTransaction(async (client) => {
+      const result = await client.query(
+        \`INSERT INTO channel_messages (channel_id, user_address, content, image_url, crosspost_of)
+         SELECT t.channel_id, m.user_address, m.content, m.image_url, m.id
+         FROM unnest($1::int[]) AS t(channel_id)
+         JOIN channels c ON c.id = t.channel_id
+         JOIN channel_messages m ON m.id = $2
+         ON CONFLICT (channel_id, crosspost_of) WHERE crosspost_of IS NOT NULL DO NOTHING
+         RETURNING *\`,
+        [follows.rows.map(f => f.target_channel_id), job.message_id]
+      );
+      // Rows and cursor commit together: a retry starts right after the last batch that landed
+      const moved = await client.query(
+        \`UPDATE announcement_deliveries
+         SET follow_cursor = $1, delivered = delivered + $2, attempts = 0,
+             locked_until = NOW() + $3 * INTERVAL '1 millisecond'
+         WHERE id = $4 AND locked_by = $5\`,
+        [cursor, result.rowCount, DELIVERY_LEASE_MS, job.id, workerId]
+      );
+      if (moved.rowCount === 0) throw new Error('Delivery lease lost');
+      return result.rows;
+    });
+
+    job.follow_cursor = cursor;
+    job.attempts = 0;
+    const crosspost = {
+      messageId: source.id, channelId: source.channel_id, channelName: source.channel_name,
+      groupId: source.group_id, groupName: source.group_name,
+    };
+    for (const row of inserted) {
+      const message = { ...row, username: source.username, profile_image: source.profile_image, reactions: [], thread: null, crosspost };
+      if (!outbox.has(row.channel_id)) outbox.set(row.channel_id, []);
+      outbox.get(row.channel_id).push(message);
+    }
+    if (inserted.length > 0 && !emitTimer) emitTimer = setTimeout(flushEmits, DELIVERY_EMIT_MS);
+    return true;
+  }
+
+  async function flushEmits() {
+    emitTimer = null;
+    const rooms = [...outbox.entries()];
+    outbox.clear();
+    for (let i = 0; i < rooms.length; i += DELIVERY_EMIT_CHUNK) {
+      const chunk = rooms.slice(i, i + DELIVERY_EMIT_CHUNK);
+      for (const [channelId, messages] of chunk) {
+        // One event per room however many announcements landed in it since the last flush
+        io.to('channel-' + channelId).emit('channel_messages_batch', { channelId, messages });
+        if (typeof channelTailCache !== 'undefined') channelTailCache.invalidate(channelId);
+      }
+      if (typeof channelTailCache !== 'undefined') {
+        db.query("SELECT pg_notify('channel_tail_invalidate', $1)",
+          [JSON.stringify({ channelIds: chunk.map(([channelId]) => channelId), pid: process.pid })])
+          .catch(err => console.error('Channel cache notify error:', err.message));
+      }
+      await new Promise(resolve => setImmediate(resolve));
+    }
+  }
+
+  async function finish(job, note) {
+    await db.query(
+      \`UPDATE announcement_deliveries
+       SET status = 'done', completed_at = NOW(), last_error = $1, locked_by = NULL, locked_until = NULL
+       WHERE id = $2 AND locked_by = $3\`,
+      [note || null, job.id, workerId]
+    );
+  }
+
+  async function work(job) {
+    try {
+      const source = await describe(job.message_id);
+      if (!source) return finish(job, 'Source message deleted');
+      for (let turn = 0; turn < DELIVERY_BATCHES_PER_TURN; turn++) {
+        if (!(await deliverBatch(job, source))) return finish(job);
+      }
+      // Large fan-out: back of the queue, so announcements published meanwhile get a turn
+      await db.query(
+        \`UPDATE announcement_deliveries
+         SET status = 'pending', locked_by = NULL, locked_until = NULL, next_attempt_at = NOW()
+         WHERE id = $1 AND locked_by = $2\`,
+        [job.id, workerId]
+      );
+    } catch (err) {
+      const attempts = job.attempts + 1;
+      const failed = attempts >= DELIVERY_MAX_ATTEMPTS;
+      console.error(\`Announcement delivery \${job.id} failed (attempt \${attempts}\${failed ? ', giving up' : ''}):\`, err.message);
+      await db.query(
+        \`UPDATE announcement_deliveries
+         SET status = $1, attempts = $2, last_error = $3, locked_by = NULL, locked_until = NULL,
+             next_attempt_at = NOW() + $4 * INTERVAL '1 millisecond'
+         WHERE id = $5 AND locked_by = $6\`,
+        [failed ? 'failed' : 'pending', attempts, err.message, Math.min(1000 * 2 ** attempts, DELIVERY_MAX_BACKOFF_MS), job.id, workerId]
+      ).catch(e => console.error('Announcement delivery bookkeeping error:', e.message));
+    }
+  }
+
+  // One job at a time per worker; other workers pick up the rest of the queue
+  async function run() {
+    if (running) {
+      rerun = true;
+      return;
+    }
+    running = true;
+    try {
+      do {
+        rerun = false;
+        let job;
+        while ((job = await claim())) await work(job);
+      } while (rerun);
+    } catch (err) {
+      console.error('Announcement delivery error:', err.message);
+    } finally {
+      running = false;
+    }
+  }
+
+  setInterval(run, DELIVERY_POLL_MS).unref();
+
+  return { publish, run };
+})();
+
+// ── Follow an announcement channel into a channel of any server you manage ──
+app.post('/api/channels/:channelId/followers', authenticateToken, async (req, res) => {
+  try {
+    const address = await resolveAddress(req.user.address);
+    const { channelId } = req.params;
+    const targetChannelId = parseInt(req.body.targetChannelId);
+    if (!targetChannelId) return res.status(400).json({ error: 'targetChannelId is required' });
+
+    const source = await db.query(
+      'SELECT c.id, c.type, c.group_id, g.privacy FROM channels c JOIN groups g ON g.id = c.group_id WHERE c.id = $1',
+      [channelId]
+    );
+    if (!source.rows[0]) return res.status(404).json({ error: 'Channel not found' });
+    if (source.rows[0].type !== 'announcement') return res.status(400).json({ error: 'Only announcement channels can be followed' });
+    if (source.rows[0].privacy !== 'public') {
+      const member = await db.query(
+        'SELECT 1 FROM group_members WHERE group_id = $1 AND LOWER(member_address) = LOWER($2)',
+        [source.rows[0].group_id, address]
+      );
+      if (!member.rows[0]) return res.status(403).json({ error: 'Not a member of this server' });
+    }
+
+    const target = await db.query('SELECT id, group_id FROM channels WHERE id = $1', [targetChannelId]);
+    if (!target.rows[0]) return res.status(404).json({ error: 'Target channel not found' });
+    if (target.rows[0].id === source.rows[0].id) return res.status(400).json({ error: 'A channel cannot follow itself' });
+    const canManage = await hasPermission(target.rows[0].group_id, address, 'manageChannels');
+    if (!canManage) return res.status(403).json({ error: 'No permission' });
+
+    await db.query(
+      \`INSERT INTO channel_follows (source_channel_id, target_channel_id, target_group_id, created_by)
+       VALUES ($1, $2, $3, $4) ON CONFLICT (source_channel_id, target_channel_id) DO NOTHING\`,
+      [source.rows[0].id, target.rows[0].id, target.rows[0].group_id, address]
+    );
+    res.json({ following: true });
+  } catch (err) {
+    console.error('Follow channel error:', err);
+    res.status(500).json({ error: 'Failed to follow channel' });
+  }
+});
+
+app.delete('/api/channels/:channelId/followers/:targetChannelId', authenticateToken, async (req, res) => {
+  try {
+    const address = await resolveAddress(req.user.address);
+    const { channelId, targetChannelId } = req.params;
+    const follow = await db.query(
+      'SELECT id, target_group_id FROM channel_follows WHERE source_channel_id = $1 AND target_channel_id = $2',
+      [channelId, targetChannelId]
+    );
+    if (!follow.rows[0]) return res.status(404).json({ error: 'Not following' });
+    const canManage = await hasPermission(follow.rows[0].target_group_id, address, 'manageChannels');
+    if (!canManage) return res.status(403).json({ error: 'No permission' });
+    await db.query('DELETE FROM channel_follows WHERE id = $1', [follow.rows[0].id]);
+    res.json({ following: false });
+  } catch (err) {
+    console.error('Unfollow channel error:', err);
+    res.status(500).json({ error: 'Failed to unfollow channel' });
+  }
+});
+
+app.get('/api/channels/:channelId/followers', authenticateToken, async (req, res) => {
+  try {
+    const result = await db.query(
+      'SELECT COUNT(*)::int AS count FROM channel_follows WHERE source_channel_id = $1',
+      [req.params.channelId]
+    );
+    res.json({ count: result.rows[0].count });
+  } catch (err) {
+    console.error('Channel followers error:', err);
+    res.status(500).json({ error: 'Failed to get followers' });
+  }
+});
+
+`;
+
+const listenIdx = code.lastIndexOf('server.listen(');
+if (listenIdx === -1) { console.error('Cannot find server.listen'); process.exit(1); }
+code = code.slice(0, listenIdx) + SERVICE + code.slice(listenIdx);
+changes++;
+console.log('1. Added announcement delivery service + follow routes');
+
+// ── 2. Publish enqueues a delivery job instead of stopping at the insert ──
+const PUBLISH_INSERT = `    await db.query('INSERT INTO published_announcements (message_id, channel_id, published_by) VALUES ($1, $2, $3)', [messageId, channelId, address]);
+    res.json({ published: true });`;
+if (!code.includes(PUBLISH_INSERT)) {
+  console.error('Cannot find the published_announcements insert in the publish route');
+  process.exit(1);
+}
+code = code.replace(PUBLISH_INSERT, `    const message = await db.query('SELECT id FROM channel_messages WHERE id = $1 AND channel_id = $2', [messageId, channelId]);
+    if (!message.rows[0]) return res.status(404).json({ error: 'Message not found' });
+    const delivery = await announcementDelivery.publish({ messageId, channelId, address });
+    res.json({ published: true, followers: delivery.followers });`);
+changes++;
+console.log('2. Publish now queues delivery to following channels');
+
+// ── 3. Channel tail cache: accept one NOTIFY for a whole chunk of channels ──
+const CACHE_LISTENER = `        const { channelId, pid } = JSON.parse(msg.payload);
+        if (pid !== process.pid) invalidate(channelId);`;
+if (code.includes(CACHE_LISTENER)) {
+  code = code.replace(CACHE_LISTENER, `        const { channelId, channelIds, pid } = JSON.parse(msg.payload);
+        if (pid !== process.pid) (channelIds || [channelId]).forEach(id => invalidate(id));`);
+  changes++;
+  console.log('3. Channel tail cache listener accepts batched invalidations');
+} else if (code.includes('(channelIds || [channelId])')) {
+  console.log('3. SKIP - channel tail cache listener already accepts batched invalidations');
+} else {
+  console.log('3. SKIP - channel tail cache not patched');
+}
+
+fs.writeFileSync(serverPath, code);
+console.log(`\nDone! Applied ${changes} changes.`);
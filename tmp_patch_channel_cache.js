@@ -0,0 +1,333 @@
+// Backend patch: hot channel tail cache for GET /api/channels/:channelId/messages
+// Keeps the newest CHANNEL_TAIL_SIZE messages per channel in memory (author info,
+// reactions and thread info already attached) and serves channel opens + `before`
+// paging from it. Older pages still go to Postgres.
+//
+// Write paths (send, poll, scheduled send, edit, delete, bulk delete, reactions,
+// threads, pin) update the buffer in place right after they broadcast, so the cache
+// sees changes in the same order clients do. Every mutation is also sent to the other
+// API workers as a Postgres NOTIFY carrying the same event and payload, which they apply
+// to their own copy; only a change too large for a NOTIFY makes them reload the channel.
+// Concurrent cold reads of one channel share a single load.
+// Re-running on a server with an older version of the cache swaps in the current module.
+// Run on server: node tmp_patch_channel_cache.js
+
+const fs = require('fs');
+
+const serverPath = '/root/server.js';
+let code = fs.readFileSync(serverPath, 'utf8');
+let changes = 0;
+
+// ── 1. Cache module, inserted before the GET messages route ──
+const CACHE_MODULE = `
+// ═══════════════════════════════════════════════════════════
+// HOT CHANNEL TAIL CACHE
+// ═══════════════════════════════════════════════════════════
+const CHANNEL_TAIL_SIZE = parseInt(process.env.CHANNEL_TAIL_SIZE || '200');
+const CHANNEL_TAIL_MAX_CHANNELS = parseInt(process.env.CHANNEL_TAIL_MAX_CHANNELS || '500');
+const CHANNEL_TAIL_TTL_MS = 5 * 60 * 1000; // bounds staleness of author names/avatars
+const CHANNEL_TAIL_NOTIFY_MAX = 7900; // NOTIFY payloads are capped at 8000 bytes
+
+const channelTailCache = (() => {
+  // channelId -> { messages (ascending id), complete (holds whole history), loadedAt }
+  const tails = new Map();
+  // channelId -> generation; bumped on every mutation so in-flight loads can't store stale rows
+  const generations = new Map();
+  // channelId -> { generation, promise } (single flight per channel and generation)
+  const loading = new Map();
+  let listenerReady = false;
+
+  const key = (channelId) => Number(channelId);
+  const bump = (id) => generations.set(id, (generations.get(id) || 0) + 1);
+
+  function touch(id, entry) {
+    // Map keeps insertion order — re-insert to mark as most recently used
+    tails.delete(id);
+    tails.set(id, entry);
+    while (tails.size > CHANNEL_TAIL_MAX_CHANNELS) {
+      tails.delete(tails.keys().next().value);
+    }
+  }
+
+  async function loadTail(id) {
+    const result = await db.query(
+      \`SELECT m.*, u.username, u.profile_image
+       FROM channel_messages m
+       JOIN users u ON m.user_address = u.wallet_address
+       WHERE m.channel_id = $1
+       ORDER BY m.created_at DESC LIMIT $2\`,
+      [id, CHANNEL_TAIL_SIZE]
+    );
+    const rows = result.rows.reverse();
+    const ids = rows.map(r => r.id);
+    const reactionsByMsg = {};
+    const threadByMsg = {};
+    if (ids.length > 0) {
+      const rcts = await db.query(
+        'SELECT message_id, emoji, COUNT(*)::int as count FROM channel_reactions WHERE message_id = ANY($1) GROUP BY message_id, emoji',
+        [ids]
+      );
+      rcts.rows.forEach(r => { (reactionsByMsg[r.message_id] ||= []).push({ emoji: r.emoji, count: r.count }); });
+      const threads = await db.query(
+        'SELECT id, name, message_count, last_message_at, parent_message_id FROM channel_threads WHERE parent_message_id = ANY($1)',
+        [ids]
+      );
+      threads.rows.forEach(({ parent_message_id, ...t }) => { threadByMsg[parent_message_id] = t; });
+    }
+    return {
+      messages: rows.map(m => ({ ...m, reactions: reactionsByMsg[m.id] || [], thread: threadByMsg[m.id] || null })),
+      complete: rows.length < CHANNEL_TAIL_SIZE,
+      loadedAt: Date.now(),
+    };
+  }
+
+  // A burst of opens on a cold channel waits for one query instead of each running its own
+  function load(id) {
+    const generation = generations.get(id) || 0;
+    const inFlight = loading.get(id);
+    if (inFlight && inFlight.generation === generation) return inFlight.promise;
+    const promise = loadTail(id)
+      .then((entry) => {
+        if ((generations.get(id) || 0) === generation) touch(id, entry);
+        return entry;
+      })
+      .finally(() => { if (loading.get(id)?.promise === promise) loading.delete(id); });
+    loading.set(id, { generation, promise });
+    return promise;
+  }
+
+  // Returns messages (ascending) or null when the request falls outside the cached window.
+  async function read(channelId, { limit, before }) {
+    if (!listenerReady) return null; // without invalidations from other workers we can't trust the cache
+    const id = key(channelId);
+    let entry = tails.get(id);
+    if (!entry || Date.now() - entry.loadedAt > CHANNEL_TAIL_TTL_MS) {
+      entry = await load(id);
+    } else {
+      touch(id, entry);
+    }
+
+    const msgs = entry.messages;
+    let end = msgs.length;
+    if (before) {
+      if (msgs.length === 0 || before <= msgs[0].id) return entry.complete ? [] : null;
+      end = msgs.findIndex(m => m.id >= before);
+      if (end === -1) end = msgs.length;
+    }
+    const page = msgs.slice(Math.max(0, end - limit), end);
+    if (page.length < limit && !entry.complete) return null; // window too thin (deletes) — let the DB answer
+    return page;
+  }
+
+  // The other workers apply the same change to their copy; without an event they reload
+  function notifyOthers(id, event, payload) {
+    let message = JSON.stringify({ channelId: id, event, payload, pid: process.pid });
+    if (!event || !payload || Buffer.byteLength(message) > CHANNEL_TAIL_NOTIFY_MAX) {
+      message = JSON.stringify({ channelId: id, pid: process.pid });
+    }
+    db.query("SELECT pg_notify('channel_tail_invalidate', $1)", [message])
+      .catch(err => console.error('Channel cache notify error:', err.message));
+  }
+
+  function findIndex(entry, messageId) {
+    const mid = Number(messageId);
+    return entry.messages.findIndex(m => m.id === mid);
+  }
+
+  // Applied right after each broadcast, with the same payload the clients receive.
+  function apply(channelId, event, payload) {
+    const id = key(channelId);
+    applyLocal(id, event, payload);
+    notifyOthers(id, event, payload);
+  }
+
+  // In-place update of this worker's copy only — for changes the other workers learn about
+  // through their own channel (e.g. recounted reactions via the reaction_counts NOTIFY)
+  function applyLocal(channelId, event, payload) {
+    const id = key(channelId);
+    bump(id);
+    const entry = tails.get(id);
+    if (!entry || !payload) return;
+
+    switch (event) {
+      case 'channel_message': {
+        if (findIndex(entry, payload.id) !== -1) break;
+        entry.messages.push({ reactions: [], thread: null, ...payload });
+        entry.messages.sort((a, b) => a.id - b.id);
+        if (entry.messages.length > CHANNEL_TAIL_SIZE) {
+          entry.messages.splice(0, entry.messages.length - CHANNEL_TAIL_SIZE);
+          entry.complete = false;
+        }
+        break;
+      }
+      case 'channel_message_edited':
+      case 'channel_message_pinned': {
+        const i = findIndex(entry, payload.id);
+        if (i !== -1) entry.messages[i] = { ...entry.messages[i], ...payload };
+        break;
+      }
+      case 'channel_message_deleted':
+      case 'messages_bulk_deleted': {
+        const ids = new Set((payload.messageIds || [payload.messageId]).map(Number));
+        entry.messages = entry.messages.filter(m => !ids.has(m.id));
+        break;
+      }
+      case 'channel_reaction_update': {
+        const i = findIndex(entry, payload.messageId);
+        if (i !== -1) entry.messages[i] = { ...entry.messages[i], reactions: payload.reactions };
+        break;
+      }
+      case 'channel_thread_created': {
+        const i = findIndex(entry, payload.parentMessageId);
+        if (i !== -1) entry.messages[i] = { ...entry.messages[i], thread: payload.thread };
+        break;
+      }
+      case 'channel_thread_update': {
+        const i = entry.messages.findIndex(m => m.thread && Number(m.thread.id) === Number(payload.threadId));
+        if (i !== -1) {
+          const m = entry.messages[i];
+          entry.messages[i] = { ...m, thread: { ...m.thread, message_count: payload.messageCount, last_message_at: new Date().toISOString() } };
+        }
+        break;
+      }
+      default:
+        tails.delete(id);
+    }
+  }
+
+  function invalidate(channelId) {
+    const id = key(channelId);
+    bump(id);
+    tails.delete(id);
+  }
+
+  // Dedicated connection for LISTEN — pooled clients can't hold a subscription
+  async function startListener() {
+    const { Client } = require('pg');
+    const listener = new Client({
+      host: process.env.DB_HOST || 'localhost',
+      port: process.env.DB_PORT || 5432,
+      database: process.env.DB_NAME || 'hyve_social',
+      user: process.env.DB_USER || 'hyve_admin',
+      password: process.env.DB_PASSWORD,
+    });
+    const restart = () => {
+      if (!listenerReady) return;
+      listenerReady = false;
+      tails.clear();
+      setTimeout(() => startListener().catch(err => console.error('Channel cache listener error:', err.message)), 5000);
+    };
+    listener.on('error', restart);
+    listener.on('end', restart);
+    listener.on('notification', (msg) => {
+      try {
+        const { channelId, channelIds, event, payload, pid } = JSON.parse(msg.payload);
+        if (pid === process.pid) return;
+        if (event && payload) applyLocal(channelId, event, payload);
+        else (channelIds || [channelId]).forEach(id => invalidate(id));
+      } catch (e) {}
+    });
+    try {
+      await listener.connect();
+      await listener.query('LISTEN channel_tail_invalidate');
+    } catch (err) {
+      listener.end().catch(() => {});
+      setTimeout(() => startListener().catch(() => {}), 5000);
+      throw err;
+    }
+    tails.clear(); // anything cached while we were deaf may be stale
+    listenerReady = true;
+  }
+
+  startListener().catch(err => console.error('Channel cache listener error:', err.message));
+
+  return { read, apply, applyLocal, invalidate };
+})();
+
+`;
+
+if (code.includes('const channelTailCache')) {
+  if (code.includes('CHANNEL_TAIL_NOTIFY_MAX')) {
+    console.log('SKIP - channel tail cache already patched');
+    process.exit(0);
+  }
+  // Older version (NOTIFY evicted the whole tail): swap the module, keep the hooks and routes
+  const oldStart = code.indexOf('\n// ═══════════════════════════════════════════════════════════\n// HOT CHANNEL TAIL CACHE');
+  const oldEndMarker = '  return { read, apply, invalidate };\n})();\n';
+  const oldEnd = code.indexOf(oldEndMarker, oldStart);
+  if (oldStart === -1 || oldEnd === -1) {
+    console.error('Cannot find the existing channel tail cache module to upgrade');
+    process.exit(1);
+  }
+  code = code.slice(0, oldStart) + CACHE_MODULE.replace(/\n+$/, '\n') + code.slice(oldEnd + oldEndMarker.length);
+  fs.writeFileSync(serverPath, code);
+  console.log('1. Upgraded the channel tail cache module (NOTIFY carries the change, single-flight loads)');
+  console.log(`\nDone! Applied 1 changes.`);
+  process.exit(0);
+}
+
+const getRouteMarker = "app.get('/api/channels/:channelId/messages'";
+let getIdx = code.indexOf(getRouteMarker);
+if (getIdx === -1) { console.error('Cannot find GET /api/channels/:channelId/messages'); process.exit(1); }
+// Keep the route's own comment header attached to it
+const headerIdx = code.lastIndexOf('// ── GET /api/channels/:channelId/messages', getIdx);
+const moduleIdx = headerIdx !== -1 && getIdx - headerIdx < 200 ? headerIdx : getIdx;
+code = code.slice(0, moduleIdx) + CACHE_MODULE + code.slice(moduleIdx);
+changes++;
+console.log('1. Added channel tail cache module');
+
+// ── 2. Serve reads from the cache once membership checks have passed ──
+getIdx = code.indexOf(getRouteMarker);
+const queryIdx = code.indexOf('    let query, params;', getIdx);
+if (queryIdx === -1 || queryIdx - getIdx > 3000) {
+  console.error('Cannot find query block in GET messages handler');
+  process.exit(1);
+}
+const CACHE_READ = `    // Hot path: serve channel opens and recent paging from the tail cache
+    const cachedTail = await channelTailCache.read(channelId, { limit, before });
+    if (cachedTail) return res.json({ messages: cachedTail });
+
+`;
+code = code.slice(0, queryIdx) + CACHE_READ + code.slice(queryIdx);
+changes++;
+console.log('2. GET messages now reads through the tail cache');
+
+// ── 3. Keep the buffer in step with every channel broadcast ──
+const CACHED_EVENTS = [
+  'channel_message', 'channel_message_edited', 'channel_message_deleted', 'messages_bulk_deleted',
+  'channel_reaction_update', 'channel_thread_created', 'channel_thread_update',
+];
+const emitRe = new RegExp(
+  "^(\\s*)io\\.to\\('channel[-_]' \\+ ([^)]+)\\)\\.emit\\('(" + CACHED_EVENTS.join('|') + ")', (.+)\\);[ \\t]*$",
+  'gm'
+);
+let hooked = 0;
+code = code.replace(emitRe, (line, indent, channelExpr, event, payload) => {
+  hooked++;
+  return `${line}\n${indent}channelTailCache.apply(${channelExpr}, '${event}', ${payload});`;
+});
+changes++;
+console.log(`3. Hooked ${hooked} channel broadcasts into the cache`);
+
+// ── 4. Pin toggle changes the row without broadcasting ──
+const pinRes = '    res.json({ message: result.rows[0], pinned: newPinned });';
+if (code.includes(pinRes)) {
+  code = code.replace(pinRes, "    channelTailCache.apply(channelId, 'channel_message_pinned', result.rows[0]);\n" + pinRes);
+  changes++;
+  console.log('4. Pin toggle updates the cache');
+} else console.log('4. SKIP - pin endpoint not found');
+
+// ── 5. Channel deletion drops its buffer ──
+const delChannel = "app.delete('/api/groups/:id/channels/:channelId'";
+const delIdx = code.indexOf(delChannel);
+if (delIdx !== -1) {
+  const delRes = code.indexOf('res.json({ success: true });', delIdx);
+  if (delRes !== -1) {
+    code = code.slice(0, delRes) + 'channelTailCache.invalidate(req.params.channelId);\n    ' + code.slice(delRes);
+    changes++;
+    console.log('5. Channel delete invalidates the cache');
+  }
+} else console.log('5. SKIP - channel delete endpoint not found');
+
+fs.writeFileSync(serverPath, code);
+console.log(`\nDone! Applied ${changes} changes.`);
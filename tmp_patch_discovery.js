@@ -0,0 +1,253 @@
+// Backend patch: indexed, ranked user discovery
+// Adds GET /api/discover/users?q=&cursor=&limit=
+//   q empty  -> suggested users: a ranked list (followers + recent posting) precomputed in
+//               the background every DISCOVERY_REFRESH_MS, then personalised per request
+//               (self, blocked, already-followed removed; mutual follows boost the order)
+//   q given  -> prefix + fuzzy match on username / display name through the trigram indexes
+//               from tmp_create_discovery_indexes.js, ranked by match quality, mutual follows
+//               and recent activity
+// Blocked users (either direction) are excluded in SQL. Responses are paged with an opaque
+// cursor, so the client never downloads the whole users table.
+// The follow / block tables aren't created by these scripts, so their names are looked up in
+// information_schema once at startup from the usual candidates. Without a block table the
+// endpoint fails closed (500) rather than show blocked users; set DISCOVERY_BLOCKS_TABLE,
+// DISCOVERY_BLOCKS_FROM and DISCOVERY_BLOCKS_TO to the table /api/blocks reads if the
+// candidates don't match.
+// Run on server: node tmp_patch_discovery.js
+
+const fs = require('fs');
+
+const serverPath = '/root/server.js';
+let code = fs.readFileSync(serverPath, 'utf8');
+
+if (code.includes('const userDiscovery')) {
+  console.log('SKIP - user discovery already patched');
+  process.exit(0);
+}
+
+const SERVICE = `
+// ═══════════════════════════════════════════════════════════
+// USER DISCOVERY (search + suggestions)
+// ═══════════════════════════════════════════════════════════
+const DISCOVERY_REFRESH_MS = 10 * 60 * 1000;
+const DISCOVERY_SUGGESTED_SIZE = 500;
+const DISCOVERY_MAX_LIMIT = 50;
+const DISCOVERY_MAX_OFFSET = 1000;
+const DISCOVERY_BLOCKS_OVERRIDE = process.env.DISCOVERY_BLOCKS_TABLE
+  ? { table: process.env.DISCOVERY_BLOCKS_TABLE, from: process.env.DISCOVERY_BLOCKS_FROM || 'blocker_address', to: process.env.DISCOVERY_BLOCKS_TO || 'blocked_address' }
+  : null;
+
+const userDiscovery = (() => {
+  let schemaPromise = null;
+  let suggested = [];        // precomputed, ranked: [{ wallet_address, username, profile_image, bio, followers, last_active, score }]
+  let suggestedAt = 0;
+
+  // Resolve follow / block tables from the candidates seen across deployments
+  function schema() {
+    if (!schemaPromise) {
+      schemaPromise = (async () => {
+        const cols = await db.query(
+          \`SELECT table_name, column_name FROM information_schema.columns
+           WHERE table_schema = 'public' AND table_name = ANY($1)\`,
+          [['users', 'follows', 'user_follows', 'followers', 'blocks', 'user_blocks', 'blocked_users',
+            ...(DISCOVERY_BLOCKS_OVERRIDE ? [DISCOVERY_BLOCKS_OVERRIDE.table] : [])]]
+        );
+        const has = (t, c) => cols.rows.some(r => r.table_name === t && r.column_name === c);
+        const pick = (tables, fromCols, toCols) => {
+          for (const table of tables) {
+            const from = fromCols.find(c => has(table, c));
+            const to = toCols.find(c => has(table, c));
+            if (from && to) return { table, from, to };
+          }
+          return null;
+        };
+        const s = {
+          displayName: has('users', 'display_name'),
+          follows: pick(['follows', 'user_follows', 'followers'], ['follower_address'], ['following_address', 'followed_address', 'followee_address']),
+          blocks: DISCOVERY_BLOCKS_OVERRIDE
+            ? pick([DISCOVERY_BLOCKS_OVERRIDE.table], [DISCOVERY_BLOCKS_OVERRIDE.from], [DISCOVERY_BLOCKS_OVERRIDE.to])
+            : pick(['blocks', 'user_blocks', 'blocked_users'], ['blocker_address', 'user_address'], ['blocked_address']),
+        };
+        if (!s.follows) console.warn('Discovery: no follows table found — mutual-follow ranking disabled');
+        // Fail closed: listing people without the block filter would show users to those who blocked them
+        if (!s.blocks) {
+          throw new Error('Discovery: no blocks table found — set DISCOVERY_BLOCKS_TABLE / _FROM / _TO to the table /api/blocks uses');
+        }
+        return s;
+      })().catch((err) => { schemaPromise = null; throw err; });
+    }
+    return schemaPromise;
+  }
+
+  // Addresses the viewer follows and everyone blocked in either direction — one round trip
+  async function viewerSets(s, viewer) {
+    const parts = [
+      \`SELECT 'b' AS kind, \${s.blocks.to} AS address FROM \${s.blocks.table} WHERE LOWER(\${s.blocks.from}) = LOWER($1)\`,
+      \`SELECT 'b', \${s.blocks.from} FROM \${s.blocks.table} WHERE LOWER(\${s.blocks.to}) = LOWER($1)\`,
+    ];
+    if (s.follows) parts.push(\`SELECT 'f', \${s.follows.to} FROM \${s.follows.table} WHERE LOWER(\${s.follows.from}) = LOWER($1)\`);
+    const following = new Set();
+    const blocked = new Set();
+    const result = await db.query(parts.join(' UNION ALL '), [viewer]);
+    result.rows.forEach(r => (r.kind === 'f' ? following : blocked).add(r.address.toLowerCase()));
+    return { following, blocked };
+  }
+
+  async function mutualCounts(s, viewer, addresses) {
+    const counts = new Map();
+    if (!s.follows || addresses.length === 0) return counts;
+    const f = s.follows;
+    const result = await db.query(
+      \`SELECT f2.\${f.to} AS address, COUNT(*)::int AS mutual
+       FROM \${f.table} f1
+       JOIN \${f.table} f2 ON LOWER(f2.\${f.from}) = LOWER(f1.\${f.to})
+       WHERE LOWER(f1.\${f.from}) = LOWER($1) AND LOWER(f2.\${f.to}) = ANY($2)
+       GROUP BY f2.\${f.to}\`,
+      [viewer, addresses.map(a => a.toLowerCase())]
+    );
+    result.rows.forEach(r => counts.set(r.address.toLowerCase(), r.mutual));
+    return counts;
+  }
+
+  async function refreshSuggested() {
+    const s = await schema();
+    const displayCol = s.displayName ? 'u.display_name' : 'NULL::text AS display_name';
+    const followersJoin = s.follows
+      ? \`LEFT JOIN (SELECT LOWER(\${s.follows.to}) AS address, COUNT(*)::int AS followers
+                   FROM \${s.follows.table} GROUP BY LOWER(\${s.follows.to})) fc ON fc.address = LOWER(u.wallet_address)\`
+      : 'LEFT JOIN (SELECT NULL::text AS address, 0 AS followers) fc ON FALSE';
+    const result = await db.query(
+      \`SELECT u.wallet_address, u.username, u.profile_image, u.bio, \${displayCol},
+              COALESCE(fc.followers, 0) AS followers, la.last_active,
+              LN(1 + COALESCE(fc.followers, 0))
+                + COALESCE(2 * EXP(-EXTRACT(EPOCH FROM NOW() - la.last_active) / 86400 / 7), 0) AS score
+       FROM users u
+       \${followersJoin}
+       LEFT JOIN (SELECT author_address, MAX(created_at) AS last_active
+                  FROM posts WHERE created_at > NOW() - INTERVAL '30 days'
+                  GROUP BY author_address) la ON la.author_address = u.wallet_address
+       WHERE u.username IS NOT NULL
+       ORDER BY score DESC, u.created_at DESC
+       LIMIT $1\`,
+      [DISCOVERY_SUGGESTED_SIZE]
+    );
+    suggested = result.rows;
+    suggestedAt = Date.now();
+  }
+
+  async function suggestions(viewer, offset, limit) {
+    if (suggestedAt === 0) await refreshSuggested();
+    const s = await schema();
+    const { following, blocked } = await viewerSets(s, viewer);
+    const me = viewer.toLowerCase();
+    const pool = suggested.filter((u) => {
+      const a = u.wallet_address.toLowerCase();
+      return a !== me && !following.has(a) && !blocked.has(a);
+    });
+    const mutual = await mutualCounts(s, viewer, pool.map(u => u.wallet_address));
+    const ranked = pool
+      .map(u => ({ ...u, mutual_count: mutual.get(u.wallet_address.toLowerCase()) || 0 }))
+      .sort((a, b) => (b.score + Math.log1p(b.mutual_count) * 1.5) - (a.score + Math.log1p(a.mutual_count) * 1.5));
+    return { users: ranked.slice(offset, offset + limit), hasMore: ranked.length > offset + limit };
+  }
+
+  async function search(viewer, q, offset, limit) {
+    const s = await schema();
+    const term = q.toLowerCase();
+    const prefix = term.replace(/[\\\\%_]/g, '\\\\$&') + '%';
+    const nameMatch = ['LOWER(u.username) LIKE $2', 'LOWER(u.username) % $3'];
+    const simExprs = ['similarity(LOWER(u.username), $3)'];
+    if (s.displayName) {
+      nameMatch.push('LOWER(u.display_name) LIKE $2', 'LOWER(u.display_name) % $3');
+      simExprs.push("similarity(LOWER(COALESCE(u.display_name, '')), $3)");
+    }
+    const notBlocked = \`AND NOT EXISTS (SELECT 1 FROM \${s.blocks.table} b
+                       WHERE (LOWER(b.\${s.blocks.from}) = LOWER($1) AND LOWER(b.\${s.blocks.to}) = LOWER(u.wallet_address))
+                          OR (LOWER(b.\${s.blocks.to}) = LOWER($1) AND LOWER(b.\${s.blocks.from}) = LOWER(u.wallet_address)))\`;
+    const mutualJoin = s.follows
+      ? \`LEFT JOIN LATERAL (
+           SELECT COUNT(*)::int AS mutual FROM \${s.follows.table} f1
+           JOIN \${s.follows.table} f2 ON LOWER(f2.\${s.follows.from}) = LOWER(f1.\${s.follows.to})
+           WHERE LOWER(f1.\${s.follows.from}) = LOWER($1) AND LOWER(f2.\${s.follows.to}) = LOWER(c.wallet_address)
+         ) m ON TRUE\`
+      : 'LEFT JOIN LATERAL (SELECT 0 AS mutual) m ON TRUE';
+
+    // The trigram index narrows to a bounded candidate set; ranking signals are joined onto that
+    const result = await db.query(
+      \`WITH cand AS (
+         SELECT u.wallet_address, u.username, u.profile_image, u.bio,
+                \${s.displayName ? 'u.display_name' : 'NULL::text AS display_name'},
+                COALESCE(LOWER(u.username) LIKE $2\${s.displayName ? ' OR LOWER(u.display_name) LIKE $2' : ''}, FALSE) AS is_prefix,
+                GREATEST(\${simExprs.join(', ')}) AS sim
+         FROM users u
+         WHERE (\${nameMatch.join(' OR ')})
+           AND LOWER(u.wallet_address) <> LOWER($1)
+           \${notBlocked}
+         ORDER BY is_prefix DESC, sim DESC
+         LIMIT 300
+       )
+       SELECT c.wallet_address, c.username, c.profile_image, c.bio, c.display_name,
+              m.mutual AS mutual_count, la.last_active
+       FROM cand c
+       \${mutualJoin}
+       LEFT JOIN LATERAL (
+         SELECT MAX(created_at) AS last_active FROM posts WHERE author_address = c.wallet_address
+       ) la ON TRUE
+       ORDER BY c.is_prefix DESC,
+                c.sim + LN(1 + m.mutual) * 0.3
+                  + COALESCE(0.2 * EXP(-EXTRACT(EPOCH FROM NOW() - la.last_active) / 86400 / 30), 0) DESC,
+                c.username
+       OFFSET $4 LIMIT $5\`,
+      [viewer, prefix, term, offset, limit + 1]
+    );
+    return { users: result.rows.slice(0, limit), hasMore: result.rows.length > limit };
+  }
+
+  setInterval(() => {
+    refreshSuggested().catch(err => console.error('Discovery refresh error:', err.message));
+  }, DISCOVERY_REFRESH_MS).unref();
+  refreshSuggested().catch(err => console.error('Discovery refresh error:', err.message));
+
+  return { suggestions, search };
+})();
+
+// ── GET /api/discover/users — ranked people search / suggestions, paged ──
+app.get('/api/discover/users', authenticateToken, async (req, res) => {
+  try {
+    const q = String(req.query.q || '').trim().slice(0, 64);
+    const limit = Math.min(Math.max(parseInt(req.query.limit) || 24, 1), DISCOVERY_MAX_LIMIT);
+    const offset = Math.min(Math.max(parseInt(Buffer.from(String(req.query.cursor || ''), 'base64url').toString()) || 0, 0), DISCOVERY_MAX_OFFSET);
+
+    const page = q
+      ? await userDiscovery.search(req.userAddress, q, offset, limit)
+      : await userDiscovery.suggestions(req.userAddress, offset, limit);
+
+    const users = page.users.map(u => ({
+      wallet_address: u.wallet_address,
+      username: u.username,
+      display_name: u.display_name || null,
+      profile_image: u.profile_image,
+      bio: u.bio,
+      mutual_count: u.mutual_count || 0,
+      last_active: u.last_active || null,
+    }));
+    const nextCursor = page.hasMore && offset + limit <= DISCOVERY_MAX_OFFSET
+      ? Buffer.from(String(offset + limit)).toString('base64url')
+      : null;
+    res.json({ users, nextCursor, suggested: !q });
+  } catch (error) {
+    console.error('Discover users error:', error);
+    const blocksMissing = /no blocks table/.test(error.message);
+    res.status(500).json({ error: blocksMissing ? 'People search is unavailable: block list not configured' : 'Failed to load people' });
+  }
+});
+
+`;
+
+const listenIdx = code.lastIndexOf('server.listen(');
+if (listenIdx === -1) { console.error('Cannot find server.listen'); process.exit(1); }
+code = code.slice(0, listenIdx) + SERVICE + code.slice(listenIdx);
+console.log('1. Added user discovery service + GET /api/discover/users');
+
+fs.writeFileSync(serverPath, code);
+console.log('\nDone! Run tmp_create_discovery_indexes.js if the discovery indexes do not exist yet.');
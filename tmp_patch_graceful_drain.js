@@ -0,0 +1,265 @@
+// Backend patch: health endpoint + graceful drain, for rolling deploys (tmp_deploy_rolling.py)
+// Adds:
+//   GET /api/health -> 200 { status: 'ok', pid, uptime, sockets, inFlight }
+//                      503 while draining or when Postgres does not answer
+//   SIGTERM / SIGINT -> drain instead of dying mid-request:
+//     1. stop accepting connections, /api/health turns 503
+//     2. every socket gets 'server_draining' { reconnectInMs } with its own random delay inside
+//        RECONNECT_SPREAD_MS, so clients move to the other workers a few at a time instead of
+//        all reconnecting (and refetching) in the same second
+//     3. wait for in-flight requests and sockets to finish, up to DRAIN_TIMEOUT_MS
+//     4. flush write-behind reaction counters until nothing is pending (if patched), then exit;
+//        their own SIGTERM / SIGINT flush is switched off so drain() is the only shutdown path
+//   PORT from the environment, so the deploy script can run several workers side by side
+//   socket.io Postgres adapter when @socket.io/postgres-adapter is installed, so room emits
+//   reach sockets held by the other workers; /api/health reports socketAdapter 'postgres' or
+//   'local', and tmp_deploy_rolling.py refuses more than one worker while it is 'local'
+//   every socket joins 'user-<address>', and the post-reaction notification and
+//   GET /api/groups/:id/online use cluster-wide presence instead of this worker's onlineUsers.
+//   Base server.js code that still looks sockets up in onlineUsers (DMs, notifications) only
+//   reaches users connected to the same worker — move it to the 'user-<address>' room before
+//   running several workers (tmp_deploy_rolling.py setup lists those lines)
+// Run on server: node tmp_patch_graceful_drain.js
+
+const fs = require('fs');
+
+const serverPath = '/root/server.js';
+let code = fs.readFileSync(serverPath, 'utf8');
+let changes = 0;
+
+if (code.includes('const serverLifecycle')) {
+  console.log('SKIP - graceful drain already patched');
+  process.exit(0);
+}
+
+// ── 1. Lifecycle service, request tracking and /api/health right after the app is created ──
+const LIFECYCLE = `
+// ═══════════════════════════════════════════════════════════
+// SERVER LIFECYCLE (health + graceful drain)
+// ═══════════════════════════════════════════════════════════
+const DRAIN_TIMEOUT_MS = parseInt(process.env.DRAIN_TIMEOUT_MS) || 25000;
+const RECONNECT_SPREAD_MS = parseInt(process.env.RECONNECT_SPREAD_MS) || 15000;
+let socketIoAdapter = 'local'; // 'postgres' once emits reach the other workers
+
+// Online on any worker: member-list presence is shared through NOTIFY, onlineUsers is per process
+function clusterOnline(address) {
+  const key = (address || '').toLowerCase();
+  if (typeof memberList !== 'undefined' && memberList.isOnline) return memberList.isOnline(key);
+  const entry = onlineUsers.get(key);
+  return !!(entry && entry.sockets && entry.sockets.size > 0);
+}
+
+const serverLifecycle = (() => {
+  const startedAt = Date.now();
+  let draining = false;
+  let inFlight = 0;
+
+  function track(req, res, next) {
+    inFlight++;
+    let finished = false;
+    const done = () => {
+      if (finished) return;
+      finished = true;
+      inFlight--;
+    };
+    res.on('finish', done);
+    res.on('close', done);
+    // Keep-alive connections would otherwise keep landing on a worker that is going away
+    if (draining) res.set('Connection', 'close');
+    next();
+  }
+
+  async function health(req, res) {
+    if (draining) return res.status(503).json({ status: 'draining', pid: process.pid });
+    try {
+      await db.query('SELECT 1');
+      res.json({
+        status: 'ok',
+        pid: process.pid,
+        uptime: Math.round((Date.now() - startedAt) / 1000),
+        sockets: io.engine.clientsCount,
+        socketAdapter: socketIoAdapter,
+        inFlight: Math.max(inFlight - 1, 0), // minus this request
+      });
+    } catch (error) {
+      res.status(503).json({ status: 'db_unavailable', pid: process.pid, error: error.message });
+    }
+  }
+
+  async function drain(signal) {
+    if (draining) return;
+    draining = true;
+    const deadline = Date.now() + DRAIN_TIMEOUT_MS;
+    console.log(\`\${signal} received — draining (\${io.engine.clientsCount} sockets, \${inFlight} requests in flight)\`);
+
+    server.close();
+    for (const socket of io.sockets.sockets.values()) {
+      socket.emit('server_draining', { reconnectInMs: Math.floor(Math.random() * RECONNECT_SPREAD_MS) });
+    }
+
+    while ((inFlight > 0 || io.engine.clientsCount > 0) && Date.now() < deadline) {
+      await new Promise(resolve => setTimeout(resolve, 250));
+    }
+    if (io.engine.clientsCount > 0) {
+      console.log(\`Drain timeout: disconnecting \${io.engine.clientsCount} remaining sockets\`);
+      io.disconnectSockets(true);
+    }
+    if (typeof reactionCounters !== 'undefined') {
+      // flushAll() repeats until nothing is pending — a single flush() returns the one already running
+      await (reactionCounters.flushAll || reactionCounters.flush)()
+        .catch(err => console.error('Reaction flush on drain error:', err.message));
+    }
+    console.log('Drain complete, exiting');
+    process.exit(0);
+  }
+
+  return { track, health, drain, isDraining: () => draining };
+})();
+
+app.use((req, res, next) => serverLifecycle.track(req, res, next));
+app.get('/api/health', (req, res) => serverLifecycle.health(req, res));
+`;
+
+const appMatch = code.match(/const app = express\(\);?\n/);
+if (!appMatch) { console.error('Cannot find "const app = express()"'); process.exit(1); }
+const appEnd = appMatch.index + appMatch[0].length;
+code = code.slice(0, appEnd) + LIFECYCLE + code.slice(appEnd);
+changes++;
+console.log('1. Added server lifecycle (request tracking + GET /api/health)');
+
+// ── 2. Signal handlers, before server.listen ──
+const SIGNALS = `
+// Rolling deploys stop workers with SIGINT (pm2) or SIGTERM (systemd / docker)
+for (const signal of ['SIGTERM', 'SIGINT']) {
+  process.on(signal, () => {
+    serverLifecycle.drain(signal).catch((err) => {
+      console.error('Drain error:', err);
+      process.exit(1);
+    });
+  });
+}
+
+`;
+const listenIdx = code.lastIndexOf('server.listen(');
+if (listenIdx === -1) { console.error('Cannot find server.listen'); process.exit(1); }
+code = code.slice(0, listenIdx) + SIGNALS + code.slice(listenIdx);
+changes++;
+console.log('2. Added SIGTERM / SIGINT drain handlers');
+
+// ── 3. Listen on $PORT ──
+const portMatch = code.match(/const PORT = (\d+);/);
+if (portMatch) {
+  code = code.replace(portMatch[0], `const PORT = parseInt(process.env.PORT) || ${portMatch[1]};`);
+  changes++;
+  console.log(`3. PORT now read from the environment (default ${portMatch[1]})`);
+} else if (/const PORT = process\.env\.PORT/.test(code)) {
+  console.log('3. PORT already read from the environment');
+} else {
+  console.log('3. WARNING: could not find "const PORT = <number>;" — make sure each worker can get its own port');
+}
+
+// ── 4. Cross-worker socket.io rooms through Postgres (optional dependency) ──
+const ADAPTER = `// socket.io across workers: room emits go through Postgres NOTIFY when the adapter is installed
+try {
+  const { createAdapter } = require('@socket.io/postgres-adapter');
+  db.query(\`CREATE TABLE IF NOT EXISTS socket_io_attachments (
+    id BIGSERIAL UNIQUE,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    payload BYTEA
+  )\`).catch(err => console.error('socket.io adapter table error:', err.message));
+  io.adapter(createAdapter(db));
+  socketIoAdapter = 'postgres';
+  console.log('socket.io Postgres adapter enabled');
+} catch (e) {
+  console.warn('socket.io Postgres adapter not installed — emits only reach sockets on this worker');
+}
+
+`;
+const ioConnIdx = code.indexOf("io.on('connection'");
+if (ioConnIdx === -1) {
+  console.log("4. Cannot find io.on('connection') — socket.io adapter skipped");
+} else {
+  code = code.slice(0, ioConnIdx) + ADAPTER + code.slice(ioConnIdx);
+  changes++;
+  console.log('4. Added optional socket.io Postgres adapter (npm install @socket.io/postgres-adapter)');
+}
+
+// ── 5. Per-user rooms, and cluster-wide presence where patches used onlineUsers ──
+const USER_ROOM = `
+    // ── Per-user room: emits to 'user-<address>' reach the user on whichever worker holds the socket ──
+    socket.on('join', async (identifier) => {
+      try {
+        const address = (await resolveAddress(identifier) || '').toLowerCase();
+        if (address) socket.join('user-' + address);
+      } catch (e) {}
+    });
+`;
+const connIdx = code.indexOf("io.on('connection'");
+if (connIdx === -1) {
+  console.log("5. Cannot find io.on('connection') — per-user rooms skipped");
+} else {
+  const bodyStart = code.indexOf('{', code.indexOf('=>', connIdx));
+  code = code.slice(0, bodyStart + 1) + USER_ROOM + code.slice(bodyStart + 1);
+  changes++;
+  console.log("5. Sockets join 'user-<address>' rooms");
+}
+
+const reactionLookup = `  const entry = onlineUsers.get(authorAddress.toLowerCase());
+  if (!entry || !entry.sockets || entry.sockets.size === 0) return;`;
+const reactionEmit = "  for (const socketId of entry.sockets) io.to(socketId).emit('post_reaction', payload);";
+if (code.includes(reactionLookup) && code.includes(reactionEmit)) {
+  code = code.replace(reactionLookup, '  if (!clusterOnline(authorAddress)) return;');
+  code = code.replace(reactionEmit, "  io.to('user-' + authorAddress.toLowerCase()).emit('post_reaction', payload);");
+  changes++;
+  console.log('5b. Post reaction notifications go to the author\'s user room');
+} else console.log('5b. SKIP - post reaction notification not found');
+
+const onlineRe = /const entry = onlineUsers\.get\((.+?)\);\n\s*if \(entry && entry\.sockets && entry\.sockets\.size > 0\) \{/;
+if (onlineRe.test(code)) {
+  code = code.replace(onlineRe, (m, expr) => `if (clusterOnline(${expr})) {`);
+  changes++;
+  console.log('5c. GET /api/groups/:id/online uses cluster-wide presence');
+} else console.log('5c. SKIP - group online endpoint not found');
+
+// ── 6. One shutdown path: reaction counters stop flushing on the signal themselves ──
+const REACTION_SIGNAL_OLD = `
+  // Write what is still in memory before the process goes away
+  for (const signal of ['SIGTERM', 'SIGINT']) {
+    process.once(signal, () => {
+      const drain = async () => {
+        for (let attempt = 0; attempt < 5 && (pending.size > 0 || flushPromise); attempt++) await flush();
+      };
+      drain().finally(() => {
+        if (process.listenerCount(signal) === 0) process.exit(0);
+      });
+    });
+  }
+
+  return { setPostReaction, toggleMessageReaction, messageCounts, flush };`;
+const REACTION_SIGNAL_NEW = `
+  // Write what is still in memory, again while a flush was in progress or failed
+  async function flushAll() {
+    for (let attempt = 0; attempt < 5 && (pending.size > 0 || flushPromise); attempt++) await flush();
+  }
+
+  // With tmp_patch_graceful_drain.js, serverLifecycle.drain() calls flushAll() once the sockets
+  // are gone; only without it does this worker flush on the signal itself
+  if (typeof serverLifecycle === 'undefined') {
+    for (const signal of ['SIGTERM', 'SIGINT']) {
+      process.once(signal, () => {
+        flushAll().finally(() => {
+          if (process.listenerCount(signal) === 0) process.exit(0);
+        });
+      });
+    }
+  }
+
+  return { setPostReaction, toggleMessageReaction, messageCounts, flush, flushAll };`;
+if (code.includes(REACTION_SIGNAL_OLD)) {
+  code = code.replace(REACTION_SIGNAL_OLD, REACTION_SIGNAL_NEW);
+  changes++;
+  console.log('6. Reaction counters flush from drain() instead of their own signal handler');
+} else console.log('6. SKIP - reaction counter signal handler not found (not patched, or already current)');
+
+fs.writeFileSync(serverPath, code);
+console.log(`\nDone! Applied ${changes} changes.`);
@@ -0,0 +1,448 @@
+// Backend patch: incremental, chunked member-list sync for large groups
+// Adds:
+//   GET /api/groups/:id/member-list?start=0&count=100 — role-grouped flat rows
+//     (section headers + members, nicknames merged in) for a virtualized sidebar
+//   socket 'member_list_update' — membership / role / nickname diffs for a group
+//   socket 'member_presence'    — online/offline transitions for a group's members
+//   GET /api/groups/:id/nicknames?addresses=a,b — optional filter instead of the full table
+// The sorted member snapshot for each viewed group lives in memory; writes schedule a
+// debounced rebuild which is diffed against the previous snapshot and pushed to the
+// 'group-<id>' room. The worker that saw the write takes the group's next version from
+// member_list_versions (shared by all workers) and passes it on via Postgres NOTIFY; every
+// worker rebuilds under that version and emits diffs and presence to its own sockets only
+// (io.local), so a client gets each change once, whichever worker it is connected to.
+// Re-running on a server with an older version of the service swaps in the current module.
+// Run on server: node tmp_patch_member_list.js
+
+const fs = require('fs');
+
+const serverPath = '/root/server.js';
+let code = fs.readFileSync(serverPath, 'utf8');
+let changes = 0;
+
+// ── 1. Member-list service + endpoint, before server.listen ──
+const SERVICE = `
+// ═══════════════════════════════════════════════════════════
+// MEMBER LIST SERVICE (chunked ranges + pushed diffs)
+// ═══════════════════════════════════════════════════════════
+const MEMBER_LIST_MAX_GROUPS = 100;
+const MEMBER_LIST_TTL_MS = 5 * 60 * 1000;
+const MEMBER_LIST_MAX_CHUNK = 200;
+const MEMBER_LIST_SECTIONS = [
+  { key: 'owner', label: 'Owner' },
+  { key: 'admin', label: 'Admins' },
+  { key: 'member', label: 'Members' },
+];
+
+const memberList = (() => {
+  const snapshots = new Map(); // groupId -> { rows, index, version, builtAt }
+  const building = new Map();  // groupId -> Promise
+  const refreshTimers = new Map();
+  const lastPresence = new Map(); // address -> online (as last announced)
+  const remoteOnline = new Set(); // addresses online on other workers
+  let versionTable = null;
+
+  const gid = (groupId) => Number(groupId);
+  const sectionOf = (role) => (role === 'owner' || role === 'admin' ? role : 'member');
+
+  function isOnline(address) {
+    const entry = onlineUsers.get((address || '').toLowerCase());
+    return !!(entry && entry.sockets && entry.sockets.size > 0) || remoteOnline.has((address || '').toLowerCase());
+  }
+
+  // Sockets in the group room on this worker (adapter.rooms only ever holds local sockets)
+  function hasViewers(groupId) {
+    const room = io.sockets.adapter.rooms.get('group-' + groupId);
+    return !!(room && room.size > 0);
+  }
+
+  // Snapshot versions come from Postgres, so every worker labels the same list state alike
+  function versions() {
+    if (!versionTable) {
+      versionTable = db.query(
+        \`CREATE TABLE IF NOT EXISTS member_list_versions (
+          group_id INTEGER PRIMARY KEY,
+          version BIGINT NOT NULL DEFAULT 0
+        )\`
+      ).catch((err) => { versionTable = null; throw err; });
+    }
+    return versionTable;
+  }
+
+  async function currentVersion(id) {
+    await versions();
+    const result = await db.query('SELECT version FROM member_list_versions WHERE group_id = $1', [id]);
+    return result.rows[0] ? Number(result.rows[0].version) : 0;
+  }
+
+  async function nextVersion(id) {
+    await versions();
+    const result = await db.query(
+      \`INSERT INTO member_list_versions (group_id, version) VALUES ($1, 1)
+       ON CONFLICT (group_id) DO UPDATE SET version = member_list_versions.version + 1
+       RETURNING version\`,
+      [id]
+    );
+    return Number(result.rows[0].version);
+  }
+
+  async function build(groupId) {
+    const result = await db.query(
+      \`SELECT gm.member_address AS address, gm.role, u.username, u.profile_image, sn.nickname,
+              COALESCE(r.custom_roles, '[]') AS custom_roles
+       FROM group_members gm
+       JOIN users u ON gm.member_address = u.wallet_address
+       LEFT JOIN server_nicknames sn ON sn.group_id = gm.group_id AND LOWER(sn.user_address) = LOWER(gm.member_address)
+       LEFT JOIN (
+         SELECT mr.user_address, json_agg(json_build_object('id', gr.id, 'name', gr.name, 'color', gr.color) ORDER BY gr.position DESC) AS custom_roles
+         FROM member_roles mr JOIN group_roles gr ON mr.role_id = gr.id
+         WHERE mr.group_id = $1
+         GROUP BY mr.user_address
+       ) r ON r.user_address = gm.member_address
+       WHERE gm.group_id = $1\`,
+      [groupId]
+    );
+
+    const bySection = { owner: [], admin: [], member: [] };
+    for (const m of result.rows) {
+      bySection[sectionOf(m.role)].push({ ...m, address: m.address.toLowerCase() });
+    }
+    const rows = [];
+    const index = new Map();
+    for (const { key, label } of MEMBER_LIST_SECTIONS) {
+      const list = bySection[key].sort((a, b) => (a.username || '').localeCompare(b.username || ''));
+      if (list.length === 0) continue;
+      rows.push({ type: 'header', section: key, label, count: list.length });
+      for (const m of list) {
+        index.set(m.address, m);
+        rows.push({ type: 'member', section: key, ...m });
+      }
+    }
+    return { rows, index, builtAt: Date.now() };
+  }
+
+  async function get(groupId) {
+    const id = gid(groupId);
+    const snap = snapshots.get(id);
+    if (snap && Date.now() - snap.builtAt < MEMBER_LIST_TTL_MS) return snap;
+    if (!building.has(id)) {
+      // Version first: a write landing during the build only makes the snapshot newer than its label
+      building.set(id, currentVersion(id).then(version => build(id).then((fresh) => {
+        fresh.version = version;
+        snapshots.delete(id);
+        snapshots.set(id, fresh);
+        while (snapshots.size > MEMBER_LIST_MAX_GROUPS) snapshots.delete(snapshots.keys().next().value);
+        return fresh;
+      })).finally(() => building.delete(id)));
+    }
+    return building.get(id);
+  }
+
+  function range(snap, start, count) {
+    return snap.rows.slice(start, start + count).map((row, i) => (
+      row.type === 'member' ? { ...row, index: start + i, online: isOnline(row.address) } : { ...row, index: start + i }
+    ));
+  }
+
+  function onlineCount(snap) {
+    let n = 0;
+    for (const address of snap.index.keys()) if (isOnline(address)) n++;
+    return n;
+  }
+
+  // Rebuild under the shared version, diff against what viewers have, and push the ops to
+  // this worker's sockets; the other workers do the same for theirs
+  async function refresh(groupId, version) {
+    const id = gid(groupId);
+    const prev = snapshots.get(id);
+    if (!prev) {
+      // Viewers here loaded their rows from another worker: nothing to diff against, so refetch
+      if (hasViewers(id)) io.local.to('group-' + id).emit('member_list_update', { groupId: id, version, ops: [{ op: 'reset' }] });
+      return;
+    }
+    if (version <= prev.version) return;
+    const next = await build(id);
+    next.version = version;
+    snapshots.set(id, next);
+
+    const ops = [];
+    for (const address of prev.index.keys()) {
+      if (!next.index.has(address)) ops.push({ op: 'remove', address });
+    }
+    for (const [address, m] of next.index) {
+      const old = prev.index.get(address);
+      if (!old) {
+        ops.push({ op: 'add', member: m });
+      } else if (old.role !== m.role || old.username !== m.username) {
+        ops.push({ op: 'move', member: m }); // sort position changed
+      } else if (old.nickname !== m.nickname || old.profile_image !== m.profile_image
+                 || JSON.stringify(old.custom_roles) !== JSON.stringify(m.custom_roles)) {
+        ops.push({ op: 'update', member: m });
+      }
+    }
+    // Sent even without ops, so viewers here move to the version the other workers now serve
+    if (hasViewers(id)) {
+      io.local.to('group-' + id).emit('member_list_update', { groupId: id, version: next.version, total: next.rows.length, ops });
+    }
+  }
+
+  // A write seen here (no version) takes the next shared version and tells the other workers;
+  // a NOTIFY from another worker brings its version. Debounced per group either way, so bulk
+  // role edits / invite waves collapse into one rebuild.
+  function scheduleRefresh(groupId, { version = null } = {}) {
+    const id = gid(groupId);
+    if (!id) return;
+    let pending = refreshTimers.get(id);
+    if (!pending) {
+      pending = { local: false, version: 0 };
+      refreshTimers.set(id, pending);
+      setTimeout(async () => {
+        refreshTimers.delete(id);
+        try {
+          let target = pending.version;
+          if (pending.local) {
+            target = await nextVersion(id);
+            db.query("SELECT pg_notify('member_list_events', $1)", [JSON.stringify({ type: 'refresh', groupId: id, version: target, pid: process.pid })])
+              .catch(err => console.error('Member list notify error:', err.message));
+          }
+          await refresh(id, target);
+        } catch (err) {
+          console.error('Member list refresh error:', err);
+        }
+      }, 250);
+    }
+    if (version) pending.version = Math.max(pending.version, version);
+    else pending.local = true;
+  }
+
+  // To this worker's viewers of every group the user is in; the other workers announce the
+  // same transition to theirs when the presence NOTIFY reaches them
+  async function announcePresence(address, online) {
+    const rooms = [...io.sockets.adapter.rooms].filter(([room, sockets]) => room.startsWith('group-') && sockets.size > 0);
+    for (const [room] of rooms) {
+      const id = gid(room.slice('group-'.length));
+      const snap = snapshots.get(id) || (await get(id).catch(() => null));
+      if (snap && snap.index.has(address)) {
+        io.local.to(room).emit('member_presence', { groupId: id, address, online });
+      }
+    }
+  }
+
+  // Called from the socket hooks registered after the base 'join' / 'disconnect' handlers,
+  // and for presence changes reported by other workers
+  async function presenceChanged(address, { broadcast = true } = {}) {
+    address = (address || '').toLowerCase();
+    if (!address) return;
+    const online = isOnline(address);
+    if ((lastPresence.get(address) || false) === online) return;
+    if (online) lastPresence.set(address, true); else lastPresence.delete(address);
+    announcePresence(address, online).catch(err => console.error('Member list presence error:', err.message));
+    if (broadcast) {
+      db.query("SELECT pg_notify('member_list_events', $1)", [JSON.stringify({ type: 'presence', address, online, pid: process.pid })])
+        .catch(err => console.error('Member list notify error:', err.message));
+    }
+  }
+
+  async function startListener() {
+    const { Client } = require('pg');
+    const listener = new Client({
+      host: process.env.DB_HOST || 'localhost',
+      port: process.env.DB_PORT || 5432,
+      database: process.env.DB_NAME || 'hyve_social',
+      user: process.env.DB_USER || 'hyve_admin',
+      password: process.env.DB_PASSWORD,
+    });
+    let retried = false;
+    const retry = () => {
+      if (retried) return;
+      retried = true;
+      setTimeout(() => startListener().catch(err => console.error('Member list listener error:', err.message)), 5000);
+    };
+    listener.on('error', retry);
+    listener.on('end', retry);
+    listener.on('notification', (msg) => {
+      try {
+        const evt = JSON.parse(msg.payload);
+        if (evt.pid === process.pid) return;
+        if (evt.type === 'refresh') scheduleRefresh(evt.groupId, { version: evt.version });
+        if (evt.type === 'presence') {
+          if (evt.online) remoteOnline.add(evt.address); else remoteOnline.delete(evt.address);
+          presenceChanged(evt.address, { broadcast: false });
+        }
+      } catch (e) {}
+    });
+    await listener.connect();
+    await listener.query('LISTEN member_list_events');
+  }
+
+  startListener().catch(err => console.error('Member list listener error:', err.message));
+
+  return { get, range, onlineCount, scheduleRefresh, presenceChanged };
+})();
+
+// ── GET /api/groups/:id/member-list — one chunk of the flattened, role-grouped list ──
+app.get('/api/groups/:id/member-list', authenticateToken, async (req, res) => {
+  try {
+    const groupId = parseInt(req.params.id);
+    const start = Math.max(0, parseInt(req.query.start) || 0);
+    const count = Math.min(Math.max(1, parseInt(req.query.count) || 100), MEMBER_LIST_MAX_CHUNK);
+
+    const snap = await memberList.get(groupId);
+    res.json({
+      version: snap.version,
+      total: snap.rows.length,
+      memberCount: snap.index.size,
+      onlineCount: memberList.onlineCount(snap),
+      start,
+      rows: memberList.range(snap, start, count),
+    });
+  } catch (error) {
+    console.error('Get member list error:', error);
+    res.status(500).json({ error: 'Failed to get member list' });
+  }
+});
+
+`;
+
+// Already patched: bring an older version up to date in place
+if (code.includes('const memberList = ')) {
+  const done = [];
+  // Earlier versions put the presence hook at the top of io.on('connection'), before the base
+  // handlers that update onlineUsers — move it below them
+  const OLD_HOOK = "\n    // ── Member list presence diffs (runs after the base join/disconnect handlers) ──";
+  const oldHookStart = code.indexOf(OLD_HOOK);
+  if (oldHookStart !== -1) {
+    const oldHookEnd = code.indexOf('\n    });\n', code.indexOf("socket.on('disconnect'", oldHookStart)) + '\n    });\n'.length;
+    code = code.slice(0, oldHookStart) + code.slice(oldHookEnd);
+    if (addPresenceHook()) done.push('moved the presence diff hooks after the base socket handlers');
+  }
+  // Earlier versions counted snapshot versions per worker and emitted from every worker
+  if (!code.includes('member_list_versions')) {
+    const banner = '// ═══════════════════════════════════════════════════════════\n// MEMBER LIST SERVICE';
+    const oldStart = code.indexOf(banner);
+    const oldEnd = oldStart === -1 ? -1 : code.indexOf('\n})();\n', oldStart);
+    if (oldEnd === -1) { console.error('Cannot find the existing member list module to upgrade'); process.exit(1); }
+    const exportedIsOnline = code.slice(oldStart, oldEnd).includes('onlineCount, isOnline,');
+    const newStart = SERVICE.indexOf(banner);
+    let serviceModule = SERVICE.slice(newStart, SERVICE.indexOf('\n})();\n', newStart) + '\n})();\n'.length);
+    // Keep the isOnline export tmp_patch_profile_cards.js adds
+    if (exportedIsOnline) serviceModule = serviceModule.replace('onlineCount, scheduleRefresh,', 'onlineCount, isOnline, scheduleRefresh,');
+    code = code.slice(0, oldStart) + serviceModule + code.slice(oldEnd + '\n})();\n'.length);
+    done.push('swapped in the service with shared versions and per-worker emits');
+  }
+  if (done.length === 0) {
+    console.log('SKIP - member list service already patched');
+    process.exit(0);
+  }
+  fs.writeFileSync(serverPath, code);
+  done.forEach((what, i) => console.log(`${i + 1}. Member list: ${what}`));
+  console.log(`\nDone! Applied ${done.length} changes.`);
+  process.exit(0);
+}
+
+const listenIdx = code.lastIndexOf('server.listen(');
+if (listenIdx === -1) { console.error('Cannot find server.listen'); process.exit(1); }
+code = code.slice(0, listenIdx) + SERVICE + code.slice(listenIdx);
+changes++;
+console.log('1. Added member list service + GET /api/groups/:id/member-list');
+
+// ── 2. Mark the list dirty after any successful membership / role / nickname write ──
+// Registered right after the app is created so it wraps routes defined anywhere below.
+const MEMBERSHIP_HOOK = `
+// Member-list invalidation: any successful write to a group's membership, roles or nicknames
+const MEMBER_LIST_WRITE_RE = /^\\/api\\/groups\\/(\\d+)\\/(join|leave|members|requests|roles|nickname|invite)(\\/|$)/;
+app.use((req, res, next) => {
+  if (req.method === 'GET') return next();
+  const match = MEMBER_LIST_WRITE_RE.exec(req.path);
+  if (match) {
+    res.on('finish', () => {
+      if (res.statusCode < 400) memberList.scheduleRefresh(match[1]);
+    });
+  }
+  next();
+});
+`;
+const appMatch = code.match(/const app = express\(\);?\n/);
+if (!appMatch) { console.error('Cannot find "const app = express()"'); process.exit(1); }
+const appEnd = appMatch.index + appMatch[0].length;
+code = code.slice(0, appEnd) + MEMBERSHIP_HOOK + code.slice(appEnd);
+changes++;
+console.log('2. Added membership write hook');
+
+// Invite joins aren't under /api/groups/:id
+const inviteInsert = "await db.query('INSERT INTO group_members (group_id, user_address, role) VALUES ($1,$2,$3)', [inv.group_id, address, 'member']);";
+if (code.includes(inviteInsert)) {
+  code = code.replace(inviteInsert, inviteInsert + '\n    memberList.scheduleRefresh(inv.group_id);');
+  changes++;
+  console.log('2b. Invite join refreshes the member list');
+} else console.log('2b. SKIP - invite join not found');
+
+// ── 3. Presence diffs from socket join / disconnect ──
+// Index of the "}" closing the block opened at `open`, skipping strings and comments
+function blockEnd(src, open) {
+  let depth = 0;
+  for (let i = open; i < src.length; i++) {
+    const ch = src[i];
+    if (ch === '/' && src[i + 1] === '/') { i = src.indexOf('\n', i); if (i === -1) return -1; continue; }
+    if (ch === '/' && src[i + 1] === '*') { i = src.indexOf('*/', i + 2) + 1; if (i === 0) return -1; continue; }
+    if (ch === "'" || ch === '"' || ch === '`') {
+      for (i++; i < src.length && src[i] !== ch; i++) if (src[i] === '\\') i++;
+      continue;
+    }
+    if (ch === '{') depth++;
+    if (ch === '}' && --depth === 0) return i;
+  }
+  return -1;
+}
+
+// Adds the presence hooks at the end of the io.on('connection') body; false if not found
+function addPresenceHook() {
+  const socketConnectionIdx = code.indexOf("io.on('connection'");
+  const socketBodyEnd = socketConnectionIdx === -1
+    ? -1
+    : blockEnd(code, code.indexOf('{', code.indexOf('=>', socketConnectionIdx)));
+  if (socketBodyEnd === -1) {
+    console.log("WARNING: Could not find io.on('connection') — presence diffs not added");
+    return false;
+  }
+  const PRESENCE_HOOK = `    // ── Member list presence diffs ──
+    // Registered after the base join/disconnect handlers, so they run first and update
+    // onlineUsers; a base handler still awaiting gets a second look a second later
+    // (presenceChanged only announces actual transitions, so extra looks cost nothing).
+    socket.on('join', async (identifier) => {
+      try {
+        socket.memberListAddress = (await resolveAddress(identifier) || '').toLowerCase();
+        setImmediate(() => memberList.presenceChanged(socket.memberListAddress));
+        setTimeout(() => memberList.presenceChanged(socket.memberListAddress), 1000);
+      } catch (e) {}
+    });
+    socket.on('disconnect', () => {
+      if (socket.memberListAddress) setImmediate(() => memberList.presenceChanged(socket.memberListAddress));
+    });
+`;
+  // Insert on its own lines just above the line holding the closing "}"
+  let insertAt = code.lastIndexOf('\n', socketBodyEnd) + 1;
+  if (code.slice(insertAt, socketBodyEnd).trim()) insertAt = socketBodyEnd;
+  code = code.slice(0, insertAt) + PRESENCE_HOOK + code.slice(insertAt);
+  return true;
+}
+
+if (addPresenceHook()) {
+  changes++;
+  console.log('3. Added presence diff hooks (after the base socket handlers)');
+}
+
+// ── 4. Nicknames: optional ?addresses= filter ──
+const oldNick = "const result = await db.query('SELECT user_address, nickname FROM server_nicknames WHERE group_id = $1', [req.params.id]);";
+const newNick = `const addresses = (req.query.addresses || '').split(',').map(a => a.trim().toLowerCase()).filter(Boolean).slice(0, 500);
+    const result = addresses.length > 0
+      ? await db.query('SELECT user_address, nickname FROM server_nicknames WHERE group_id = $1 AND LOWER(user_address) = ANY($2)', [req.params.id, addresses])
+      : await db.query('SELECT user_address, nickname FROM server_nicknames WHERE group_id = $1', [req.params.id]);`;
+if (code.includes(oldNick)) {
+  code = code.replace(oldNick, newNick);
+  changes++;
+  console.log('4. Nicknames endpoint accepts ?addresses=');
+} else console.log('4. SKIP - nicknames endpoint not found');
+
+fs.writeFileSync(serverPath, code);
+console.log(`\nDone! Applied ${changes} changes.`);
@@ -0,0 +1,210 @@
+// Backend patch: indexed channel message search
+// Replaces the ILIKE scan behind GET /api/groups/:id/search with a query that uses the
+// GIN indexes from tmp_create_search_index.js (run that first):
+//   - ranked full-text matches (word prefixes, so partial words match while typing)
+//   - trigram-backed substring matches for 3+ character fragments
+//   - highlighted snippets computed only for the returned page
+//   - filters: channelId, authorId, hasImage, since, until
+//   - cursor paging (nextCursor) for both relevance and recent ordering; total (all matches)
+//     is counted on the first page only and is null on later pages
+//   - a repeated filter (?authorId=a&authorId=b arrives as an array) is a 400
+// Channel visibility (viewChannels / readMessageHistory overrides, category then channel)
+// is resolved once per request for every message-bearing channel in the group (everything
+// but voice: text, announcement and forum), and the search is restricted to the visible set
+// in SQL instead of checking rows one by one.
+// Run on server: node tmp_patch_message_search.js
+
+const fs = require('fs');
+
+const serverPath = '/root/server.js';
+let code = fs.readFileSync(serverPath, 'utf8');
+
+// An earlier version of this patch is replaced as a whole (helper + route)
+const upgrade = code.includes('async function searchableChannelIds');
+if (upgrade && code.includes("COALESCE(c.type, 'text') <> 'voice'")) {
+  console.log('SKIP - indexed message search already patched');
+  process.exit(0);
+}
+
+const routeMarker = upgrade ? '// Channels in a group the user may read' : "app.get('/api/groups/:id/search'";
+const startIdx = code.indexOf(routeMarker);
+if (startIdx === -1) { console.error('Cannot find GET /api/groups/:id/search'); process.exit(1); }
+const errIdx = code.indexOf("console.error('Search error:'", startIdx);
+const endIdx = errIdx === -1 ? -1 : code.indexOf('\n});', errIdx);
+if (endIdx === -1 || (!upgrade && errIdx - startIdx > 3000)) { console.error('Cannot find end of search handler'); process.exit(1); }
+
+const SEARCH_ROUTE = `// Channels in a group the user may read, resolved in bulk (category overrides, then channel overrides)
+async function searchableChannelIds(groupId, userAddress) {
+  const addr = userAddress.toLowerCase();
+  const [group, member, roles, channels] = await Promise.all([
+    db.query('SELECT owner_address, privacy FROM groups WHERE id = $1', [groupId]),
+    db.query('SELECT role FROM group_members WHERE group_id = $1 AND LOWER(member_address) = $2', [groupId, addr]),
+    db.query(
+      \`SELECT mr.role_id, gr.permissions FROM member_roles mr
+       JOIN group_roles gr ON gr.id = mr.role_id
+       WHERE mr.group_id = $1 AND LOWER(mr.user_address) = $2\`,
+      [groupId, addr]
+    ),
+    db.query(
+      \`SELECT c.id, c.permissions, cc.permissions AS category_permissions
+       FROM channels c LEFT JOIN channel_categories cc ON cc.id = c.category_id
+       WHERE c.group_id = $1 AND COALESCE(c.type, 'text') <> 'voice'\`,
+      [groupId]
+    ),
+  ]);
+  if (group.rows.length === 0) return null;
+
+  const isOwner = group.rows[0].owner_address?.toLowerCase() === addr;
+  const memberRole = member.rows[0]?.role;
+  if (!isOwner && !memberRole && group.rows[0].privacy === 'private') return null;
+
+  const parse = (p) => (typeof p === 'string' ? JSON.parse(p) : (p || {}));
+  const isAdmin = isOwner || memberRole === 'owner' || memberRole === 'admin'
+    || roles.rows.some(r => parse(r.permissions).administrator);
+  if (isAdmin) return channels.rows.map(c => c.id);
+
+  const roleIds = new Set(roles.rows.map(r => String(r.role_id)));
+  const NEEDED = ['viewChannels', 'readMessageHistory'];
+
+  // everyone -> member's roles -> the member themself; later layers win
+  const applyOverrides = (allowed, overrides) => {
+    const layers = [
+      overrides.filter(o => String(o.id) === 'everyone'),
+      overrides.filter(o => o.type === 'role' && roleIds.has(String(o.id))),
+      overrides.filter(o => o.type === 'member' && String(o.id).toLowerCase() === addr),
+    ];
+    for (const layer of layers) {
+      for (const perm of NEEDED) {
+        if (layer.some(o => (o.allow || []).includes(perm))) allowed[perm] = true;
+        else if (layer.some(o => (o.deny || []).includes(perm))) allowed[perm] = false;
+      }
+    }
+  };
+
+  return channels.rows.filter(c => {
+    const allowed = { viewChannels: true, readMessageHistory: true };
+    applyOverrides(allowed, parse(c.category_permissions).overrides || []);
+    applyOverrides(allowed, parse(c.permissions).overrides || []);
+    return NEEDED.every(p => allowed[p]);
+  }).map(c => c.id);
+}
+
+const SEARCH_HIGHLIGHT_OPTS = 'StartSel="\\u0001", StopSel="\\u0002", MaxWords=35, MinWords=12, MaxFragments=2, FragmentDelimiter=" … "';
+
+app.get('/api/groups/:id/search', authenticateToken, async (req, res) => {
+  try {
+    const groupId = parseInt(req.params.id);
+    const { q, channelId, authorId, hasImage, since, until, cursor } = req.query;
+    if ([q, channelId, authorId, hasImage, since, until, cursor, req.query.sort, req.query.limit].some(Array.isArray)) {
+      return res.status(400).json({ error: 'Each search filter may only be given once' });
+    }
+    const sort = req.query.sort === 'recent' ? 'recent' : 'relevance';
+    const limit = Math.min(parseInt(req.query.limit) || 25, 50);
+    const text = (q || '').trim();
+    if (text.length < 2) return res.status(400).json({ error: 'Query must be at least 2 characters' });
+
+    const visible = await searchableChannelIds(groupId, req.userAddress);
+    if (!visible) return res.status(403).json({ error: 'Not a member of this group' });
+    let channelIds = visible;
+    if (channelId) channelIds = visible.filter(id => id === parseInt(channelId));
+    if (channelIds.length === 0) return res.json({ results: [], total: 0, nextCursor: null });
+
+    // Every word becomes a prefix term: "road upd" matches "roadmap update"
+    const words = (text.toLowerCase().match(/[\\p{L}\\p{N}]+/gu) || []).slice(0, 8);
+    const tsQuery = words.map(w => w + ':*').join(' & ');
+    // Substring fallback only where the trigram index can serve it
+    const likePattern = text.length >= 3 ? '%' + text.replace(/[\\\\%_]/g, '\\\\$&') + '%' : null;
+    if (!tsQuery && !likePattern) return res.json({ results: [], total: 0, nextCursor: null });
+
+    const params = [channelIds];
+    const match = [];
+    let tsParam = null;
+    if (tsQuery) {
+      params.push(tsQuery);
+      tsParam = '$' + params.length;
+      match.push("to_tsvector('english', cm.content) @@ to_tsquery('english', " + tsParam + ')');
+    }
+    if (likePattern) { params.push(likePattern); match.push('cm.content ILIKE $' + params.length); }
+    const where = ['cm.channel_id = ANY($1)', '(' + match.join(' OR ') + ')'];
+
+    if (authorId) { params.push(authorId.toLowerCase()); where.push('LOWER(cm.user_address) = $' + params.length); }
+    if (hasImage === 'true') where.push("cm.image_url IS NOT NULL AND cm.image_url <> ''");
+    if (since && !isNaN(Date.parse(since))) { params.push(new Date(since)); where.push('cm.created_at >= $' + params.length); }
+    if (until && !isNaN(Date.parse(until))) { params.push(new Date(until)); where.push('cm.created_at < $' + params.length); }
+
+    const rankExpr = tsParam
+      ? "ts_rank(to_tsvector('english', cm.content), to_tsquery('english', " + tsParam + '))::real'
+      : '0::real';
+
+    let after = null;
+    if (cursor) {
+      try { after = JSON.parse(Buffer.from(String(cursor), 'base64url').toString()); } catch (e) {}
+      if (!after || !Number.isInteger(after.id)) return res.status(400).json({ error: 'Invalid cursor' });
+    }
+    const pageWhere = [];
+    if (after && sort === 'relevance') {
+      params.push(Number(after.rank) || 0, after.id);
+      pageWhere.push('(h.rank, h.id) < ($' + (params.length - 1) + '::real, $' + params.length + ')');
+    } else if (after) {
+      params.push(after.id);
+      pageWhere.push('h.id < $' + params.length);
+    }
+    const order = sort === 'relevance' ? 'h.rank DESC, h.id DESC' : 'h.id DESC';
+    params.push(limit + 1);
+    const limitParam = '$' + params.length;
+    let optsParam = null;
+    if (tsParam) {
+      params.push(SEARCH_HIGHLIGHT_OPTS);
+      optsParam = '$' + params.length;
+    }
+
+    // Rank the matches, cut the page, and only then build snippets for that page
+    const query = \`
+      WITH hits AS (
+        SELECT cm.id, \${rankExpr} AS rank
+        FROM channel_messages cm
+        WHERE \${where.join(' AND ')}
+      ), page AS (
+        SELECT h.id, h.rank FROM hits h
+        \${pageWhere.length ? 'WHERE ' + pageWhere.join(' AND ') : ''}
+        ORDER BY \${order}
+        LIMIT \${limitParam}
+      )
+      SELECT cm.id, cm.channel_id, cm.user_address, cm.content, cm.image_url, cm.reply_to,
+             cm.edited_at, cm.created_at, c.name AS channel_name, u.username, u.profile_image,
+             p.rank, \${after ? 'NULL::int' : '(SELECT COUNT(*)::int FROM hits)'} AS total,
+             \${tsParam
+               ? "ts_headline('english', cm.content, to_tsquery('english', " + tsParam + '), ' + optsParam + ')'
+               : 'NULL::text'} AS highlight
+      FROM page p
+      JOIN channel_messages cm ON cm.id = p.id
+      JOIN channels c ON c.id = cm.channel_id
+      LEFT JOIN users u ON u.wallet_address = cm.user_address
+      ORDER BY \${order.replace(/h\\./g, 'p.')}
+    \`;
+
+    const result = await db.query(query, params);
+    // Every match, not just this page; only worth counting once, on the first page
+    const total = after ? null : (result.rows.length > 0 ? result.rows[0].total : 0);
+    const rows = result.rows.map(({ total: _total, ...row }) => row);
+    const hasMore = rows.length > limit;
+    const results = hasMore ? rows.slice(0, limit) : rows;
+    const last = results[results.length - 1];
+    const nextCursor = hasMore
+      ? Buffer.from(JSON.stringify(sort === 'relevance' ? { rank: last.rank, id: last.id } : { id: last.id })).toString('base64url')
+      : null;
+
+    res.json({ results, total, nextCursor });
+  } catch (error) {
+    console.error('Search error:', error);
+    res.status(500).json({ error: 'Search failed' });
+  }
+});`;
+
+code = code.slice(0, startIdx) + SEARCH_ROUTE + code.slice(endIdx + '\n});'.length);
+console.log(upgrade
+  ? '1. Upgraded the indexed search route (repeated filters rejected, total counts every match, announcement and forum channels searched)'
+  : '1. Replaced GET /api/groups/:id/search with indexed search');
+
+fs.writeFileSync(serverPath, code);
+console.log('\nDone! Run tmp_create_search_index.js if the search indexes do not exist yet.');
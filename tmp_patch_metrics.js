@@ -0,0 +1,283 @@
+// Backend patch: built-in latency / query instrumentation + Prometheus /metrics endpoint
+// Adds: per-route latency histograms, db.query wrapper (per-fingerprint timing,
+// round trips per request, N+1 detection), slow-query log with redacted params,
+// socket.io event counters, and GET /metrics in Prometheus text format.
+// Run on server: node tmp_patch_metrics.js
+//
+// Env knobs (all optional):
+//   METRICS_TOKEN          — required to scrape: "Authorization: Bearer <token>" (unset = /metrics is off)
+//   SLOW_QUERY_MS          — slow-query log threshold (default 200)
+//   N_PLUS_ONE_THRESHOLD   — same-fingerprint queries in one request before it is flagged (default 10)
+
+const fs = require('fs');
+
+const serverPath = '/root/server.js';
+let code = fs.readFileSync(serverPath, 'utf8');
+let changes = 0;
+
+const METRICS_ROUTE = `// Requires the METRICS_TOKEN bearer token. The source address proves nothing: behind nginx
+// every request arrives from 127.0.0.1.
+app.get('/metrics', (req, res) => {
+  const token = process.env.METRICS_TOKEN || '';
+  if (!token) return res.status(404).send('Not found');
+  if (req.headers['authorization'] !== 'Bearer ' + token) return res.status(403).send('Forbidden');
+
+  res.set('Content-Type', 'text/plain; version=0.0.4; charset=utf-8');
+  res.send(metrics.render());
+});
+`;
+
+// Earlier versions also let localhost in without the token. Behind nginx every request comes
+// from 127.0.0.1, so that made /metrics public; swap in the token-only endpoint.
+const OLD_METRICS_CHECK = "  if (!isLocal && !authorized) return res.status(403).send('Forbidden');";
+
+if (code.includes('// ═══ METRICS CORE ═══')) {
+  if (!code.includes(OLD_METRICS_CHECK)) {
+    console.log('SKIP - metrics already patched');
+    process.exit(0);
+  }
+  const start = code.indexOf("app.get('/metrics'");
+  const end = code.indexOf('\n});\n', code.indexOf(OLD_METRICS_CHECK)) + '\n});\n'.length;
+  const commentStart = code.lastIndexOf('// Only reachable from localhost', start);
+  const from = commentStart !== -1 && start - commentStart < 200 ? commentStart : start;
+  code = code.slice(0, from) + METRICS_ROUTE + code.slice(end);
+  fs.writeFileSync(serverPath, code);
+  console.log('1. /metrics now requires METRICS_TOKEN (localhost is no longer trusted)');
+  console.log('\nDone! Applied 1 changes.');
+  process.exit(0);
+}
+
+// ── 1. Metrics core + request middleware, right after the express app is created ──
+// Must be registered before any routes so every request runs inside the timing context.
+const METRICS_CORE = `
+// ═══ METRICS CORE ═══════════════════════════════════════════
+// Tiny Prometheus-compatible registry (counters + histograms), no extra deps.
+const { AsyncLocalStorage } = require('async_hooks');
+const requestContext = new AsyncLocalStorage();
+
+const SLOW_QUERY_MS = parseInt(process.env.SLOW_QUERY_MS || '200');
+const N_PLUS_ONE_THRESHOLD = parseInt(process.env.N_PLUS_ONE_THRESHOLD || '10');
+const METRICS_MAX_SERIES = 1000; // per family — guards against label explosions
+
+const metrics = (() => {
+  const families = new Map();
+
+  function labelKey(labels) {
+    return Object.keys(labels).sort().map(k => k + '=' + labels[k]).join(',');
+  }
+
+  function escapeLabel(v) {
+    return String(v).replace(/\\\\/g, '\\\\\\\\').replace(/"/g, '\\\\"').replace(/\\n/g, '\\\\n');
+  }
+
+  function formatLabels(labels, extra) {
+    const all = { ...labels, ...(extra || {}) };
+    const keys = Object.keys(all);
+    if (keys.length === 0) return '';
+    return '{' + keys.map(k => k + '="' + escapeLabel(all[k]) + '"').join(',') + '}';
+  }
+
+  function seriesFor(fam, labels) {
+    let key = labelKey(labels);
+    if (!fam.series.has(key) && fam.series.size >= METRICS_MAX_SERIES) {
+      labels = Object.fromEntries(Object.keys(labels).map(k => [k, '__other__']));
+      key = labelKey(labels);
+    }
+    let s = fam.series.get(key);
+    if (!s) {
+      s = fam.type === 'histogram'
+        ? { labels, buckets: new Array(fam.buckets.length).fill(0), sum: 0, count: 0 }
+        : { labels, value: 0 };
+      fam.series.set(key, s);
+    }
+    return s;
+  }
+
+  function counter(name, help) {
+    const fam = { name, help, type: 'counter', series: new Map() };
+    families.set(name, fam);
+    return {
+      inc(labels = {}, value = 1) { seriesFor(fam, labels).value += value; },
+    };
+  }
+
+  function histogram(name, help, buckets) {
+    const fam = { name, help, type: 'histogram', buckets, series: new Map() };
+    families.set(name, fam);
+    return {
+      observe(labels, value) {
+        const s = seriesFor(fam, labels);
+        for (let i = 0; i < buckets.length; i++) {
+          if (value <= buckets[i]) s.buckets[i]++;
+        }
+        s.sum += value;
+        s.count++;
+      },
+    };
+  }
+
+  function render() {
+    const out = [];
+    for (const fam of families.values()) {
+      out.push('# HELP ' + fam.name + ' ' + fam.help);
+      out.push('# TYPE ' + fam.name + ' ' + fam.type);
+      for (const s of fam.series.values()) {
+        if (fam.type === 'counter') {
+          out.push(fam.name + formatLabels(s.labels) + ' ' + s.value);
+          continue;
+        }
+        fam.buckets.forEach((le, i) => {
+          out.push(fam.name + '_bucket' + formatLabels(s.labels, { le }) + ' ' + s.buckets[i]);
+        });
+        out.push(fam.name + '_bucket' + formatLabels(s.labels, { le: '+Inf' }) + ' ' + s.count);
+        out.push(fam.name + '_sum' + formatLabels(s.labels) + ' ' + s.sum);
+        out.push(fam.name + '_count' + formatLabels(s.labels) + ' ' + s.count);
+      }
+    }
+    return out.join('\\n') + '\\n';
+  }
+
+  return { counter, histogram, render };
+})();
+
+const LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+const httpDuration = metrics.histogram('hyve_http_request_duration_seconds', 'HTTP request latency by route', LATENCY_BUCKETS);
+const dbDuration = metrics.histogram('hyve_db_query_duration_seconds', 'Postgres query latency by query fingerprint', LATENCY_BUCKETS);
+const dbRoundTrips = metrics.histogram('hyve_db_round_trips_per_request', 'Postgres queries issued per HTTP request', [1, 2, 5, 10, 20, 50, 100, 250]);
+const dbErrors = metrics.counter('hyve_db_query_errors_total', 'Postgres queries that threw, by fingerprint');
+const dbSlowQueries = metrics.counter('hyve_db_slow_queries_total', 'Postgres queries slower than SLOW_QUERY_MS, by fingerprint');
+const nPlusOne = metrics.counter('hyve_db_n_plus_one_total', 'Requests that repeated one query fingerprint at least N_PLUS_ONE_THRESHOLD times');
+const socketEvents = metrics.counter('hyve_socket_events_total', 'Socket.io events by direction and event name');
+const socketConnections = metrics.counter('hyve_socket_connections_total', 'Socket.io connections opened/closed');
+
+// Collapse literals and placeholders so "WHERE id = $1" and "WHERE id = 42" share one series.
+function fingerprintSql(sql) {
+  return String(sql || '')
+    .replace(/--.*$/gm, '')
+    .replace(/'(?:[^']|'')*'/g, '?')
+    .replace(/\\$\\d+/g, '?')
+    .replace(/\\b\\d+(\\.\\d+)?\\b/g, '?')
+    .replace(/\\s+/g, ' ')
+    .trim()
+    .slice(0, 200);
+}
+
+// Never log parameter values — only their shape.
+function redactParams(params) {
+  if (!Array.isArray(params)) return '[]';
+  return '[' + params.map(p => {
+    if (p === null || p === undefined) return 'null';
+    if (Array.isArray(p)) return '<array:' + p.length + '>';
+    if (typeof p === 'string') return '<string:' + p.length + '>';
+    return '<' + typeof p + '>';
+  }).join(', ') + ']';
+}
+
+function routeLabel(req) {
+  return req.route ? req.method + ' ' + (req.baseUrl || '') + req.route.path : req.method + ' unmatched';
+}
+
+app.use((req, res, next) => {
+  if (req.path === '/metrics') return next();
+  const ctx = { req, start: process.hrtime.bigint(), queries: 0, fingerprints: new Map() };
+  res.on('finish', () => {
+    const route = routeLabel(req);
+    const seconds = Number(process.hrtime.bigint() - ctx.start) / 1e9;
+    httpDuration.observe({ route, status: String(res.statusCode) }, seconds);
+    dbRoundTrips.observe({ route }, ctx.queries);
+    for (const [fingerprint, count] of ctx.fingerprints) {
+      if (count >= N_PLUS_ONE_THRESHOLD) {
+        nPlusOne.inc({ route, fingerprint });
+        console.warn(\`[n+1] \${route} ran \${count}x: \${fingerprint}\`);
+      }
+    }
+  });
+  requestContext.run(ctx, next);
+});
+
+function instrumentDb(dbClient) {
+  if (!dbClient || dbClient.__instrumented) return;
+  const originalQuery = dbClient.query.bind(dbClient);
+  dbClient.query = (...args) => {
+    const sql = typeof args[0] === 'string' ? args[0] : args[0]?.text;
+    const params = Array.isArray(args[1]) ? args[1] : args[0]?.values;
+    const fingerprint = fingerprintSql(sql);
+    const ctx = requestContext.getStore();
+    if (ctx) {
+      ctx.queries++;
+      ctx.fingerprints.set(fingerprint, (ctx.fingerprints.get(fingerprint) || 0) + 1);
+    }
+    const start = process.hrtime.bigint();
+    const result = originalQuery(...args);
+    if (!result || typeof result.then !== 'function') return result; // callback style — untimed
+
+    const done = (failed) => {
+      const ms = Number(process.hrtime.bigint() - start) / 1e6;
+      dbDuration.observe({ fingerprint }, ms / 1000);
+      if (failed) dbErrors.inc({ fingerprint });
+      if (ms >= SLOW_QUERY_MS) {
+        dbSlowQueries.inc({ fingerprint });
+        const route = ctx ? routeLabel(ctx.req) : 'background';
+        console.warn(\`[slow-query] \${ms.toFixed(1)}ms \${route} sql="\${fingerprint}" params=\${redactParams(params)}\`);
+      }
+    };
+    result.then(() => done(false), () => done(true));
+    return result;
+  };
+  dbClient.__instrumented = true;
+}
+
+function instrumentSocketServer(ioServer) {
+  const countOut = (target) => {
+    const originalEmit = target.emit.bind(target);
+    target.emit = (event, ...rest) => {
+      socketEvents.inc({ direction: 'out', event: String(event) });
+      return originalEmit(event, ...rest);
+    };
+    return target;
+  };
+  // Room broadcasts: io.to(room).emit(...)
+  for (const method of ['to', 'in', 'except']) {
+    const original = ioServer[method].bind(ioServer);
+    ioServer[method] = (...args) => countOut(original(...args));
+  }
+  countOut(ioServer);
+  ioServer.on('connection', (socket) => {
+    socketConnections.inc({ state: 'open' });
+    socket.onAny((event) => socketEvents.inc({ direction: 'in', event: String(event) }));
+    socket.on('disconnect', () => socketConnections.inc({ state: 'close' }));
+  });
+}
+// ═══ END METRICS CORE ═══════════════════════════════════════
+`;
+
+const appMatch = code.match(/const app = express\(\);?\n/);
+if (!appMatch) { console.error('Cannot find "const app = express()"'); process.exit(1); }
+const appEnd = appMatch.index + appMatch[0].length;
+code = code.slice(0, appEnd) + METRICS_CORE + code.slice(appEnd);
+changes++;
+console.log('1. Added metrics core + request timing middleware');
+
+// ── 2. Wrap db.query and socket.io once both exist (just before the connection handler) ──
+const ioConnIdx = code.indexOf("io.on('connection'");
+if (ioConnIdx === -1) { console.error("Cannot find io.on('connection')"); process.exit(1); }
+code = code.slice(0, ioConnIdx) + 'instrumentDb(db);\ninstrumentSocketServer(io);\n\n' + code.slice(ioConnIdx);
+changes++;
+console.log('2. Instrumented db.query and socket.io');
+
+// ── 3. GET /metrics before server.listen ──
+const METRICS_ENDPOINT = `
+// ═══════════════════════════════════════════════════════════
+// PROMETHEUS METRICS
+// ═══════════════════════════════════════════════════════════
+${METRICS_ROUTE}
+`;
+
+const listenIdx = code.lastIndexOf('server.listen(');
+if (listenIdx === -1) { console.error('Cannot find server.listen'); process.exit(1); }
+code = code.slice(0, listenIdx) + METRICS_ENDPOINT + code.slice(listenIdx);
+changes++;
+console.log('3. Added GET /metrics endpoint');
+
+fs.writeFileSync(serverPath, code);
+console.log(`\nDone! Applied ${changes} changes.`);
@@ -0,0 +1,314 @@
+// Backend patch: batched post engagement + lazy comment trees
+// Feed responses (GET /api/posts, /api/posts/user/:address, /api/groups/:id/posts and the
+// cached public feed) get, for every post on the page, in two batched queries:
+//   reaction_count, comment_count, user_reaction and top_comments (the FEED_TOP_COMMENTS most
+//   reacted top-level comments, each with reaction_count, reply_count and user_reaction)
+// so rendering a feed no longer costs a comments request per post.
+// Adds GET /api/posts/:postId/comments/tree?parentId=&cursor=&limit=
+//   -> { comments, nextCursor } — one level of the tree (top level when parentId is empty),
+//   oldest first, keyset-paged on id; each comment carries reply_count so its replies can be
+//   fetched as their own level with their own cursor.
+// Counts are aggregated once per query with GROUP BY over the ids involved, never with a
+// COUNT subquery per row. Column names of the reaction / comment tables are looked up in
+// information_schema once, since those tables predate the scripts in this repo.
+// Re-running on a server with an older version of the service swaps in the current module.
+// Run on server: node tmp_patch_post_engagement.js
+
+const fs = require('fs');
+
+const serverPath = '/root/server.js';
+let code = fs.readFileSync(serverPath, 'utf8');
+let changes = 0;
+
+if (code.includes('const postEngagement') && code.includes('function reactionCountJoin')) {
+  console.log('SKIP - post engagement already patched');
+  process.exit(0);
+}
+
+// ── 1. Engagement service + comment tree endpoint, before server.listen ──
+const SERVICE = `
+// ═══════════════════════════════════════════════════════════
+// POST ENGAGEMENT (batched counts, top comments, comment tree)
+// ═══════════════════════════════════════════════════════════
+const FEED_TOP_COMMENTS = 3;
+const COMMENT_PAGE_DEFAULT = 20;
+const COMMENT_PAGE_MAX = 50;
+
+const postEngagement = (() => {
+  let schemaPromise = null;
+
+  function schema() {
+    if (!schemaPromise) {
+      schemaPromise = (async () => {
+        const cols = await db.query(
+          \`SELECT table_name, column_name FROM information_schema.columns
+           WHERE table_schema = 'public' AND table_name = ANY($1)\`,
+          [['reactions', 'comments', 'comment_reactions']]
+        );
+        const first = (table, candidates) =>
+          candidates.find(c => cols.rows.some(r => r.table_name === table && r.column_name === c)) || null;
+        const s = {
+          reactionUser: first('reactions', ['user_address', 'wallet_address']),
+          reactionType: first('reactions', ['reaction_type', 'type']),
+          commentAuthor: first('comments', ['author_address', 'user_address']),
+          commentParent: first('comments', ['parent_comment_id', 'parent_id']),
+          commentMedia: first('comments', ['media_url']),
+          commentReactions: first('comment_reactions', ['comment_id']) ? {
+            user: first('comment_reactions', ['user_address', 'wallet_address']),
+            type: first('comment_reactions', ['reaction_type', 'type']),
+          } : null,
+        };
+        s.postViewer = !!(s.reactionUser && s.reactionType);
+        s.commentViewer = !!(s.commentReactions && s.commentReactions.user && s.commentReactions.type);
+        if (!s.commentAuthor) throw new Error('comments table has no author column');
+        return s;
+      })().catch((err) => { schemaPromise = null; throw err; });
+    }
+    return schemaPromise;
+  }
+
+  // Reaction / reply counts for the comments idsSql selects, one GROUP BY comment_id over
+  // ANY(ids), joined on c.id as rc / rp (nothing when the table or column does not exist)
+  function reactionCountJoin(s, idsSql) {
+    if (!s.commentReactions) return '';
+    return \`LEFT JOIN (
+           SELECT comment_id, COUNT(*)::int AS count
+           FROM comment_reactions
+           WHERE comment_id = ANY(ARRAY(\${idsSql}))
+           GROUP BY comment_id
+         ) rc ON rc.comment_id = c.id\`;
+  }
+
+  function replyCountJoin(s, idsSql) {
+    if (!s.commentParent) return '';
+    return \`LEFT JOIN (
+           SELECT \${s.commentParent} AS comment_id, COUNT(*)::int AS count
+           FROM comments
+           WHERE \${s.commentParent} = ANY(ARRAY(\${idsSql}))
+           GROUP BY \${s.commentParent}
+         ) rp ON rp.comment_id = c.id\`;
+  }
+
+  // Shared SELECT for a comment row; viewer is the placeholder holding the viewer address
+  // (only referenced when s.commentViewer, so callers bind it only then). The query joins
+  // reactionCountJoin + replyCountJoin over the same comments.
+  function commentColumns(s, viewer) {
+    const cr = s.commentReactions;
+    return \`c.id, c.post_id, c.content, \${s.commentMedia ? 'c.media_url' : 'NULL::text AS media_url'}, c.created_at,
+            c.\${s.commentAuthor} AS author_address,
+            \${s.commentParent ? \`c.\${s.commentParent}\` : 'NULL::int'} AS parent_comment_id,
+            u.username, u.profile_image,
+            \${cr ? 'COALESCE(rc.count, 0)' : '0'} AS reaction_count,
+            \${s.commentParent ? 'COALESCE(rp.count, 0)' : '0'} AS reply_count,
+            \${s.commentViewer
+              ? \`(SELECT cr.\${cr.type} FROM comment_reactions cr WHERE cr.comment_id = c.id AND cr.\${cr.user} = \${viewer} LIMIT 1)\`
+              : 'NULL::int'} AS user_reaction\`;
+  }
+
+  // Adds counts, the viewer's reaction and top comments to a page of posts.
+  // viewer may be null (public feed): user_reaction is then always null.
+  async function attach(posts, viewer) {
+    const ids = [...new Set(posts.map(p => parseInt(p.id)).filter(Number.isFinite))];
+    if (ids.length === 0) return posts;
+    const s = await schema();
+
+    const viewerReaction = s.postViewer
+      ? \`(SELECT r.\${s.reactionType} FROM reactions r WHERE r.post_id = p.id AND r.\${s.reactionUser} = $2 LIMIT 1)\`
+      : 'NULL::int';
+    const topLevel = s.commentParent ? \`AND c.\${s.commentParent} IS NULL\` : '';
+
+    const [counts, top] = await Promise.all([
+      db.query(
+        \`SELECT p.id,
+                COALESCE(r.count, 0) AS reaction_count,
+                COALESCE(c.count, 0) AS comment_count,
+                \${viewerReaction} AS user_reaction
+         FROM unnest($1::int[]) AS p(id)
+         LEFT JOIN (
+           SELECT post_id, COUNT(*)::int AS count FROM reactions WHERE post_id = ANY($1) GROUP BY post_id
+         ) r ON r.post_id = p.id
+         LEFT JOIN (
+           SELECT post_id, COUNT(*)::int AS count FROM comments WHERE post_id = ANY($1) GROUP BY post_id
+         ) c ON c.post_id = p.id\`,
+        s.postViewer ? [ids, viewer] : [ids]
+      ),
+      db.query(
+        \`WITH candidates AS (
+           SELECT c.id, c.post_id FROM comments c WHERE c.post_id = ANY($1) \${topLevel}
+         ), ranked AS (
+           SELECT c.id, ROW_NUMBER() OVER (
+                    PARTITION BY c.post_id
+                    ORDER BY \${s.commentReactions ? 'COALESCE(rc.count, 0)' : '0'} DESC, c.id ASC) AS rn
+           FROM candidates c
+           \${reactionCountJoin(s, 'SELECT id FROM candidates')}
+         )
+         SELECT \${commentColumns(s, '$3')}
+         FROM ranked
+         JOIN comments c ON c.id = ranked.id
+         JOIN users u ON u.wallet_address = c.\${s.commentAuthor}
+         \${reactionCountJoin(s, 'SELECT id FROM ranked WHERE rn <= $2')}
+         \${replyCountJoin(s, 'SELECT id FROM ranked WHERE rn <= $2')}
+         WHERE ranked.rn <= $2
+         ORDER BY c.post_id, ranked.rn\`,
+        s.commentViewer ? [ids, FEED_TOP_COMMENTS, viewer] : [ids, FEED_TOP_COMMENTS]
+      ),
+    ]);
+
+    const countsById = new Map(counts.rows.map(r => [r.id, r]));
+    const topById = new Map();
+    for (const row of top.rows) {
+      if (!topById.has(row.post_id)) topById.set(row.post_id, []);
+      topById.get(row.post_id).push(row);
+    }
+    return posts.map((post) => {
+      const c = countsById.get(parseInt(post.id));
+      if (!c) return post;
+      return {
+        ...post,
+        reaction_count: c.reaction_count,
+        comment_count: c.comment_count,
+        user_reaction: c.user_reaction ?? post.user_reaction ?? null,
+        top_comments: topById.get(parseInt(post.id)) || [],
+      };
+    });
+  }
+
+  // Comment ids are serial, so id order is posting order and a bare id is a stable cursor
+  // (a JS Date would drop the microseconds of created_at and repeat rows across pages)
+  function encodeCursor(row) {
+    return Buffer.from(JSON.stringify({ id: row.id })).toString('base64url');
+  }
+
+  function decodeCursor(cursor) {
+    if (!cursor) return null;
+    try {
+      const { id } = JSON.parse(Buffer.from(String(cursor), 'base64url').toString());
+      return Number.isInteger(id) ? id : null;
+    } catch (e) {
+      return null;
+    }
+  }
+
+  // One level of a post's comment tree, oldest first, keyset-paged on id
+  async function level(postId, parentId, viewer, cursor, limit) {
+    const s = await schema();
+    if (parentId && !s.commentParent) return { comments: [], nextCursor: null };
+    const params = [postId, limit + 1];
+    if (s.commentViewer) params.push(viewer);
+    let where = 'c.post_id = $1';
+    if (s.commentParent) {
+      if (parentId) {
+        params.push(parentId);
+        where += \` AND c.\${s.commentParent} = $\${params.length}\`;
+      } else {
+        where += \` AND c.\${s.commentParent} IS NULL\`;
+      }
+    }
+    const after = decodeCursor(cursor);
+    if (after !== null) {
+      params.push(after);
+      where += \` AND c.id > $\${params.length}\`;
+    }
+    const result = await db.query(
+      \`WITH page AS (
+         SELECT c.id FROM comments c WHERE \${where} ORDER BY c.id ASC LIMIT $2
+       )
+       SELECT \${commentColumns(s, '$3')}
+       FROM page
+       JOIN comments c ON c.id = page.id
+       JOIN users u ON u.wallet_address = c.\${s.commentAuthor}
+       \${reactionCountJoin(s, 'SELECT id FROM page')}
+       \${replyCountJoin(s, 'SELECT id FROM page')}
+       ORDER BY c.id ASC\`,
+      params
+    );
+    const comments = result.rows.slice(0, limit);
+    const nextCursor = result.rows.length > limit ? encodeCursor(comments[comments.length - 1]) : null;
+    return { comments, nextCursor };
+  }
+
+  return { attach, level };
+})();
+
+// ── GET /api/posts/:postId/comments/tree — one paged level of a post's comments ──
+app.get('/api/posts/:postId/comments/tree', authenticateToken, async (req, res) => {
+  try {
+    const postId = parseInt(req.params.postId);
+    if (!postId) return res.status(400).json({ error: 'Invalid post' });
+    const parentId = req.query.parentId ? parseInt(req.query.parentId) : null;
+    if (req.query.parentId && !parentId) return res.status(400).json({ error: 'Invalid parent comment' });
+    const limit = Math.min(Math.max(parseInt(req.query.limit) || COMMENT_PAGE_DEFAULT, 1), COMMENT_PAGE_MAX);
+
+    const page = await postEngagement.level(postId, parentId, req.userAddress, req.query.cursor, limit);
+    res.json(page);
+  } catch (error) {
+    console.error('Get comment tree error:', error);
+    res.status(500).json({ error: 'Failed to get comments' });
+  }
+});
+
+`;
+
+if (code.includes('const postEngagement')) {
+  // Older version (COUNT subquery per row): swap the module, keep the routes and hooks
+  const banner = '// ═══════════════════════════════════════════════════════════\n// POST ENGAGEMENT';
+  const oldStart = code.indexOf(banner);
+  const oldEnd = oldStart === -1 ? -1 : code.indexOf('\n})();\n', oldStart);
+  if (oldEnd === -1) { console.error('Cannot find the existing post engagement module to upgrade'); process.exit(1); }
+  const newStart = SERVICE.indexOf(banner);
+  const serviceModule = SERVICE.slice(newStart, SERVICE.indexOf('\n})();\n', newStart) + '\n})();\n'.length);
+  code = code.slice(0, oldStart) + serviceModule + code.slice(oldEnd + '\n})();\n'.length);
+  fs.writeFileSync(serverPath, code);
+  console.log('1. Upgraded the post engagement module (counts aggregated with GROUP BY)');
+  console.log(`\nDone! Applied 1 changes.`);
+  process.exit(0);
+}
+
+const listenIdx = code.lastIndexOf('server.listen(');
+if (listenIdx === -1) { console.error('Cannot find server.listen'); process.exit(1); }
+code = code.slice(0, listenIdx) + SERVICE + code.slice(listenIdx);
+changes++;
+console.log('1. Added post engagement service + GET /api/posts/:postId/comments/tree');
+
+// ── 2. Attach engagement to every feed page on the way out ──
+// The feed handlers keep their own queries; their res.json() is wrapped so the page of
+// posts is enriched with one batched round trip instead of one comments request per post.
+const FEED_HOOK = `
+// Post engagement: enrich feed pages with counts + top comments
+const FEED_PAGE_RE = /^\\/api\\/(posts(\\/user\\/[^/]+)?|groups\\/\\d+\\/posts)\\/?$/;
+app.use((req, res, next) => {
+  if (req.method !== 'GET' || !FEED_PAGE_RE.test(req.path)) return next();
+  const json = res.json.bind(res);
+  res.json = (body) => {
+    if (res.statusCode >= 400 || !body || !Array.isArray(body.posts) || body.posts.length === 0) return json(body);
+    postEngagement.attach(body.posts, req.userAddress || null)
+      .then(posts => json({ ...body, posts }))
+      .catch((err) => {
+        console.error('Post engagement error:', err.message);
+        json(body);
+      });
+    return res;
+  };
+  next();
+});
+`;
+const appMatch = code.match(/const app = express\(\);?\n/);
+if (!appMatch) { console.error('Cannot find "const app = express()"'); process.exit(1); }
+const appEnd = appMatch.index + appMatch[0].length;
+code = code.slice(0, appEnd) + FEED_HOOK + code.slice(appEnd);
+changes++;
+console.log('2. Added feed engagement hook');
+
+// ── 3. Public feed cache renders the same fields (no viewer) ──
+const PUBLIC_RENDER = 'return JSON.stringify({ posts });';
+if (code.includes('const publicFeedCache') && code.includes(PUBLIC_RENDER)) {
+  code = code.replace(PUBLIC_RENDER, 'return JSON.stringify({ posts: await postEngagement.attach(posts, null) });');
+  changes++;
+  console.log('3. Public feed cache now includes top comments');
+} else {
+  console.log('3. Public feed cache not found (run tmp_patch_public_cache.js first) — skipped');
+}
+
+fs.writeFileSync(serverPath, code);
+console.log(`\nDone! Applied ${changes} changes.`);
+console.log('Run tmp_create_engagement_indexes.js if the engagement indexes do not exist yet.');
@@ -0,0 +1,227 @@
+// Backend patch: bulk profile hydration
+// Adds:
+//   POST /api/profiles/batch { addresses: [], usernames: [], groupId? }
+//     -> { profiles: [{ address, username, profileImage, nickname, online }] }
+//   Up to PROFILE_BATCH_MAX lookups per call, so a list of N authors costs one request.
+// Cards (address, username, avatar) are cached in memory by address with a username index.
+// Any successful write under /api/profile drops the writer's card here and, through Postgres
+// NOTIFY, on the other API workers. Presence and per-server nicknames are looked up per request
+// (presence is an in-memory check; nicknames are one ANY() query) and never cached.
+// Presence is cluster-wide when tmp_patch_member_list.js is applied: this patch makes its
+// memberList service export isOnline (also on servers where profile cards already exist).
+// Run on server: node tmp_patch_profile_cards.js
+
+const fs = require('fs');
+
+const serverPath = '/root/server.js';
+let code = fs.readFileSync(serverPath, 'utf8');
+let changes = 0;
+
+// memberList (tmp_patch_member_list.js) tracks presence on every worker but did not export it
+const MEMBER_LIST_RETURN = '  return { get, range, onlineCount, scheduleRefresh, presenceChanged };\n})();';
+function exportIsOnline() {
+  if (!code.includes(MEMBER_LIST_RETURN)) return false;
+  code = code.replace(MEMBER_LIST_RETURN, '  return { get, range, onlineCount, isOnline, scheduleRefresh, presenceChanged };\n})();');
+  return true;
+}
+
+if (code.includes('const profileCards')) {
+  if (exportIsOnline()) {
+    fs.writeFileSync(serverPath, code);
+    console.log('1. memberList now exports isOnline (cluster-wide presence for profile cards)');
+    process.exit(0);
+  }
+  console.log('SKIP - profile cards already patched');
+  process.exit(0);
+}
+
+// ── 1. Card cache + batch endpoint, before server.listen ──
+const SERVICE = `
+// ═══════════════════════════════════════════════════════════
+// PROFILE CARDS (bulk hydration)
+// ═══════════════════════════════════════════════════════════
+const PROFILE_BATCH_MAX = 200;
+const PROFILE_CARD_MAX = 10000;
+const PROFILE_CARD_TTL_MS = 10 * 60 * 1000;
+
+const profileCards = (() => {
+  const cards = new Map();       // lowercased address -> { address, username, profileImage, loadedAt }
+  const byUsername = new Map();  // lowercased username -> lowercased address
+  let generation = 0;
+
+  function store(card) {
+    const key = card.address.toLowerCase();
+    cards.delete(key);
+    cards.set(key, card);
+    if (card.username) byUsername.set(card.username.toLowerCase(), key);
+    while (cards.size > PROFILE_CARD_MAX) {
+      const [oldKey, old] = cards.entries().next().value;
+      cards.delete(oldKey);
+      if (old.username && byUsername.get(old.username.toLowerCase()) === oldKey) byUsername.delete(old.username.toLowerCase());
+    }
+  }
+
+  function fresh(card) {
+    return card && Date.now() - card.loadedAt < PROFILE_CARD_TTL_MS ? card : null;
+  }
+
+  // Resolves addresses and usernames to cards; unknown users are simply absent
+  async function lookup(addresses, usernames) {
+    const found = new Map();
+    const missAddresses = [];
+    const missUsernames = [];
+    for (const a of addresses) {
+      const card = fresh(cards.get(a));
+      if (card) found.set(a, card); else missAddresses.push(a);
+    }
+    for (const u of usernames) {
+      const card = fresh(cards.get(byUsername.get(u)));
+      if (card) found.set(card.address.toLowerCase(), card); else missUsernames.push(u);
+    }
+
+    if (missAddresses.length > 0 || missUsernames.length > 0) {
+      const gen = generation;
+      const result = await db.query(
+        \`SELECT wallet_address, username, profile_image FROM users
+         WHERE LOWER(wallet_address) = ANY($1) OR LOWER(username) = ANY($2)\`,
+        [missAddresses, missUsernames]
+      );
+      for (const row of result.rows) {
+        const card = { address: row.wallet_address, username: row.username, profileImage: row.profile_image || null, loadedAt: Date.now() };
+        if (gen === generation) store(card);
+        found.set(row.wallet_address.toLowerCase(), card);
+      }
+    }
+    return [...found.values()];
+  }
+
+  function invalidate(address) {
+    const key = (address || '').toLowerCase();
+    generation++;
+    const card = cards.get(key);
+    cards.delete(key);
+    if (card?.username && byUsername.get(card.username.toLowerCase()) === key) byUsername.delete(card.username.toLowerCase());
+  }
+
+  function changed(address) {
+    invalidate(address);
+    db.query("SELECT pg_notify('profile_card_invalidate', $1)", [JSON.stringify({ address, pid: process.pid })])
+      .catch(err => console.error('Profile card notify error:', err.message));
+  }
+
+  async function startListener() {
+    const { Client } = require('pg');
+    const listener = new Client({
+      host: process.env.DB_HOST || 'localhost',
+      port: process.env.DB_PORT || 5432,
+      database: process.env.DB_NAME || 'hyve_social',
+      user: process.env.DB_USER || 'hyve_admin',
+      password: process.env.DB_PASSWORD,
+    });
+    let retried = false;
+    const retry = () => {
+      if (retried) return;
+      retried = true;
+      cards.clear(); // may have missed invalidations while disconnected
+      byUsername.clear();
+      setTimeout(() => startListener().catch(err => console.error('Profile card listener error:', err.message)), 5000);
+    };
+    listener.on('error', retry);
+    listener.on('end', retry);
+    listener.on('notification', (msg) => {
+      try {
+        const { address, pid } = JSON.parse(msg.payload);
+        if (pid !== process.pid) invalidate(address);
+      } catch (e) {}
+    });
+    await listener.connect();
+    await listener.query('LISTEN profile_card_invalidate');
+  }
+
+  startListener().catch(err => console.error('Profile card listener error:', err.message));
+
+  return { lookup, changed };
+})();
+
+function isUserOnline(address) {
+  const key = (address || '').toLowerCase();
+  if (typeof memberList !== 'undefined' && memberList.isOnline) return memberList.isOnline(key);
+  const entry = onlineUsers.get(key);
+  return !!(entry && entry.sockets && entry.sockets.size > 0);
+}
+
+// ── POST /api/profiles/batch — compact profile cards for many users in one call ──
+app.post('/api/profiles/batch', authenticateToken, async (req, res) => {
+  try {
+    const clean = (list) => [...new Set((Array.isArray(list) ? list : [])
+      .filter(v => typeof v === 'string' && v.trim())
+      .map(v => v.trim().toLowerCase()))];
+    const addresses = clean(req.body.addresses);
+    const usernames = clean(req.body.usernames);
+    if (addresses.length + usernames.length === 0) return res.json({ profiles: [] });
+    if (addresses.length + usernames.length > PROFILE_BATCH_MAX) {
+      return res.status(400).json({ error: \`At most \${PROFILE_BATCH_MAX} profiles per request\` });
+    }
+
+    const found = await profileCards.lookup(addresses, usernames);
+
+    const nicknames = new Map();
+    const groupId = parseInt(req.body.groupId);
+    if (groupId && found.length > 0) {
+      const result = await db.query(
+        'SELECT user_address, nickname FROM server_nicknames WHERE group_id = $1 AND LOWER(user_address) = ANY($2)',
+        [groupId, found.map(c => c.address.toLowerCase())]
+      );
+      result.rows.forEach(r => nicknames.set(r.user_address.toLowerCase(), r.nickname));
+    }
+
+    const profiles = found.map(({ loadedAt, ...card }) => ({
+      ...card,
+      nickname: nicknames.get(card.address.toLowerCase()) || null,
+      online: isUserOnline(card.address),
+    }));
+    res.json({ profiles });
+  } catch (error) {
+    console.error('Batch profiles error:', error);
+    res.status(500).json({ error: 'Failed to load profiles' });
+  }
+});
+
+`;
+
+const listenIdx = code.lastIndexOf('server.listen(');
+if (listenIdx === -1) { console.error('Cannot find server.listen'); process.exit(1); }
+code = code.slice(0, listenIdx) + SERVICE + code.slice(listenIdx);
+changes++;
+console.log('1. Added profile card cache + POST /api/profiles/batch');
+
+// ── 2. Drop the writer's card after any successful profile write ──
+const PROFILE_HOOK = `
+// Profile card invalidation: username / avatar changes go through /api/profile
+app.use((req, res, next) => {
+  if (req.method === 'GET' || !/^\\/api\\/profile(\\/|$)/.test(req.path)) return next();
+  res.on('finish', () => {
+    if (res.statusCode < 400 && req.userAddress) profileCards.changed(req.userAddress);
+  });
+  next();
+});
+`;
+const appMatch = code.match(/const app = express\(\);?\n/);
+if (!appMatch) { console.error('Cannot find "const app = express()"'); process.exit(1); }
+const appEnd = appMatch.index + appMatch[0].length;
+code = code.slice(0, appEnd) + PROFILE_HOOK + code.slice(appEnd);
+changes++;
+console.log('2. Added profile write hook');
+
+// ── 3. Cluster-wide presence from the member list service ──
+if (exportIsOnline()) {
+  changes++;
+  console.log('3. memberList now exports isOnline');
+} else if (code.includes('const memberList = ')) {
+  console.log('3. SKIP - memberList already exports isOnline');
+} else {
+  console.log('3. SKIP - member list not patched (presence is this worker only)');
+}
+
+fs.writeFileSync(serverPath, code);
+console.log(`\nDone! Applied ${changes} changes.`);
@@ -0,0 +1,272 @@
+// Backend patch: public-feed microcache
+// GET /api/posts/public and GET /api/stories/public return the same bytes to every
+// visitor, so they are rendered once to a JSON string (plus ETag) and served from memory:
+//   - the default page (limit 50, offset 0) and the stories list are rebuilt in the
+//     background every PUBLIC_FEED_REFRESH_MS; other limit/offset pages are built on
+//     first request and kept in a small LRU
+//   - creating, editing or deleting a post or story that is (or was) public rebuilds the
+//     cache, and a Postgres NOTIFY tells the other API workers to do the same; bursts are
+//     coalesced to one rebuild per PUBLIC_FEED_REBUILD_MIN_MS on every worker
+//   - responses carry ETag (304 on If-None-Match) and short public Cache-Control so
+//     nginx (see tmp_ssh_nginx_public_cache.py) and browsers can absorb link spikes
+// Both endpoints no longer require a token: the payload has no per-user fields.
+// Run on server: node tmp_patch_public_cache.js
+
+const fs = require('fs');
+
+const serverPath = '/root/server.js';
+let code = fs.readFileSync(serverPath, 'utf8');
+let changes = 0;
+
+if (code.includes('const publicFeedCache')) {
+  console.log('SKIP - public feed cache already patched');
+  process.exit(0);
+}
+
+function replaceRoute(marker, errorLog, replacement) {
+  const start = code.indexOf(marker);
+  if (start === -1) return false;
+  const errIdx = code.indexOf(errorLog, start);
+  const end = errIdx === -1 ? -1 : code.indexOf('\n});', errIdx);
+  if (end === -1 || errIdx - start > 3000) return false;
+  // Take the route's "// Get public ..." comment line with it
+  const lineStart = code.lastIndexOf('\n', start - 2) + 1;
+  const from = code.slice(lineStart, start).trim().startsWith('// Get public') ? lineStart : start;
+  code = code.slice(0, from) + replacement + code.slice(end + '\n});'.length);
+  return true;
+}
+
+// ── 1. Cache module + cached routes (replace the uncached handlers) ──
+const CACHE_MODULE = `// ═══════════════════════════════════════════════════════════
+// PUBLIC FEED MICROCACHE
+// ═══════════════════════════════════════════════════════════
+const PUBLIC_FEED_REFRESH_MS = parseInt(process.env.PUBLIC_FEED_REFRESH_MS || '15000');
+const PUBLIC_FEED_MAX_PAGES = 50;
+const PUBLIC_FEED_REBUILD_MIN_MS = parseInt(process.env.PUBLIC_FEED_REBUILD_MIN_MS || '1000');
+const PUBLIC_FEED_CACHE_CONTROL = 'public, max-age=5, s-maxage=10, stale-while-revalidate=30';
+
+const publicFeedCache = (() => {
+  const crypto = require('crypto');
+  const entries = new Map();  // key -> { body, etag, builtAt }
+  const building = new Map(); // key -> { gen, promise } (single flight per key and generation)
+  let generation = 0;         // bumped on invalidation so in-flight builds are not stored
+  let lastRebuild = 0;
+  let rebuildTimer = null;
+  let notifyPending = false;
+
+  const HOT_KEYS = ['posts:50:0', 'stories'];
+
+  async function render(key) {
+    if (key === 'stories') {
+      const result = await db.query(
+        \`SELECT s.*, u.username, u.profile_image
+         FROM stories s
+         JOIN users u ON s.user_address = u.wallet_address
+         WHERE s.is_public = TRUE AND s.expires_at > NOW()
+         ORDER BY s.created_at DESC\`,
+        []
+      );
+      return JSON.stringify({ stories: result.rows });
+    }
+    const [, limit, offset] = key.split(':').map(Number);
+    const result = await db.query(
+      \`SELECT p.*, u.username, u.profile_image,
+              (SELECT COUNT(*) FROM reactions WHERE post_id = p.id) as reaction_count,
+              (SELECT COUNT(*) FROM comments WHERE post_id = p.id) as comment_count
+       FROM posts p
+       JOIN users u ON p.author_address = u.wallet_address
+       WHERE p.is_public = TRUE AND p.group_id IS NULL
+       ORDER BY p.created_at DESC
+       LIMIT $1 OFFSET $2\`,
+      [limit, offset]
+    );
+    const posts = result.rows.map((post) => ({
+      ...post,
+      created_at: post.created_at ? new Date(post.created_at).toISOString() : null,
+      updated_at: post.updated_at ? new Date(post.updated_at).toISOString() : null
+    }));
+    return JSON.stringify({ posts });
+  }
+
+  function build(key) {
+    const gen = generation;
+    const inFlight = building.get(key);
+    if (inFlight && inFlight.gen === gen) return inFlight.promise;
+    const promise = render(key)
+      .then((body) => {
+        const entry = { body, etag: '"' + crypto.createHash('sha1').update(body).digest('base64url') + '"', builtAt: Date.now() };
+        if (gen === generation) {
+          entries.delete(key);
+          entries.set(key, entry);
+          while (entries.size > PUBLIC_FEED_MAX_PAGES + HOT_KEYS.length) {
+            const oldest = [...entries.keys()].find(k => !HOT_KEYS.includes(k));
+            if (!oldest) break;
+            entries.delete(oldest);
+          }
+        }
+        return entry;
+      })
+      .finally(() => { if (building.get(key)?.promise === promise) building.delete(key); });
+    building.set(key, { gen, promise });
+    return promise;
+  }
+
+  async function get(key) {
+    const entry = entries.get(key);
+    if (entry && Date.now() - entry.builtAt < PUBLIC_FEED_REFRESH_MS * 2) return entry;
+    return build(key); // missing, invalidated, or the refresher has stalled
+  }
+
+  function send(req, res, entry) {
+    res.set('Cache-Control', PUBLIC_FEED_CACHE_CONTROL);
+    res.set('ETag', entry.etag);
+    if (req.headers['if-none-match'] === entry.etag) return res.status(304).end();
+    res.type('application/json').send(entry.body);
+  }
+
+  // Drop everything and rebuild the hot pages straight away
+  function invalidate() {
+    generation++;
+    entries.clear();
+    HOT_KEYS.forEach(k => build(k).catch(err => console.error('Public feed rebuild error:', err.message)));
+  }
+
+  function notifyOthers() {
+    db.query("SELECT pg_notify('public_feed_invalidate', $1)", [JSON.stringify({ pid: process.pid })])
+      .catch(err => console.error('Public feed notify error:', err.message));
+  }
+
+  // Coalesce bursts of writes: the first change rebuilds straight away, later ones within
+  // PUBLIC_FEED_REBUILD_MIN_MS share a single rebuild (and NOTIFY) at the end of the window
+  function schedule(notify) {
+    if (notify) notifyPending = true;
+    if (rebuildTimer) return;
+    const wait = Math.max(0, lastRebuild + PUBLIC_FEED_REBUILD_MIN_MS - Date.now());
+    rebuildTimer = setTimeout(() => {
+      rebuildTimer = null;
+      lastRebuild = Date.now();
+      invalidate();
+      if (notifyPending) {
+        notifyPending = false;
+        notifyOthers();
+      }
+    }, wait);
+  }
+
+  function changed() {
+    schedule(true);
+  }
+
+  async function startListener() {
+    const { Client } = require('pg');
+    const listener = new Client({
+      host: process.env.DB_HOST || 'localhost',
+      port: process.env.DB_PORT || 5432,
+      database: process.env.DB_NAME || 'hyve_social',
+      user: process.env.DB_USER || 'hyve_admin',
+      password: process.env.DB_PASSWORD,
+    });
+    const restart = () => setTimeout(() => startListener().catch(err => console.error('Public feed listener error:', err.message)), 5000);
+    listener.on('error', () => {});
+    listener.on('end', restart);
+    listener.on('notification', (msg) => {
+      try {
+        if (JSON.parse(msg.payload).pid !== process.pid) schedule(false);
+      } catch (e) {}
+    });
+    try {
+      await listener.connect();
+      await listener.query('LISTEN public_feed_invalidate');
+    } catch (err) {
+      listener.removeAllListeners('end');
+      listener.end().catch(() => {});
+      restart();
+      throw err;
+    }
+  }
+
+  // Background refresh keeps counts and story expiry current without a request paying for it.
+  // If the LISTEN connection is down, this interval still bounds staleness.
+  setInterval(() => {
+    HOT_KEYS.forEach(k => build(k).catch(err => console.error('Public feed refresh error:', err.message)));
+  }, PUBLIC_FEED_REFRESH_MS).unref();
+
+  startListener().catch(err => { console.error('Public feed listener error:', err.message); });
+
+  return { get, send, changed };
+})();
+
+// Get public posts (cached, no auth — identical for every visitor)
+app.get('/api/posts/public', async (req, res) => {
+  try {
+    const limit = Math.min(parseInt(req.query.limit) || 50, 100);
+    const offset = Math.max(parseInt(req.query.offset) || 0, 0);
+    const entry = await publicFeedCache.get(\`posts:\${limit}:\${offset}\`);
+    publicFeedCache.send(req, res, entry);
+  } catch (error) {
+    console.error('Get public posts error:', error);
+    res.status(500).json({ error: 'Failed to get public posts' });
+  }
+});`;
+
+const STORIES_ROUTE = `// Get public stories (cached, no auth — identical for every visitor)
+app.get('/api/stories/public', async (req, res) => {
+  try {
+    const entry = await publicFeedCache.get('stories');
+    publicFeedCache.send(req, res, entry);
+  } catch (error) {
+    console.error('Get public stories error:', error);
+    res.status(500).json({ error: 'Failed to get public stories' });
+  }
+});`;
+
+if (!replaceRoute("app.get('/api/posts/public'", "console.error('Get public posts error:'", CACHE_MODULE)) {
+  console.error('Cannot find GET /api/posts/public — run tmp_patch_public.js first');
+  process.exit(1);
+}
+changes++;
+console.log('1. Replaced GET /api/posts/public with the cached handler');
+
+if (!replaceRoute("app.get('/api/stories/public'", "console.error('Get public stories error:'", STORIES_ROUTE)) {
+  console.error('Cannot find GET /api/stories/public — run tmp_patch_public.js first');
+  process.exit(1);
+}
+changes++;
+console.log('2. Replaced GET /api/stories/public with the cached handler');
+
+// ── 2. Rebuild after successful public post / story create, edit or delete ──
+// Reactions and comments only move the counts; the background refresh picks those up.
+// Private posts and stories never appear in the cached payload, so writing them rebuilds nothing.
+const WRITE_HOOK = `
+// Public feed invalidation: a public post or story was created, edited or deleted
+const PUBLIC_FEED_WRITE_RE = /^\\/api\\/(posts|stories)(?:\\/(\\d+))?\\/?$/;
+app.use(async (req, res, next) => {
+  const match = req.method === 'GET' ? null : PUBLIC_FEED_WRITE_RE.exec(req.path);
+  if (!match) return next();
+  const [, table, id] = match;
+  let wasPublic = false;
+  if (id) {
+    try {
+      const result = await db.query(\`SELECT is_public FROM \${table} WHERE id = $1\`, [id]);
+      wasPublic = !!(result.rows[0] && result.rows[0].is_public);
+    } catch (e) {
+      wasPublic = true; // unknown, so rebuild to be safe
+    }
+  }
+  res.on('finish', () => {
+    // req.body is parsed by the time the handler has answered
+    const body = req.body || {};
+    if (res.statusCode < 400 && (wasPublic || body.isPublic || body.is_public)) publicFeedCache.changed();
+  });
+  next();
+});
+`;
+const appMatch = code.match(/const app = express\(\);?\n/);
+if (!appMatch) { console.error('Cannot find "const app = express()"'); process.exit(1); }
+const appEnd = appMatch.index + appMatch[0].length;
+code = code.slice(0, appEnd) + WRITE_HOOK + code.slice(appEnd);
+changes++;
+console.log('3. Added post/story write hook');
+
+fs.writeFileSync(serverPath, code);
+console.log(`\nDone! Applied ${changes} changes.`);
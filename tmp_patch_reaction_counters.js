@@ -0,0 +1,608 @@
+// Backend patch: write-behind reactions for posts and channel messages
+// Replaces POST/DELETE /api/posts/:id/react and the channel reaction toggle
+// (POST + GET /api/channels/:channelId/messages/:messageId/reactions) with a shared
+// reaction service:
+//   - each user's reaction on a target is a single idempotent state (post: one reaction
+//     type or none; message: a set of emojis), kept in memory per target
+//   - changes are answered from memory and written to the durable per-user rows
+//     (reactions / channel_reactions) in batched upserts/deletes every REACTION_FLUSH_MS,
+//     sorted by key so concurrent workers take row locks in the same order
+//   - counts = rows already in Postgres + this worker's unflushed changes; after every
+//     flush the touched targets are recounted from the rows and a Postgres NOTIFY makes
+//     the other API workers drop their copy, so aggregates converge across workers; the
+//     recounted message reactions ride along and update their channel tail cache in place
+//     (this worker updates its own tail without a cache NOTIFY per emit)
+//   - channel_reaction_update is sent at most once per REACTION_EMIT_MS per message,
+//     and again after the flush with the recounted totals
+//   - nothing but the per-user rows is stored, so a restart simply recounts from them;
+//     SIGTERM / SIGINT flush before exit (through serverLifecycle.drain() when the graceful
+//     drain patch is applied, so there is one shutdown path)
+// Needs the unique index from tmp_create_reaction_constraints.js for the post upsert.
+// Run on server: node tmp_patch_reaction_counters.js
+
+const fs = require('fs');
+
+const serverPath = '/root/server.js';
+let code = fs.readFileSync(serverPath, 'utf8');
+let changes = 0;
+
+if (code.includes('const reactionCounters') && code.includes('REACTION_NOTIFY_MAX')) {
+  console.log('SKIP - reaction counters already patched');
+  process.exit(0);
+}
+// An older version is already in place: only the service module gets swapped (step 2)
+const upgrade = code.includes('const reactionCounters');
+
+// Cut a route handler out of server.js: from its app.<method>( line to the closing "\n});"
+function removeRoute(re) {
+  const match = code.match(re);
+  if (!match) return false;
+  const end = code.indexOf('\n});', match.index);
+  if (end === -1) return false;
+  code = code.slice(0, match.index) + code.slice(end + '\n});'.length);
+  return true;
+}
+
+// ── 1. Drop the synchronous handlers ──
+const ROUTES = [
+  [/app\.post\('\/api\/posts\/:\w+\/react'/, 'POST /api/posts/:id/react'],
+  [/app\.delete\('\/api\/posts\/:\w+\/react'/, 'DELETE /api/posts/:id/react'],
+  [/app\.post\('\/api\/channels\/:channelId\/messages\/:messageId\/reactions'/, 'POST channel reactions'],
+  [/app\.get\('\/api\/channels\/:channelId\/messages\/:messageId\/reactions'/, 'GET channel reactions'],
+];
+if (!upgrade) {
+  for (const [re, name] of ROUTES) {
+    if (!removeRoute(re)) {
+      console.error(`Cannot find ${name}`);
+      process.exit(1);
+    }
+  }
+  changes++;
+  console.log('1. Removed the synchronous reaction handlers');
+}
+
+// ── 2. Reaction service + routes, before server.listen ──
+const SERVICE = `
+// ═══════════════════════════════════════════════════════════
+// REACTIONS — write-behind (posts + channel messages)
+// ═══════════════════════════════════════════════════════════
+const REACTION_FLUSH_MS = parseInt(process.env.REACTION_FLUSH_MS || '250');
+const REACTION_EMIT_MS = 150;
+const REACTION_PENDING_MAX = 20000;  // flush early past this many unwritten changes
+const REACTION_TARGETS_MAX = 20000;
+const REACTION_NOTIFY_MAX = 7500;    // bytes of targets + messages per NOTIFY (limit is 8000)
+const POST_REACTION_TYPES = [0, 1, 2, 3, 4, 5];
+
+const reactionCounters = (() => {
+  // 'post:12' / 'message:34' -> { kind, id, base, channelId, authorAddress, mine, ops, loading }
+  //   base: Map(value -> count) as stored in Postgres (null = not loaded / invalidated)
+  //   mine: Map(user -> post reaction type | null, or Set of emojis), durable + unflushed
+  //   ops:  unflushed changes for this target (pending or being written)
+  const targets = new Map();
+  let pending = new Map();   // op key -> { tk, kind, id, user, value, from, to, channelId }
+  let flushing = new Map();
+  let flushPromise = null;
+  const emitTimers = new Map();
+  let schemaPromise = null;
+
+  function schema() {
+    if (!schemaPromise) {
+      schemaPromise = (async () => {
+        const cols = await db.query(
+          \`SELECT column_name FROM information_schema.columns
+           WHERE table_schema = 'public' AND table_name = 'reactions'\`
+        );
+        const has = c => cols.rows.some(r => r.column_name === c);
+        const s = {
+          user: ['user_address', 'wallet_address'].find(has),
+          type: ['reaction_type', 'type'].find(has),
+        };
+        if (!s.user || !s.type) throw new Error('reactions table has no user / type column');
+        return s;
+      })().catch((err) => { schemaPromise = null; throw err; });
+    }
+    return schemaPromise;
+  }
+
+  const tkey = (kind, id) => kind + ':' + id;
+
+  function target(kind, id) {
+    const tk = tkey(kind, id);
+    let t = targets.get(tk);
+    if (t) {
+      targets.delete(tk);
+      targets.set(tk, t);
+      return t;
+    }
+    t = { kind, id, base: null, channelId: null, authorAddress: null, mine: new Map(), ops: new Set(), loading: null };
+    targets.set(tk, t);
+    if (targets.size > REACTION_TARGETS_MAX) {
+      for (const [k, old] of targets) {
+        if (targets.size <= REACTION_TARGETS_MAX) break;
+        if (old.ops.size === 0 && !old.loading) targets.delete(k);
+      }
+    }
+    return t;
+  }
+
+  // Per-value counts from the durable rows, for many targets of one kind
+  async function countRows(kind, ids) {
+    const byId = new Map();
+    if (kind === 'post') {
+      const s = await schema();
+      const result = await db.query(
+        \`SELECT p.id, p.author_address, r.\${s.type} AS value, COUNT(r.\${s.user})::int AS count
+         FROM posts p
+         LEFT JOIN reactions r ON r.post_id = p.id
+         WHERE p.id = ANY($1)
+         GROUP BY p.id, p.author_address, r.\${s.type}\`,
+        [ids]
+      );
+      for (const row of result.rows) {
+        if (!byId.has(row.id)) byId.set(row.id, { counts: new Map(), authorAddress: row.author_address, channelId: null });
+        if (row.value !== null) byId.get(row.id).counts.set(Number(row.value), row.count);
+      }
+    } else {
+      const result = await db.query(
+        \`SELECT m.id, m.channel_id, r.emoji AS value, COUNT(r.id)::int AS count
+         FROM channel_messages m
+         LEFT JOIN channel_reactions r ON r.message_id = m.id
+         WHERE m.id = ANY($1)
+         GROUP BY m.id, m.channel_id, r.emoji\`,
+        [ids]
+      );
+      for (const row of result.rows) {
+        if (!byId.has(row.id)) byId.set(row.id, { counts: new Map(), authorAddress: null, channelId: row.channel_id });
+        if (row.value !== null) byId.get(row.id).counts.set(row.value, row.count);
+      }
+    }
+    return byId;
+  }
+
+  // Loads the stored counts once; returns null if the post / message does not exist
+  async function load(kind, id) {
+    const t = target(kind, id);
+    if (t.base) return t;
+    if (!t.loading) {
+      t.loading = (async () => {
+        // Rows being written right now may or may not be visible yet — wait them out
+        while (flushPromise && [...t.ops].some(op => flushing.get(op.key) === op)) await flushPromise;
+        const row = (await countRows(kind, [id])).get(id);
+        if (!row) return false;
+        t.base = row.counts;
+        t.channelId = row.channelId;
+        t.authorAddress = row.authorAddress;
+        return true;
+      })().finally(() => { t.loading = null; });
+    }
+    return (await t.loading) ? t : null;
+  }
+
+  async function mineOf(t, user) {
+    if (t.mine.has(user)) return t.mine.get(user);
+    let value;
+    if (t.kind === 'post') {
+      const s = await schema();
+      const result = await db.query(
+        \`SELECT \${s.type} AS value FROM reactions WHERE post_id = $1 AND \${s.user} = $2 LIMIT 1\`,
+        [t.id, user]
+      );
+      value = result.rows.length > 0 ? Number(result.rows[0].value) : null;
+    } else {
+      const result = await db.query(
+        'SELECT emoji FROM channel_reactions WHERE message_id = $1 AND user_address = $2',
+        [t.id, user]
+      );
+      value = new Set(result.rows.map(r => r.emoji));
+    }
+    if (!t.mine.has(user)) t.mine.set(user, value); // a concurrent request may have set it first
+    return t.mine.get(user);
+  }
+
+  // Records a state change; repeated changes to the same key collapse into one write
+  function record(t, key, user, value, from, to) {
+    const existing = pending.get(key);
+    if (existing) {
+      existing.to = to;
+      if (existing.to === existing.from) {
+        pending.delete(key);
+        t.ops.delete(existing);
+      }
+    } else if (from !== to) {
+      const op = { key, tk: tkey(t.kind, t.id), kind: t.kind, id: t.id, user, value, from, to, channelId: t.channelId };
+      pending.set(key, op);
+      t.ops.add(op);
+    }
+    if (pending.size >= REACTION_PENDING_MAX) flush();
+  }
+
+  function view(t) {
+    const counts = new Map(t.base);
+    const bump = (value, by) => counts.set(value, Math.max(0, (counts.get(value) || 0) + by));
+    for (const op of t.ops) {
+      if (t.kind === 'post') {
+        if (op.from !== null) bump(op.from, -1);
+        if (op.to !== null) bump(op.to, 1);
+      } else {
+        if (op.from) bump(op.value, -1);
+        if (op.to) bump(op.value, 1);
+      }
+    }
+    return counts;
+  }
+
+  function messageReactions(t) {
+    return [...view(t)].filter(([, count]) => count > 0).map(([emoji, count]) => ({ emoji, count }));
+  }
+
+  function scheduleEmit(t) {
+    const tk = tkey(t.kind, t.id);
+    if (t.kind !== 'message' || emitTimers.has(tk)) return;
+    emitTimers.set(tk, setTimeout(() => {
+      emitTimers.delete(tk);
+      if (!t.base) return;
+      const payload = { messageId: t.id, reactions: messageReactions(t) };
+      const room = 'channel-' + t.channelId;
+      io.to(room).emit('channel_reaction_update', payload);
+      // This worker's tail only: the other workers get the recounted reactions with the
+      // reaction_counts NOTIFY after the flush, so no cache NOTIFY per emit
+      if (typeof channelTailCache !== 'undefined') {
+        (channelTailCache.applyLocal || channelTailCache.apply)(t.channelId, 'channel_reaction_update', payload);
+      }
+    }, REACTION_EMIT_MS));
+  }
+
+  // ── public operations ──
+
+  async function setPostReaction(postId, user, type) {
+    const t = await load('post', postId);
+    if (!t) return null;
+    const from = await mineOf(t, user);
+    t.mine.set(user, type);
+    const key = \`post:\${postId}:\${user}\`;
+    record(t, key, user, null, pending.has(key) ? pending.get(key).from : from, type);
+    const counts = view(t);
+    return { total: [...counts.values()].reduce((a, b) => a + b, 0), counts, added: from === null && type !== null, authorAddress: t.authorAddress };
+  }
+
+  async function toggleMessageReaction(channelId, messageId, user, emoji) {
+    const t = await load('message', messageId);
+    if (!t || Number(t.channelId) !== Number(channelId)) return null;
+    const mine = new Set(await mineOf(t, user));
+    const had = mine.has(emoji);
+    if (had) mine.delete(emoji); else mine.add(emoji);
+    t.mine.set(user, mine);
+    const key = \`message:\${messageId}:\${user}:\${emoji}\`;
+    record(t, key, user, emoji, pending.has(key) ? pending.get(key).from : had, !had);
+    scheduleEmit(t);
+    return { added: !had, reactions: messageReactions(t) };
+  }
+
+  async function messageCounts(messageId) {
+    const t = await load('message', messageId);
+    return t ? messageReactions(t) : [];
+  }
+
+  // ── flush ──
+
+  function sortOps(ops) {
+    return ops.sort((a, b) => (a.id - b.id) || (a.user < b.user ? -1 : a.user > b.user ? 1 : 0) || String(a.value).localeCompare(String(b.value)));
+  }
+
+  async function writeBatch(ops) {
+    const s = await schema();
+    const posts = sortOps(ops.filter(op => op.kind === 'post'));
+    const messages = sortOps(ops.filter(op => op.kind === 'message'));
+    const postSet = posts.filter(op => op.to !== null);
+    const postDel = posts.filter(op => op.to === null);
+    const msgAdd = messages.filter(op => op.to);
+    const msgDel = messages.filter(op => !op.to);
+
+    if (postSet.length > 0) {
+      await db.query(
+        \`INSERT INTO reactions (post_id, \${s.user}, \${s.type})
+         SELECT * FROM unnest($1::int[], $2::text[], $3::int[])
+         ON CONFLICT (post_id, \${s.user}) DO UPDATE SET \${s.type} = EXCLUDED.\${s.type}\`,
+        [postSet.map(op => op.id), postSet.map(op => op.user), postSet.map(op => op.to)]
+      );
+    }
+    if (postDel.length > 0) {
+      await db.query(
+        \`DELETE FROM reactions r USING unnest($1::int[], $2::text[]) AS d(post_id, user_address)
+         WHERE r.post_id = d.post_id AND r.\${s.user} = d.user_address\`,
+        [postDel.map(op => op.id), postDel.map(op => op.user)]
+      );
+    }
+    if (msgAdd.length > 0) {
+      await db.query(
+        \`INSERT INTO channel_reactions (message_id, channel_id, user_address, emoji)
+         SELECT * FROM unnest($1::int[], $2::int[], $3::text[], $4::text[])
+         ON CONFLICT (message_id, user_address, emoji) DO NOTHING\`,
+        [msgAdd.map(op => op.id), msgAdd.map(op => op.channelId), msgAdd.map(op => op.user), msgAdd.map(op => op.value)]
+      );
+    }
+    if (msgDel.length > 0) {
+      await db.query(
+        \`DELETE FROM channel_reactions r USING unnest($1::int[], $2::text[], $3::text[]) AS d(message_id, user_address, emoji)
+         WHERE r.message_id = d.message_id AND r.user_address = d.user_address AND r.emoji = d.emoji\`,
+        [msgDel.map(op => op.id), msgDel.map(op => op.user), msgDel.map(op => op.value)]
+      );
+    }
+  }
+
+  // A failed change goes back in the queue unless a newer change to the same key replaced it
+  function requeue(op) {
+    const newer = pending.get(op.key);
+    const t = targets.get(op.tk);
+    if (newer) {
+      newer.from = op.from;
+      t?.ops.delete(op);
+      if (newer.from === newer.to) {
+        pending.delete(op.key);
+        t?.ops.delete(newer);
+      }
+    } else {
+      pending.set(op.key, op);
+    }
+  }
+
+  // Changes that can never be written (target deleted meanwhile) are dropped
+  function discard(op) {
+    const t = targets.get(op.tk);
+    if (!t) return;
+    t.ops.delete(op);
+    t.mine.delete(op.user);
+    t.base = null;
+  }
+
+  async function refresh(tks, written) {
+    for (const kind of ['post', 'message']) {
+      const list = tks.filter(tk => tk.startsWith(kind + ':')).map(tk => targets.get(tk)).filter(Boolean);
+      if (list.length === 0) continue;
+      let rows = null;
+      try {
+        rows = await countRows(kind, list.map(t => t.id));
+      } catch (err) {
+        console.error('Reaction recount error:', err.message);
+      }
+      for (const t of list) {
+        for (const op of [...t.ops]) if (written.has(op)) t.ops.delete(op);
+        const row = rows && rows.get(t.id);
+        t.base = row ? row.counts : null;
+        scheduleEmit(t);
+      }
+    }
+  }
+
+  // Other workers drop their counts for these targets; recounted message reactions ride
+  // along so they can update their channel tail cache in place. Batches stay under the
+  // 8000-byte NOTIFY limit.
+  function notifyOthers(tks) {
+    const send = (batch) => {
+      db.query("SELECT pg_notify('reaction_counts', $1)", [JSON.stringify({ ...batch, pid: process.pid })])
+        .catch(err => console.error('Reaction notify error:', err.message));
+    };
+    let batch = { targets: [], messages: [] };
+    let size = 0;
+    for (const tk of tks) {
+      const t = targets.get(tk);
+      const message = t && t.kind === 'message' && t.base && t.channelId
+        ? { channelId: t.channelId, messageId: t.id, reactions: messageReactions(t) }
+        : null;
+      const bytes = tk.length + 3 + (message ? Buffer.byteLength(JSON.stringify(message)) + 1 : 0);
+      if (batch.targets.length > 0 && size + bytes > REACTION_NOTIFY_MAX) {
+        send(batch);
+        batch = { targets: [], messages: [] };
+        size = 0;
+      }
+      batch.targets.push(tk);
+      if (message) batch.messages.push(message);
+      size += bytes;
+    }
+    if (batch.targets.length > 0) send(batch);
+  }
+
+  function flush() {
+    if (flushPromise || pending.size === 0) return flushPromise || Promise.resolve();
+    flushing = pending;
+    pending = new Map();
+    const ops = [...flushing.values()];
+    flushPromise = (async () => {
+      const written = [];
+      try {
+        await writeBatch(ops);
+        written.push(...ops);
+      } catch (err) {
+        console.error('Reaction batch write error:', err.message);
+        if (/^2[23]/.test(String(err.code || ''))) {
+          // A bad row (e.g. its post was deleted meanwhile): find it by writing one by one
+          for (const op of ops) {
+            try {
+              await writeBatch([op]);
+              written.push(op);
+            } catch (e) {
+              if (/^2[23]/.test(String(e.code || ''))) discard(op); else requeue(op);
+            }
+          }
+        } else {
+          ops.forEach(requeue); // connection / server trouble: try again next tick
+        }
+      }
+      const tks = [...new Set(written.map(op => op.tk))];
+      await refresh(tks, new Set(written));
+      if (tks.length > 0) notifyOthers(tks);
+    })()
+      .catch(err => console.error('Reaction flush error:', err.message))
+      .finally(() => {
+        flushing = new Map();
+        flushPromise = null;
+      });
+    return flushPromise;
+  }
+
+  // Another worker wrote reactions: forget stored counts and the users we have no changes for
+  function invalidate(tk) {
+    const t = targets.get(tk);
+    if (!t) return;
+    t.base = null;
+    const busy = new Set([...t.ops].map(op => op.user));
+    for (const user of [...t.mine.keys()]) if (!busy.has(user)) t.mine.delete(user);
+  }
+
+  async function startListener() {
+    const { Client } = require('pg');
+    const listener = new Client({
+      host: process.env.DB_HOST || 'localhost',
+      port: process.env.DB_PORT || 5432,
+      database: process.env.DB_NAME || 'hyve_social',
+      user: process.env.DB_USER || 'hyve_admin',
+      password: process.env.DB_PASSWORD,
+    });
+    let retried = false;
+    const retry = () => {
+      if (retried) return;
+      retried = true;
+      for (const tk of targets.keys()) invalidate(tk); // may have missed writes while disconnected
+      setTimeout(() => startListener().catch(err => console.error('Reaction listener error:', err.message)), 5000);
+    };
+    listener.on('error', retry);
+    listener.on('end', retry);
+    listener.on('notification', (msg) => {
+      try {
+        const { targets: tks, messages, pid } = JSON.parse(msg.payload);
+        if (pid === process.pid) return;
+        tks.forEach(invalidate);
+        if (messages && typeof channelTailCache !== 'undefined' && channelTailCache.applyLocal) {
+          for (const { channelId, messageId, reactions } of messages) {
+            channelTailCache.applyLocal(channelId, 'channel_reaction_update', { messageId, reactions });
+          }
+        }
+      } catch (e) {}
+    });
+    await listener.connect();
+    await listener.query('LISTEN reaction_counts');
+  }
+
+  setInterval(flush, REACTION_FLUSH_MS).unref();
+  startListener().catch(err => console.error('Reaction listener error:', err.message));
+
+  // Write what is still in memory, again while a flush was in progress or failed
+  async function flushAll() {
+    for (let attempt = 0; attempt < 5 && (pending.size > 0 || flushPromise); attempt++) await flush();
+  }
+
+  // With tmp_patch_graceful_drain.js, serverLifecycle.drain() calls flushAll() once the sockets
+  // are gone; only without it does this worker flush on the signal itself
+  if (typeof serverLifecycle === 'undefined') {
+    for (const signal of ['SIGTERM', 'SIGINT']) {
+      process.once(signal, () => {
+        flushAll().finally(() => {
+          if (process.listenerCount(signal) === 0) process.exit(0);
+        });
+      });
+    }
+  }
+
+  return { setPostReaction, toggleMessageReaction, messageCounts, flush, flushAll };
+})();
+
+// Socket notification for the post author (the old handler's side effect)
+async function notifyPostReaction(authorAddress, reactorAddress, postId, reactionType) {
+  if (!authorAddress || authorAddress.toLowerCase() === reactorAddress.toLowerCase()) return;
+  const entry = onlineUsers.get(authorAddress.toLowerCase());
+  if (!entry || !entry.sockets || entry.sockets.size === 0) return;
+  const actor = await db.query('SELECT username, profile_image FROM users WHERE wallet_address = $1', [reactorAddress]);
+  const payload = {
+    type: 'post_reaction',
+    postId,
+    reactionType,
+    user: actor.rows[0] || null,
+    createdAt: new Date().toISOString(),
+  };
+  for (const socketId of entry.sockets) io.to(socketId).emit('post_reaction', payload);
+}
+
+app.post('/api/posts/:id/react', authenticateToken, async (req, res) => {
+  try {
+    const postId = parseInt(req.params.id);
+    const reactionType = Number(req.body.reactionType ?? 0);
+    if (!postId) return res.status(400).json({ error: 'Invalid post' });
+    if (!POST_REACTION_TYPES.includes(reactionType)) return res.status(400).json({ error: 'Invalid reaction type' });
+
+    const result = await reactionCounters.setPostReaction(postId, req.userAddress, reactionType);
+    if (!result) return res.status(404).json({ error: 'Post not found' });
+    if (result.added) {
+      notifyPostReaction(result.authorAddress, req.userAddress, postId, reactionType)
+        .catch(err => console.error('Post reaction notify error:', err.message));
+    }
+    res.json({ success: true, reactionType, reaction_count: result.total });
+  } catch (error) {
+    console.error('React to post error:', error);
+    res.status(500).json({ error: 'Failed to react to post' });
+  }
+});
+
+app.delete('/api/posts/:id/react', authenticateToken, async (req, res) => {
+  try {
+    const postId = parseInt(req.params.id);
+    if (!postId) return res.status(400).json({ error: 'Invalid post' });
+
+    const result = await reactionCounters.setPostReaction(postId, req.userAddress, null);
+    if (!result) return res.status(404).json({ error: 'Post not found' });
+    res.json({ success: true, reaction_count: result.total });
+  } catch (error) {
+    console.error('Remove post reaction error:', error);
+    res.status(500).json({ error: 'Failed to remove reaction' });
+  }
+});
+
+app.post('/api/channels/:channelId/messages/:messageId/reactions', authenticateToken, async (req, res) => {
+  try {
+    const channelId = parseInt(req.params.channelId);
+    const messageId = parseInt(req.params.messageId);
+    const { emoji } = req.body;
+    if (!emoji) return res.status(400).json({ error: 'Emoji is required' });
+    if (typeof emoji !== 'string' || emoji.length > 32) return res.status(400).json({ error: 'Invalid emoji' });
+
+    const result = await reactionCounters.toggleMessageReaction(channelId, messageId, req.userAddress, emoji);
+    if (!result) return res.status(404).json({ error: 'Message not found' });
+    res.json(result.added ? { added: true, reactions: result.reactions } : { removed: true, reactions: result.reactions });
+  } catch (error) {
+    console.error('Reaction error:', error);
+    res.status(500).json({ error: 'Failed to toggle reaction' });
+  }
+});
+
+app.get('/api/channels/:channelId/messages/:messageId/reactions', async (req, res) => {
+  try {
+    const messageId = parseInt(req.params.messageId);
+    res.json({ reactions: await reactionCounters.messageCounts(messageId) });
+  } catch (error) {
+    res.status(500).json({ error: 'Failed to get reactions' });
+  }
+});
+
+`;
+
+const MODULE_BANNER = '// ═══════════════════════════════════════════════════════════\n// REACTIONS — write-behind';
+if (upgrade) {
+  // Routes and the socket notification stay; the module runs up to the first "\n})();\n"
+  const oldStart = code.indexOf(MODULE_BANNER);
+  const oldEnd = oldStart === -1 ? -1 : code.indexOf('\n})();\n', oldStart);
+  if (oldEnd === -1) { console.error('Cannot find the existing reaction service module to upgrade'); process.exit(1); }
+  const newStart = SERVICE.indexOf(MODULE_BANNER);
+  const serviceModule = SERVICE.slice(newStart, SERVICE.indexOf('\n})();\n', newStart) + '\n})();\n'.length);
+  code = code.slice(0, oldStart) + serviceModule + code.slice(oldEnd + '\n})();\n'.length);
+  changes++;
+  console.log('2. Upgraded the reaction service module (reactions reach other workers\' channel caches via NOTIFY)');
+} else {
+  const listenIdx = code.lastIndexOf('server.listen(');
+  if (listenIdx === -1) { console.error('Cannot find server.listen'); process.exit(1); }
+  code = code.slice(0, listenIdx) + SERVICE + code.slice(listenIdx);
+  changes++;
+  console.log('2. Added write-behind reaction service + routes');
+}
+
+fs.writeFileSync(serverPath, code);
+console.log(`\nDone! Applied ${changes} changes.`);
+console.log('Run tmp_create_reaction_constraints.js first if reactions has no (post_id, user) unique index.');
@@ -0,0 +1,117 @@
+"""Block GET /metrics at nginx on the social-api.hyvechain.com site.
+
+The Prometheus endpoint added by tmp_patch_metrics.js is meant for the scraper only, and it
+already requires METRICS_TOKEN. nginx proxies from 127.0.0.1, so node cannot tell a public
+request from a local one. This makes the public site answer 404 for /metrics, which
+keeps the endpoint closed even if the token leaks. Scrape node directly on
+localhost:3000 instead.
+
+Usage:
+    python tmp_ssh_nginx_metrics.py            # print the generated location block
+    HYVE_SSH_PASSWORD=... python tmp_ssh_nginx_metrics.py --apply
+"""
+
+import argparse
+import os
+import sys
+
+SITE = "social-api.hyvechain.com"
+SITE_FILE = f"/etc/nginx/sites-available/{SITE}"
+MARKER = "# hyve metrics are not public"
+
+
+def location():
+    return f"""    {MARKER}
+    location = /metrics {{
+        return 404;
+    }}
+"""
+
+
+def insert_location(site_conf, block):
+    """Place the exact-match location just before `location / {` in the 443 server."""
+    if MARKER in site_conf:
+        return None
+    ssl_server = site_conf.find("listen 443")
+    anchor = site_conf.find("    location / {", max(ssl_server, 0))
+    if ssl_server == -1 or anchor == -1:
+        raise ValueError("could not find `location / {` in the 443 server block")
+    # Keep a comment that introduces `location /` attached to it
+    prev = site_conf.rfind("\n", 0, anchor - 1) + 1
+    if site_conf[prev:anchor].strip().startswith("#"):
+        anchor = prev
+    return site_conf[:anchor] + block + "\n" + site_conf[anchor:]
+
+
+def apply(args, block):
+    import paramiko
+
+    password = os.environ.get("HYVE_SSH_PASSWORD")
+    if not password:
+        sys.exit("Set HYVE_SSH_PASSWORD to apply over SSH")
+
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    client.connect(args.host, username=args.user, password=password, timeout=15)
+
+    def run(cmd, desc):
+        print(f"\n{'='*60}")
+        print(f"STEP: {desc}")
+        print(f"CMD:  {cmd}")
+        print(f"{'='*60}")
+        stdin, stdout, stderr = client.exec_command(cmd, timeout=30)
+        out = stdout.read().decode()
+        err = stderr.read().decode()
+        status = stdout.channel.recv_exit_status()
+        if out.strip():
+            print(out)
+        if err.strip():
+            print(f"STDERR: {err}")
+        return status, out
+
+    sftp = client.open_sftp()
+    try:
+        run(f"cp {SITE_FILE} {SITE_FILE}.bak-metrics", "Back up site config")
+
+        with sftp.open(SITE_FILE) as fh:
+            site_conf = fh.read().decode()
+        updated = insert_location(site_conf, block)
+        if updated is None:
+            print(f"{SITE_FILE} already blocks /metrics")
+        else:
+            with sftp.open(SITE_FILE, "w") as fh:
+                fh.write(updated)
+            print(f"Inserted /metrics block into {SITE_FILE}")
+
+        status, _ = run("nginx -t", "Test nginx configuration")
+        if status != 0:
+            run(f"cp {SITE_FILE}.bak-metrics {SITE_FILE}", "Roll back (nginx -t failed)")
+            sys.exit(1)
+        run("systemctl reload nginx", "Reload nginx")
+        run(f"curl -s -o /dev/null -w '%{{http_code}}\\n' https://{SITE}/metrics",
+            "Verify /metrics is not public (expect 404)")
+    finally:
+        sftp.close()
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="block /metrics on the public nginx site")
+    parser.add_argument("--apply", action="store_true", help="install on the server over SSH")
+    parser.add_argument("--host", default=os.environ.get("HYVE_SSH_HOST", "157.250.207.109"))
+    parser.add_argument("--user", default=os.environ.get("HYVE_SSH_USER", "root"))
+    args = parser.parse_args()
+
+    block = location()
+
+    if not args.apply:
+        print(f"# ── {SITE_FILE}: inside the 443 server, before `location / {{` ──")
+        print(block)
+        return
+
+    apply(args, block)
+    print("\n\nDONE - /metrics blocked on the public site.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Generate (and optionally install) nginx proxy_cache config for the public feed.
+
+GET /api/posts/public and GET /api/stories/public are identical for every visitor
+and are sent with ETag + 'Cache-Control: public, s-maxage=10' (tmp_patch_public_cache.js).
+This puts a microcache in front of them on the social-api.hyvechain.com site:
+  - one upstream request per URL per 10s, with concurrent misses collapsed (proxy_cache_lock)
+  - stale copies served while refreshing in the background or if node is down
+  - CORS headers identical to the existing `location /` block
+
+Usage:
+    python tmp_ssh_nginx_public_cache.py            # print the generated config
+    HYVE_SSH_PASSWORD=... python tmp_ssh_nginx_public_cache.py --apply
+"""
+
+import argparse
+import os
+import sys
+
+SITE = "social-api.hyvechain.com"
+SITE_FILE = f"/etc/nginx/sites-available/{SITE}"
+CACHE_CONF = "/etc/nginx/conf.d/hyve_public_cache.conf"
+MARKER = "# hyve public feed microcache"
+CORS_ORIGIN = "https://social.hyvechain.com"
+
+
+def http_conf(cache_dir, max_size):
+    # conf.d/*.conf is included inside the http {} block
+    return f"""{MARKER}
+proxy_cache_path {cache_dir} levels=1:2 keys_zone=hyve_public:10m max_size={max_size} inactive=10m use_temp_path=off;
+"""
+
+
+def locations(upstream, valid):
+    cors = "\n".join(
+        f"        add_header '{name}' '{value}' always;"
+        for name, value in (
+            ("Access-Control-Allow-Origin", CORS_ORIGIN),
+            ("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS"),
+            ("Access-Control-Allow-Headers", "Content-Type, Authorization"),
+            ("Access-Control-Allow-Credentials", "true"),
+        )
+    )
+    blocks = []
+    for path in ("/api/posts/public", "/api/stories/public"):
+        blocks.append(f"""    location = {path} {{
+{cors}
+        add_header 'X-Cache-Status' $upstream_cache_status always;
+
+        if ($request_method = 'OPTIONS') {{
+{cors}
+            add_header 'Content-Length' '0';
+            add_header 'Content-Type' 'text/plain';
+            return 204;
+        }}
+
+        proxy_cache hyve_public;
+        proxy_cache_key $scheme$host$request_uri;
+        proxy_cache_methods GET HEAD;
+        # The response is the same for everyone, so the token never varies it
+        proxy_set_header Authorization "";
+        proxy_cache_valid 200 {valid};
+        proxy_cache_lock on;
+        proxy_cache_lock_timeout 5s;
+        proxy_cache_use_stale updating error timeout http_500 http_502 http_503 http_504;
+        proxy_cache_background_update on;
+        proxy_cache_revalidate on;
+
+        proxy_pass {upstream};
+        proxy_http_version 1.1;
+        proxy_set_header Host $host;
+        proxy_set_header X-Real-IP $remote_addr;
+        proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
+        proxy_set_header X-Forwarded-Proto $scheme;
+    }}
+""")
+    return f"    {MARKER}\n" + "\n".join(blocks)
+
+
+def insert_locations(site_conf, block):
+    """Place the exact-match locations just before `location / {` in the 443 server."""
+    if MARKER in site_conf:
+        return None
+    ssl_server = site_conf.find("listen 443")
+    anchor = site_conf.find("    location / {", max(ssl_server, 0))
+    if ssl_server == -1 or anchor == -1:
+        raise ValueError("could not find `location / {` in the 443 server block")
+    # Keep a comment that introduces `location /` attached to it
+    prev = site_conf.rfind("\n", 0, anchor - 1) + 1
+    if site_conf[prev:anchor].strip().startswith("#"):
+        anchor = prev
+    return site_conf[:anchor] + block + "\n" + site_conf[anchor:]
+
+
+def apply(args, http_block, location_block):
+    import paramiko
+
+    password = os.environ.get("HYVE_SSH_PASSWORD")
+    if not password:
+        sys.exit("Set HYVE_SSH_PASSWORD to apply over SSH")
+
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    client.connect(args.host, username=args.user, password=password, timeout=15)
+
+    def run(cmd, desc):
+        print(f"\n{'='*60}")
+        print(f"STEP: {desc}")
+        print(f"CMD:  {cmd}")
+        print(f"{'='*60}")
+        stdin, stdout, stderr = client.exec_command(cmd, timeout=30)
+        out = stdout.read().decode()
+        err = stderr.read().decode()
+        status = stdout.channel.recv_exit_status()
+        if out.strip():
+            print(out)
+        if err.strip():
+            print(f"STDERR: {err}")
+        return status, out
+
+    sftp = client.open_sftp()
+    try:
+        run(f"mkdir -p {args.cache_dir} && chown www-data:www-data {args.cache_dir}", "Create cache directory")
+        run(f"cp {SITE_FILE} {SITE_FILE}.bak-public-cache", "Back up site config")
+
+        with sftp.open(SITE_FILE) as fh:
+            site_conf = fh.read().decode()
+        updated = insert_locations(site_conf, location_block)
+        if updated is None:
+            print(f"{SITE_FILE} already has the public feed locations")
+        else:
+            with sftp.open(SITE_FILE, "w") as fh:
+                fh.write(updated)
+            print(f"Inserted public feed locations into {SITE_FILE}")
+        with sftp.open(CACHE_CONF, "w") as fh:
+            fh.write(http_block)
+        print(f"Wrote {CACHE_CONF}")
+
+        status, _ = run("nginx -t", "Test nginx configuration")
+        if status != 0:
+            run(f"cp {SITE_FILE}.bak-public-cache {SITE_FILE} && rm -f {CACHE_CONF}", "Roll back (nginx -t failed)")
+            sys.exit(1)
+        run("systemctl reload nginx", "Reload nginx")
+        run(f"curl -s -o /dev/null -D - https://{SITE}/api/posts/public?limit=50\\&offset=0 | grep -i -E 'x-cache-status|etag|cache-control'",
+            "Verify cache headers (first request is a MISS)")
+    finally:
+        sftp.close()
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="nginx microcache for the public feed endpoints")
+    parser.add_argument("--apply", action="store_true", help="install on the server over SSH")
+    parser.add_argument("--host", default=os.environ.get("HYVE_SSH_HOST", "157.250.207.109"))
+    parser.add_argument("--user", default=os.environ.get("HYVE_SSH_USER", "root"))
+    parser.add_argument("--upstream", default="http://localhost:3000")
+    parser.add_argument("--cache-dir", default="/var/cache/nginx/hyve_public")
+    parser.add_argument("--max-size", default="200m")
+    parser.add_argument("--valid", default="10s", help="fallback TTL when the origin sends no s-maxage")
+    args = parser.parse_args()
+
+    http_block = http_conf(args.cache_dir, args.max_size)
+    location_block = locations(args.upstream, args.valid)
+
+    if not args.apply:
+        print(f"# ── {CACHE_CONF} (http context) ──")
+        print(http_block)
+        print(f"# ── {SITE_FILE}: inside the 443 server, before `location / {{` ──")
+        print(location_block)
+        return
+
+    apply(args, http_block, location_block)
+    print("\n\nDONE - public feed microcache installed.")
+
+
+if __name__ == "__main__":
+    main()
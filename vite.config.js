@@ -1,8 +1,21 @@
 import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
+import bundleBudget from './perf/bundleBudget.js'
+
+// Libraries every session loads get their own long-lived chunks, so an app-only deploy
+// leaves their hashes (and the browser's cached copies) untouched. Heavy libraries behind
+// dynamic imports (WalletConnect, libsodium, TF.js/nsfwjs) are already split by Rollup.
+const VENDOR_CHUNKS = [
+  ['vendor-react', /[\\/]node_modules[\\/](react|react-dom|scheduler)[\\/]/],
+  ['vendor-router', /[\\/]node_modules[\\/](react-router|react-router-dom|@remix-run[\\/]router)[\\/]/],
+  ['vendor-socket', /[\\/]node_modules[\\/](socket\.io-client|socket\.io-parser|engine\.io-client|engine\.io-parser|@socket\.io[\\/]component-emitter)[\\/]/]
+]
 
 export default defineConfig({
-  plugins: [react()],
+  plugins: [
+    react(),
+    bundleBudget({ budgetsFile: 'perf/bundle-budgets.json' })
+  ],
   server: {
     port: 3001,
     host: true,
@@ -12,6 +25,14 @@ export default defineConfig({
   build: {
     outDir: 'dist',
     sourcemap: false,
-    minify: 'terser'
+    minify: 'terser',
+    rollupOptions: {
+      output: {
+        manualChunks(id) {
+          const match = VENDOR_CHUNKS.find(([, pattern]) => pattern.test(id))
+          return match ? match[0] : undefined
+        }
+      }
+    }
   }
 })